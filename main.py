@@ -4,11 +4,19 @@ from pathlib import Path
 from src.pipeline import DocumentationPipeline
 from src.config import ConfigManager
 from src.code_analyzer import CodeAnalyzer
+from src.cost_estimator import CostEstimator
+from src.document_processor import DocumentProcessor
+from src.file_processor import FileProcessor
+from src.file_scheduler import FileScheduler
+from src.git_change_detector import GitChangeDetector
+from src.models import DocumentationContext, DocumentationRequest, PipelineState
+from src.sharding import parse_shard
+from src.watcher import RepositoryWatcher
 
 
 def main():
     # Check if the first argument looks like a subcommand
-    if len(sys.argv) > 1 and sys.argv[1] in ["generate", "analyze", "validate-config"]:
+    if len(sys.argv) > 1 and sys.argv[1] in ["generate", "watch", "merge", "analyze", "validate-config"]:
         # Use subcommand parsing
         parser = create_subcommand_parser()
         args = parser.parse_args()
@@ -21,6 +29,10 @@ def main():
     try:
         if args.command == "generate":
             run_documentation_generation(args)
+        elif args.command == "watch":
+            run_watch(args)
+        elif args.command == "merge":
+            run_shard_merge(args)
         elif args.command == "analyze":
             run_repository_analysis(args)
         elif args.command == "validate-config":
@@ -83,6 +95,23 @@ def add_generate_arguments(parser):
     parser.add_argument(
         "--force-full-guide", action="store_true", help="Force full guide regeneration (disable incremental updates)"
     )
+    parser.add_argument(
+        "--since",
+        nargs="?",
+        const="last",
+        metavar="REV",
+        help="Only process files changed in git since REV (default: the last documented commit)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run from its last checkpoint instead of starting over",
+    )
+    parser.add_argument(
+        "--shard",
+        metavar="I/N",
+        help="Only document the files of shard I of N (file docs only; combine shards with merge)",
+    )
     parser.add_argument(
         "--verbose", "-v", action="store_true", help="Enable verbose output"
     )
@@ -93,6 +122,101 @@ def add_generate_arguments(parser):
     )
 
 
+def add_watch_arguments(parser):
+    """Add watch command arguments to a parser."""
+    parser.add_argument(
+        "--repo-path",
+        "-r",
+        type=str,
+        required=True,
+        help="Path to the code repository to watch",
+    )
+    parser.add_argument(
+        "--docs-path",
+        "-d",
+        type=str,
+        help="Path to existing documentation (used as context)",
+    )
+    parser.add_argument(
+        "--output-path",
+        "-o",
+        type=str,
+        help="Where to save generated documentation (default: repo-path/documentation_output)",
+    )
+    parser.add_argument(
+        "--config",
+        "-c",
+        type=str,
+        default="config.yaml",
+        help="Path to configuration file (default: config.yaml)",
+    )
+    parser.add_argument(
+        "--guide", "-g", action="store_true", help="Also keep the documentation guide up to date"
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        help="Seconds to wait after the last change before regenerating (default: from config)",
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="Poll for changes instead of using inotify",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        help="Seconds between scans when polling (default: from config)",
+    )
+    parser.add_argument(
+        "--verbose", "-v", action="store_true", help="Enable verbose output"
+    )
+
+
+def add_merge_arguments(parser):
+    """Add merge command arguments to a parser."""
+    parser.add_argument(
+        "shard_paths",
+        nargs="+",
+        type=str,
+        help="Output directories of the shards of a --shard run",
+    )
+    parser.add_argument(
+        "--repo-path",
+        "-r",
+        type=str,
+        required=True,
+        help="Path to the code repository that was documented",
+    )
+    parser.add_argument(
+        "--docs-path",
+        "-d",
+        type=str,
+        help="Path to existing documentation (used as context for the guide)",
+    )
+    parser.add_argument(
+        "--output-path",
+        "-o",
+        type=str,
+        help="Where to write the merged documentation (default: repo-path/documentation_output)",
+    )
+    parser.add_argument(
+        "--config",
+        "-c",
+        type=str,
+        default="config.yaml",
+        help="Path to configuration file (default: config.yaml)",
+    )
+    parser.add_argument(
+        "--no-guide",
+        action="store_true",
+        help="Only merge the shards, without building the documentation guide",
+    )
+    parser.add_argument(
+        "--verbose", "-v", action="store_true", help="Enable verbose output"
+    )
+
+
 def create_subcommand_parser():
     """Create parser with subcommands."""
     parser = argparse.ArgumentParser(
@@ -118,6 +242,19 @@ Examples:
   # Cleanup orphaned documentation
   python main.py generate -r path/to/repo --cleanup
 
+  # Only files changed since the last documented commit
+  python main.py generate -r path/to/repo -f -g --since
+
+  # Continue a run that was interrupted
+  python main.py generate -r path/to/repo -f -g --resume
+
+  # Split file docs over 4 runners, then merge and build the guide
+  python main.py generate -r path/to/repo -f --shard 1/4 -o shard1
+  python main.py merge -r path/to/repo shard1 shard2 shard3 shard4
+
+  # Keep file docs and the guide up to date while editing
+  python main.py watch -r path/to/repo -g
+
   # Utility commands
   python main.py analyze path/to/repo
   python main.py validate-config
@@ -131,6 +268,18 @@ Examples:
     doc_parser = subparsers.add_parser("generate", help="Generate documentation")
     add_generate_arguments(doc_parser)
 
+    # Watch command
+    watch_parser = subparsers.add_parser(
+        "watch", help="Regenerate documentation as files change"
+    )
+    add_watch_arguments(watch_parser)
+
+    # Merge command
+    merge_parser = subparsers.add_parser(
+        "merge", help="Merge the outputs of a sharded run and build the guide"
+    )
+    add_merge_arguments(merge_parser)
+
     # Analyze command
     analyze_parser = subparsers.add_parser(
         "analyze", help="Analyze repository structure"
@@ -141,6 +290,22 @@ Examples:
     analyze_parser.add_argument(
         "--config", type=str, default="config.yaml", help="Configuration file"
     )
+    analyze_parser.add_argument(
+        "--docs-path",
+        "-d",
+        type=str,
+        help="Existing documentation that would be used as context",
+    )
+    analyze_parser.add_argument(
+        "--concurrency",
+        type=int,
+        help="Parallel LLM requests assumed for the wall time estimate (default: from config)",
+    )
+    analyze_parser.add_argument(
+        "--no-tokens",
+        action="store_true",
+        help="Skip the token and cost projection",
+    )
 
     # Validate config command
     validate_parser = subparsers.add_parser(
@@ -180,6 +345,9 @@ Examples:
 
   # Cleanup orphaned documentation
   python main.py -r path/to/repo --cleanup
+
+  # Only files changed since a git revision
+  python main.py -r path/to/repo -f -g --since main
         """,
     )
 
@@ -223,20 +391,113 @@ def run_repository_analysis(args):
 
         print("📏 Largest files:")
         for file_path, size in structure["largest_files"][:10]:
-            print(f"  {file_path}: {size:,} characters")
+            print(f"  {file_path}: {size:,} bytes")
 
         # Check processing limits
         max_files = config.processing.get("max_files")
         if max_files and max_files > 0:
             print(f"\n⚙️  Processing limit: {max_files} files (configured maximum)")
             if structure["total_files"] > max_files:
-                print(f"   Only the first {max_files} files would be processed")
+                code_files = schedule_files(config, repo_path, code_files)[:max_files]
+                print(
+                    f"   Only {max_files} files would be processed, taken in documentation order "
+                    f"(schedule: {config.processing.get('schedule', 'walk')}, "
+                    f"changed_first: {config.processing.get('changed_first', False)})"
+                )
+
+        if not args.no_tokens:
+            print_token_projection(args, config, code_files)
 
     except Exception as e:
         print(f"❌ Analysis failed: {e}")
         raise
 
 
+def schedule_files(config, repo_path, code_files):
+    """Order files the way a generate run does, so ``max_files`` selects the same files."""
+    scheduler = FileScheduler.from_config(FileProcessor(config), config.processing)
+    if scheduler is None:
+        return code_files
+    state = PipelineState(
+        request=DocumentationRequest(
+            repo_path=repo_path,
+            output_path=repo_path / "documentation_output",
+            config=config,
+            file_docs=True,
+        ),
+        existing_docs=DocumentationContext(content="", token_count=0),
+    )
+    return scheduler.order(state, code_files)
+
+
+def print_token_projection(args, config, code_files):
+    """Print projected tokens, cost and wall time for documenting the files."""
+    docs_path = None
+    if args.docs_path:
+        docs_path = Path(args.docs_path)
+        if not docs_path.exists():
+            raise ValueError(f"Documentation path does not exist: {docs_path}")
+
+    # The same context generate_documentation prepends to every prompt
+    doc_processor = DocumentProcessor(config)
+    context = doc_processor.prepare_context(doc_processor.load_existing_docs(docs_path))
+
+    estimator = CostEstimator(config)
+    projection = estimator.estimate(code_files, context=context, concurrency=args.concurrency)
+    totals = projection["totals"]
+
+    print()
+    print(f"🧮 Token projection ({projection['encoding']} encoding, all files regenerated):")
+    print(f"  Files: {projection['files']}")
+    if projection["unreadable_files"]:
+        print(f"  Skipped (binary or unreadable): {projection['unreadable_files']}")
+    print(f"  Source tokens: {totals['file_tokens']:,}")
+    print(f"  Existing docs context: {projection['context_tokens']:,} tokens per file")
+    print(f"  Prompt tokens: {totals['prompt_tokens']:,}")
+    print(f"  Completion tokens (estimated): {totals['completion_tokens']:,}")
+    print(f"  💰 Projected cost: ${totals['cost']:,.2f}")
+    print(
+        f"  ⏱️  Projected wall time: {format_duration(projection['wall_seconds'])} "
+        f"at concurrency {projection['concurrency']} "
+        f"({format_duration(projection['sequential_seconds'])} sequential)"
+    )
+    print()
+
+    print("📋 Tokens by extension:")
+    for ext, group in sorted(projection["by_extension"].items()):
+        print(
+            f"  {ext}: {group['file_tokens']:,} source, {group['prompt_tokens']:,} prompt, "
+            f"{group['completion_tokens']:,} completion, ${group['cost']:,.2f}"
+        )
+    print()
+
+    print("📂 Tokens by directory:")
+    for directory, group in sorted(projection["by_directory"].items()):
+        print(
+            f"  {directory}: {group['file_tokens']:,} source, {group['prompt_tokens']:,} prompt, "
+            f"{group['completion_tokens']:,} completion, ${group['cost']:,.2f}"
+        )
+    print()
+
+    print("💸 Most expensive files:")
+    for entry in projection["most_expensive_files"]:
+        print(
+            f"  {entry['relative_path']}: {entry['prompt_tokens']:,} prompt, "
+            f"{entry['completion_tokens']:,} completion, ${entry['cost']:,.4f}"
+        )
+
+
+def format_duration(seconds: float) -> str:
+    """Format a duration in seconds as hours, minutes and seconds."""
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h {minutes}m"
+    if minutes:
+        return f"{minutes}m {seconds}s"
+    return f"{seconds}s"
+
+
 def run_config_validation(args):
     """Validate configuration file and API keys."""
     print("🔧 Validating Configuration")
@@ -258,14 +519,17 @@ def run_config_validation(args):
         print(f"🌡️  Temperature: {model_config.get('temperature', 0.2)}")
 
         # Test API key
-        try:
-            api_key = config_manager.get_api_key(provider)
-            masked_key = (
-                api_key[:8] + "..." + api_key[-4:] if len(api_key) > 12 else "***"
-            )
-            print(f"🔑 API Key: {masked_key} ✅")
-        except Exception as e:
-            print(f"🔑 API Key: ❌ {e}")
+        if provider == "fake":
+            print("🔑 API Key: not needed for the offline fake provider ✅")
+        else:
+            try:
+                api_key = config_manager.get_api_key(provider)
+                masked_key = (
+                    api_key[:8] + "..." + api_key[-4:] if len(api_key) > 12 else "***"
+                )
+                print(f"🔑 API Key: {masked_key} ✅")
+            except Exception as e:
+                print(f"🔑 API Key: ❌ {e}")
 
         # Validate processing configuration
         processing_config = config.processing
@@ -320,6 +584,9 @@ def run_cleanup(args):
     print(f"📤 Documentation output: {output_path}")
     print()
 
+    if args.since and run_git_cleanup(args, repo_path, output_path):
+        return
+
     try:
         # Load configuration
         from src.config import ConfigManager
@@ -486,6 +753,133 @@ def run_cleanup(args):
         raise
 
 
+def run_git_cleanup(args, repo_path: Path, output_path: Path) -> bool:
+    """Remove documentation for files git reports as deleted since --since.
+
+    Returns False if no revision could be resolved and a full cleanup is needed.
+    """
+    detector = GitChangeDetector(repo_path, output_path)
+    if not detector.is_available():
+        raise ValueError(f"--since requires a git repository: {repo_path}")
+
+    since_commit = detector.resolve_since(args.since)
+    if not since_commit:
+        print("⚠️  No last documented commit recorded, running full cleanup")
+        return False
+
+    print(f"🔍 Checking git for files deleted since {since_commit[:8]}...")
+    changes = detector.detect_changes(since_commit)
+
+    removed_count = 0
+    for relative_path in changes.deleted:
+        relative = Path(relative_path)
+        doc_path = output_path / relative.parent / f"{relative.stem}_documentation.md"
+        if not doc_path.exists():
+            continue
+        try:
+            doc_path.unlink()
+            print(f"  ✓ Removed: {doc_path.relative_to(output_path)}")
+            removed_count += 1
+        except Exception as e:
+            print(f"  ❌ Failed to remove {doc_path.relative_to(output_path)}: {e}")
+
+    print("\n" + "=" * 50)
+    print("✅ Cleanup completed!")
+    print(f"🗑️  Removed {removed_count} documentation files for deleted sources")
+    if removed_count and (output_path / "documentation_guide.md").exists():
+        print("📝 Run with --guide to update the documentation guide")
+    return True
+
+
+def run_watch(args):
+    """Watch a repository and regenerate documentation for changed files."""
+    print("👀 Starting Documentation Watcher")
+    print("=" * 50)
+
+    repo_path = Path(args.repo_path)
+    if not repo_path.exists():
+        raise ValueError(f"Repository path does not exist: {repo_path}")
+
+    docs_path = None
+    if args.docs_path:
+        docs_path = Path(args.docs_path)
+        if not docs_path.exists():
+            raise ValueError(f"Documentation path does not exist: {docs_path}")
+
+    output_path = Path(args.output_path) if args.output_path else None
+
+    print(f"📁 Repository: {repo_path}")
+    print(f"📚 Existing docs: {docs_path if docs_path else 'None'}")
+    print(
+        f"📤 Output: {output_path if output_path else repo_path / 'documentation_output'}"
+    )
+    print(f"🎯 Documentation guide: {'Yes' if args.guide else 'No'}")
+    print(f"⚙️ Config: {args.config}")
+    print()
+
+    pipeline = DocumentationPipeline(args.config)
+    watcher = RepositoryWatcher(
+        pipeline,
+        repo_path=repo_path,
+        docs_path=docs_path,
+        output_path=output_path,
+        guide=args.guide,
+        debounce_seconds=args.debounce,
+        poll_interval=args.poll_interval,
+        use_polling=args.poll,
+    )
+    watcher.run()
+
+
+def run_shard_merge(args):
+    """Merge the output directories of a sharded run into one."""
+    print("🧩 Merging Sharded Documentation")
+    print("=" * 50)
+
+    repo_path = Path(args.repo_path)
+    if not repo_path.exists():
+        raise ValueError(f"Repository path does not exist: {repo_path}")
+
+    shard_paths = [Path(shard_path) for shard_path in args.shard_paths]
+    for shard_path in shard_paths:
+        if not shard_path.is_dir():
+            raise ValueError(f"Shard output does not exist: {shard_path}")
+
+    docs_path = None
+    if args.docs_path:
+        docs_path = Path(args.docs_path)
+        if not docs_path.exists():
+            raise ValueError(f"Documentation path does not exist: {docs_path}")
+
+    output_path = Path(args.output_path) if args.output_path else None
+
+    print(f"📁 Repository: {repo_path}")
+    print(f"🧩 Shards: {', '.join(str(shard_path) for shard_path in shard_paths)}")
+    print(
+        f"📤 Output: {output_path if output_path else repo_path / 'documentation_output'}"
+    )
+    print(f"🎯 Documentation guide: {'No' if args.no_guide else 'Yes'}")
+    print(f"⚙️ Config: {args.config}")
+    print()
+
+    pipeline = DocumentationPipeline(args.config)
+    state = pipeline.merge_shards(
+        repo_path,
+        shard_paths,
+        output_path=output_path,
+        docs_path=docs_path,
+        guide=not args.no_guide,
+    )
+
+    failed = len([r for r in state.results if not r.success])
+    print("\n" + "=" * 50)
+    print("✅ Shards Merged!")
+    if failed > 0:
+        print(
+            "⚠️  Some files failed to process. Check the documentation report for details."
+        )
+
+
 def run_documentation_generation(args):
     """Run the main documentation generation pipeline."""
 
@@ -517,6 +911,8 @@ def run_documentation_generation(args):
     if args.output_path:
         output_path = Path(args.output_path)
 
+    shard = parse_shard(args.shard) if args.shard else None
+
     # Initialize pipeline
     print(f"📁 Repository: {repo_path}")
     print(f"📚 Existing docs: {docs_path if docs_path else 'None'}")
@@ -527,7 +923,11 @@ def run_documentation_generation(args):
     print(f"🎨 Design docs: {'Yes' if args.design_docs else 'No'}")
     print(f"🎯 Documentation guide: {'Yes' if args.guide else 'No'}")
     print(f"🔄 Force full guide regeneration: {'Yes' if args.force_full_guide else 'No'}")
+    print(f"🌿 Git changes since: {args.since if args.since else 'No (check all files)'}")
     print(f"🧹 Cleanup mode: {'Yes' if args.cleanup else 'No'}")
+    print(f"⏯️ Resume interrupted run: {'Yes' if args.resume else 'No'}")
+    if shard:
+        print(f"🧩 Shard: {shard[0]} of {shard[1]}")
     print(f"⚙️ Config: {args.config}")
     print()
 
@@ -548,6 +948,9 @@ def run_documentation_generation(args):
             design_docs=args.design_docs,
             guide=args.guide,
             force_full_guide=args.force_full_guide,
+            since=args.since,
+            resume=args.resume,
+            shard=shard,
         )
 
         # Extract results from the LangGraph state dict
@@ -0,0 +1,244 @@
+import contextvars
+import hashlib
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+from .models import CodeChunk, CodeFile
+from .prompts.document_code_chunk_system_message import DOCUMENT_CODE_CHUNK_SYSTEM_MESSAGE
+from .prompts.merge_chunk_documentation_system_message import (
+    MERGE_CHUNK_DOCUMENTATION_SYSTEM_MESSAGE,
+)
+from .prompts.merge_partial_documentation_system_message import (
+    MERGE_PARTIAL_DOCUMENTATION_SYSTEM_MESSAGE,
+)
+from .telemetry import llm_call_metadata
+from .utilities.code_chunker import split_code
+
+
+class ChunkCache:
+    """Stores the documentation of individual chunks on disk.
+
+    Entries are keyed by a digest of everything that goes into the chunk
+    prompt, so an unchanged chunk is never documented twice, even when other
+    parts of its file changed.
+    """
+
+    def __init__(self, output_path: Path):
+        self.cache_dir = output_path / ".documentation_state" / "chunk_cache"
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            with open(self._entry_path(key), "r", encoding="utf-8") as f:
+                return json.load(f)["documentation"]
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable chunk cache entry {key}: {e}")
+            return None
+
+    def put(self, key: str, documentation: str) -> None:
+        entry_path = self._entry_path(key)
+        try:
+            entry_path.parent.mkdir(parents=True, exist_ok=True)
+
+            # Atomic write to prevent corruption
+            temp_file = entry_path.with_suffix(".tmp")
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump({"documentation": documentation}, f)
+
+            temp_file.replace(entry_path)
+        except Exception as e:
+            self.logger.error(f"Failed to save chunk cache entry {key}: {e}")
+
+
+class ChunkedDocumenter:
+    """Documents files that are too large for one prompt with a map-reduce over chunks.
+
+    The file is split at definition boundaries, each chunk is documented in
+    parallel (reusing cached chunk documentation), and the chunk documentation
+    is merged into a single document for the file.
+    """
+
+    def __init__(self, config, llm, count_tokens: Callable[[str], int]):
+        self.config = config
+        self.llm = llm
+        self.count_tokens = count_tokens
+        self.logger = logging.getLogger(__name__)
+
+        self.threshold = config.token_limits.get("file_chunk_threshold", 24000)
+        self.chunk_size = config.token_limits.get("file_chunk_size", 8000)
+        self.workers = max(1, config.processing.get("chunk_workers", 4))
+
+    def needs_chunking(self, content: str) -> bool:
+        """Check whether a file is too large to document in a single prompt."""
+        # A string never has more tokens than characters, so most files are
+        # ruled out without encoding them
+        if len(content) <= self.threshold:
+            return False
+        return self.count_tokens(content) > self.threshold
+
+    def document(self, code_file: CodeFile, content: str, context: str, output_path: Path) -> str:
+        """Generate documentation for a large file.
+
+        Args:
+            code_file: File being documented
+            content: File content
+            context: Existing documentation context, used in the merge step
+            output_path: Documentation output path holding the chunk cache
+
+        Returns:
+            Documentation text for the whole file
+        """
+        chunks = split_code(content, code_file.extension, self.chunk_size, self.count_tokens)
+        cache = ChunkCache(output_path)
+        self.logger.info(f"Large file {code_file.relative_path}, documenting {len(chunks)} chunks")
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            # Each call runs in a copy of this thread's context, which keeps
+            # the graph node the calls are attributed to in telemetry
+            futures = [
+                executor.submit(contextvars.copy_context().run, self._document_chunk, code_file, chunk, cache)
+                for chunk in chunks
+            ]
+            parts = [future.result() for future in futures]
+
+        if len(parts) == 1:
+            return parts[0]
+        return self._merge(code_file, parts, context)
+
+    def _document_chunk(self, code_file: CodeFile, chunk: CodeChunk, cache: ChunkCache) -> str:
+        """Document one chunk, or return its cached documentation."""
+        model_name = self.config.model.get("name", "")
+        key = ChunkCache.make_key(
+            model_name,
+            DOCUMENT_CODE_CHUNK_SYSTEM_MESSAGE,
+            code_file.relative_path,
+            chunk.name,
+            chunk.content,
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            self.logger.debug(f"Reusing cached documentation for {code_file.relative_path}: {chunk.name}")
+            return self._label(chunk, cached)
+
+        language = code_file.extension[1:] if code_file.extension else "text"
+        documentation = self._invoke(
+            "chunk_documentation",
+            f"{code_file.relative_path}: {chunk.name}",
+            [
+                SystemMessage(
+                    content=DOCUMENT_CODE_CHUNK_SYSTEM_MESSAGE.format(
+                        current_file_extension=code_file.extension or "text",
+                        current_file_relative_path=code_file.relative_path,
+                        chunk_name=chunk.name,
+                    )
+                ),
+                HumanMessage(
+                    content=f"Document this part of the file:\n\n```{language}\n{chunk.content}\n```"
+                ),
+            ]
+        )
+        cache.put(key, documentation)
+        return self._label(chunk, documentation)
+
+    @staticmethod
+    def _label(chunk: CodeChunk, documentation: str) -> str:
+        return f"### Part {chunk.index + 1}: {chunk.name} (lines {chunk.start_line}-{chunk.end_line})\n\n{documentation}"
+
+    def _merge(self, code_file: CodeFile, parts: List[str], context: str) -> str:
+        """Merge chunk documentation, combining groups first if it is too long for one prompt."""
+        while len(parts) > 1 and self.count_tokens("\n\n".join(parts)) > self.threshold:
+            groups = self._group_parts(parts)
+            if len(groups) == len(parts):
+                # Every part is already as large as a group can be
+                break
+            self.logger.info(
+                f"Combining {len(parts)} chunk documents into {len(groups)} for {code_file.relative_path}"
+            )
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = [
+                    executor.submit(contextvars.copy_context().run, self._combine_group, code_file, group)
+                    for group in groups
+                ]
+                parts = [future.result() for future in futures]
+
+        return self._invoke(
+            "chunk_merge",
+            code_file.relative_path,
+            [
+                SystemMessage(
+                    content=MERGE_CHUNK_DOCUMENTATION_SYSTEM_MESSAGE.format(
+                        context=context,
+                        current_file_extension=code_file.extension or "text",
+                        current_file_relative_path=code_file.relative_path,
+                    )
+                ),
+                HumanMessage(
+                    content="Merge the documentation of these parts:\n\n" + "\n\n".join(parts)
+                ),
+            ]
+        )
+
+    def _group_parts(self, parts: List[str]) -> List[List[str]]:
+        """Group consecutive parts so each group fits in one prompt."""
+        groups = []
+        current: List[str] = []
+        current_tokens = 0
+        for part in parts:
+            tokens = self.count_tokens(part)
+            if current and current_tokens + tokens > self.chunk_size:
+                groups.append(current)
+                current, current_tokens = [], 0
+            current.append(part)
+            current_tokens += tokens
+        if current:
+            groups.append(current)
+        return groups
+
+    def _combine_group(self, code_file: CodeFile, group: List[str]) -> str:
+        if len(group) == 1:
+            return group[0]
+        return self._invoke(
+            "chunk_merge",
+            code_file.relative_path,
+            [
+                SystemMessage(
+                    content=MERGE_PARTIAL_DOCUMENTATION_SYSTEM_MESSAGE.format(
+                        current_file_extension=code_file.extension or "text",
+                        current_file_relative_path=code_file.relative_path,
+                    )
+                ),
+                HumanMessage(content="Combine the documentation of these parts:\n\n" + "\n\n".join(group)),
+            ]
+        )
+
+    def _invoke(self, call_site: str, subject: str, messages: List[BaseMessage]) -> str:
+        response = self.llm.invoke(
+            messages,
+            config={
+                "recursion_limit": self.config.model.get("recursion_limit", 50),
+                "metadata": llm_call_metadata(call_site, subject),
+            },
+        )
+
+        # Handle different response types
+        if hasattr(response, "content"):
+            return response.content
+        return str(response)
@@ -1,7 +1,12 @@
+import heapq
 import os
-from typing import List
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Iterator, List, Optional, Tuple
 from pathlib import Path
 from .models import CodeFile, PipelineConfig
+from .scan_index import ScanIndex
+from .utilities.file_reader import read_text_file
+from .utilities.path_matcher import PathMatcher
 
 
 class CodeAnalyzer:
@@ -10,108 +15,250 @@ class CodeAnalyzer:
     def __init__(self, config: PipelineConfig):
         self.config = config
     
-    def scan_repository(self, repo_path: Path) -> List[CodeFile]:
-        """Scan repository and return list of code files to document."""
+    def scan_repository(
+        self, repo_path: Path, max_files: Optional[int] = None, scan_index: Optional[ScanIndex] = None
+    ) -> List[CodeFile]:
+        """Scan repository and return list of code files to document.
+
+        Directories matching an exclude pattern are pruned before they are
+        descended into, and subdirectory listings are fetched in parallel.
+        File content is not read here; use ``read_content`` when it is needed.
+        When a ``scan_index`` is given each file's content digest is filled in,
+        reusing stored digests for files whose stat signature is unchanged.
+        When ``max_files`` is given the walk stops as soon as that many files
+        have been found, yielding the same files as sorting the full result
+        and slicing it.
+        """
+        with ThreadPoolExecutor(max_workers=self._get_scan_workers()) as executor:
+            code_files = list(self.iter_repository(repo_path, max_files=max_files, executor=executor))
+            if scan_index is not None:
+                self._fill_digests(executor, code_files, scan_index)
+
+        return code_files
+
+    def iter_repository(
+        self,
+        repo_path: Path,
+        max_files: Optional[int] = None,
+        executor: Optional[ThreadPoolExecutor] = None,
+    ) -> Iterator[CodeFile]:
+        """Yield code files in sorted order as the repository walk reaches them.
+
+        This lets later stages start on the first files while the rest of
+        the tree is still being listed. Digests are not filled in.
+        """
         if not repo_path.exists() or not repo_path.is_dir():
             raise ValueError(f"Repository path does not exist or is not a directory: {repo_path}")
         
-        code_files = []
+        if executor is None:
+            with ThreadPoolExecutor(max_workers=self._get_scan_workers()) as own_executor:
+                yield from self.iter_repository(repo_path, max_files, own_executor)
+            return
+
         supported_extensions = self.config.file_processing.get("supported_extensions", [])
-        exclude_patterns = self.config.file_processing.get("exclude_patterns", [])
-        
-        for file_path in repo_path.rglob('*'):
-            if self._should_include_file(file_path, supported_extensions, exclude_patterns):
-                try:
-                    content = self._read_code_file(file_path)
-                    relative_path = str(file_path.relative_to(repo_path))
-                    
-                    code_file = CodeFile(
-                        path=file_path,
-                        content=content,
-                        extension=file_path.suffix,
-                        relative_path=relative_path
-                    )
-                    code_files.append(code_file)
-                    
-                except Exception as e:
-                    print(f"Warning: Could not read {file_path}: {e}")
-        
-        return sorted(code_files, key=lambda x: x.relative_path)
-    
-    def _should_include_file(self, file_path: Path, supported_extensions: List[str], exclude_patterns: List[str]) -> bool:
-        """Check if a file should be included in documentation generation."""
+        matcher = self.create_path_matcher(repo_path)
+
+        found = 0
+        walker = self._walk_repository(repo_path, executor, matcher)
         try:
-            # See if the file is acecssible first
-            if not file_path.exists():
-                return False
-            
-            if not file_path.is_file():
-                return False
-        except OSError:
-            return False
-        
-        # Check file extension
-        if supported_extensions and file_path.suffix not in supported_extensions:
+            for entry, relative_path in walker:
+                if not self._should_include_entry(entry, relative_path, supported_extensions, matcher):
+                    continue
+                # DirEntry caches the stat result from the include check
+                yield self._create_code_file(Path(entry.path), relative_path, entry.stat())
+                found += 1
+                if max_files and found >= max_files:
+                    break
+        finally:
+            walker.close()
+
+    def scan_paths(
+        self, repo_path: Path, relative_paths: List[str], scan_index: Optional[ScanIndex] = None
+    ) -> List[CodeFile]:
+        """Return code files for specific repository-relative paths without walking the tree.
+
+        Paths are filtered with the same extension, exclude pattern and
+        empty-file rules as ``scan_repository``; missing paths are skipped.
+        """
+        supported_extensions = self.config.file_processing.get("supported_extensions", [])
+        matcher = self.create_path_matcher(repo_path)
+
+        code_files = []
+        for relative_path in sorted(set(relative_paths)):
+            file_path = repo_path / relative_path
+            if supported_extensions and file_path.suffix not in supported_extensions:
+                continue
+            if matcher.is_path_excluded(relative_path):
+                continue
+            try:
+                stat_result = file_path.stat()
+            except OSError:
+                continue
+            if not file_path.is_file() or stat_result.st_size == 0:
+                continue
+            code_files.append(self._create_code_file(file_path, relative_path, stat_result))
+
+        if scan_index is not None and code_files:
+            with ThreadPoolExecutor(max_workers=self._get_scan_workers()) as executor:
+                self._fill_digests(executor, code_files, scan_index)
+
+        return code_files
+
+    def _fill_digests(self, executor: ThreadPoolExecutor, code_files: List[CodeFile], scan_index: ScanIndex) -> None:
+        """Set each file's content digest from the scan index, hashing in parallel."""
+        digests = executor.map(self.get_file_digest, code_files, [scan_index] * len(code_files))
+        for code_file, digest in zip(code_files, digests):
+            code_file.file_hash = digest
+
+    def get_file_digest(self, code_file: CodeFile, scan_index: ScanIndex) -> Optional[str]:
+        """Get a file's content digest from the scan index."""
+        try:
+            return scan_index.get_digest(code_file)
+        except OSError as e:
+            print(f"Warning: Could not hash {code_file.path}: {e}")
+            return None
+
+    def create_path_matcher(self, repo_path: Path) -> PathMatcher:
+        """Create the exclude pattern matcher for a repository."""
+        return PathMatcher.from_config(self.config, repo_path)
+
+    def _get_scan_workers(self) -> int:
+        """Get the number of threads used to list directories in parallel."""
+        workers = self.config.processing.get("scan_workers")
+        if workers and workers > 0:
+            return workers
+        return min(32, (os.cpu_count() or 1) + 4)
+
+    def _walk_repository(
+        self, repo_path: Path, executor: ThreadPoolExecutor, matcher: PathMatcher
+    ) -> Iterator[Tuple[os.DirEntry, str]]:
+        """Yield ``(entry, relative_path)`` for every file under the repository.
+
+        Entries are yielded in the order of their relative path strings. The
+        listings of a directory's subdirectories are submitted to the executor
+        as soon as the directory itself is read, so they are usually ready by
+        the time the walk reaches them.
+        """
+        pending = [(executor.submit(self._list_directory, str(repo_path)), "")]
+        try:
+            while pending:
+                item, relative_path = pending.pop()
+                if not isinstance(item, Future):
+                    yield item, relative_path
+                    continue
+
+                children = []
+                for entry, is_dir in item.result():
+                    child_path = f"{relative_path}{entry.name}"
+                    if is_dir:
+                        if matcher.is_excluded(child_path, is_dir=True):
+                            continue
+                        listing = executor.submit(self._list_directory, entry.path)
+                        children.append((f"{entry.name}{os.sep}", listing, child_path + os.sep))
+                    else:
+                        children.append((entry.name, entry, child_path))
+
+                # Sorting directories as "name/" keeps the depth-first walk in
+                # the same order as sorting the full relative paths
+                children.sort(key=lambda child: child[0])
+                for _, child, child_path in reversed(children):
+                    pending.append((child, child_path))
+        finally:
+            for item, _ in pending:
+                if isinstance(item, Future):
+                    item.cancel()
+
+    def _list_directory(self, directory: str) -> List[Tuple[os.DirEntry, bool]]:
+        """List a single directory, returning each entry with whether it is a directory."""
+        entries = []
+        try:
+            with os.scandir(directory) as iterator:
+                for entry in iterator:
+                    try:
+                        # Symlinked directories are not followed to avoid cycles
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    entries.append((entry, is_dir))
+        except OSError as e:
+            print(f"Warning: Could not list {directory}: {e}")
+        return entries
+
+    def _should_include_entry(
+        self, entry: os.DirEntry, relative_path: str, supported_extensions: List[str], matcher: PathMatcher
+    ) -> bool:
+        """Check if a directory entry should be included in documentation generation."""
+        # Check file extension first, it needs no system calls
+        if supported_extensions and os.path.splitext(entry.name)[1] not in supported_extensions:
             return False
         
         # Check exclude patterns
-        file_str = str(file_path)
-        for pattern in exclude_patterns:
-            if pattern in file_str:
+        if matcher.is_excluded(relative_path):
+            return False
+
+        try:
+            if not entry.is_file():
                 return False
         
-        # Skip empty files
-        try:
-            if file_path.stat().st_size == 0:
+            # Skip empty files
+            if entry.stat().st_size == 0:
                 return False
         except OSError:
             return False
         
         return True
     
+    def _create_code_file(self, file_path: Path, relative_path: str, stat_result: os.stat_result) -> CodeFile:
+        """Create a CodeFile from a stat result without reading its content."""
+        return CodeFile(
+            path=file_path,
+            extension=file_path.suffix,
+            relative_path=relative_path,
+            size=stat_result.st_size,
+            mtime_ns=stat_result.st_mtime_ns,
+            inode=stat_result.st_ino,
+        )
+
+    def read_content(self, code_file: CodeFile) -> str:
+        """Return the content of a code file, reading it from disk if it was not preloaded.
+
+        The content is not cached on the CodeFile, so callers hold it only for
+        as long as they need it.
+        """
+        if code_file.content is not None:
+            return code_file.content
+        return self._read_code_file(code_file.path)
+
     def _read_code_file(self, file_path: Path) -> str:
-        """Read content from a code file."""
-        encodings = ['utf-8', 'utf-16', 'cp1252', 'iso-8859-1']
-        
-        for encoding in encodings:
-            try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    return f.read()
-            except UnicodeDecodeError:
-                continue
-        
-        # If all encodings fail, try binary mode with error handling
-        with open(file_path, 'rb') as f:
-            return f.read().decode('utf-8', errors='ignore')
+        """Read content from a code file, raising BinaryFileError for binary files."""
+        return read_text_file(file_path)
     
     def analyze_file_structure(self, code_files: List[CodeFile]) -> dict:
-        """Analyze the structure of code files for better documentation context."""
-        structure = {
-            "total_files": len(code_files),
-            "by_extension": {},
-            "by_directory": {},
-            "largest_files": []
-        }
-        
-        # Group by extension
+        """Analyze the structure of code files for better documentation context.
+
+        All statistics are gathered in a single pass over the files.
+        """
+        by_extension = {}
+        by_directory = {}
+        largest = []
+
         for code_file in code_files:
             ext = code_file.extension
-            if ext not in structure["by_extension"]:
-                structure["by_extension"][ext] = 0
-            structure["by_extension"][ext] += 1
-        
-        # Group by directory
-        for code_file in code_files:
+            by_extension[ext] = by_extension.get(ext, 0) + 1
+
             directory = str(Path(code_file.relative_path).parent)
-            if directory not in structure["by_directory"]:
-                structure["by_directory"][directory] = 0
-            structure["by_directory"][directory] += 1
-        
-        # Find largest files
-        structure["largest_files"] = sorted(
-            [(cf.relative_path, len(cf.content)) for cf in code_files],
-            key=lambda x: x[1],
-            reverse=True
-        )[:10]
-        
-        return structure
+            by_directory[directory] = by_directory.get(directory, 0) + 1
+
+            # Keep only the ten largest files in a min-heap
+            entry = (code_file.size, code_file.relative_path)
+            if len(largest) < 10:
+                heapq.heappush(largest, entry)
+            else:
+                heapq.heappushpop(largest, entry)
+
+        return {
+            "total_files": len(code_files),
+            "by_extension": by_extension,
+            "by_directory": by_directory,
+            "largest_files": [(path, size) for size, path in sorted(largest, reverse=True)],
+        }
@@ -46,7 +46,9 @@ class ConfigManager:
         model_config = config.model.copy()
         
         provider = model_config.get("provider", "openai")
-        model_config["api_key"] = self.get_api_key(provider)
+        # The offline fake provider needs no API key
+        if provider != "fake":
+            model_config["api_key"] = self.get_api_key(provider)
         
         # Add Azure-specific configuration if needed
         if provider == "azure_openai":
@@ -6,6 +6,7 @@ from langchain_core.prompts import ChatPromptTemplate
 from .prompts.summarize_docs_system_message import SUMMARIZE_DOCS_SYSTEM_MESSAGE
 
 from .models import PipelineConfig, PipelineState, DocumentationContext, DocumentationGuide
+from .telemetry import llm_call_metadata
 
 
 class ContextManager:
@@ -110,7 +111,10 @@ class ContextManager:
                 messages = summarization_prompt.format_messages(chunk=chunk)                
                 response = self.llm.invoke(
                     messages,
-                    config={"recursion_limit": self.config.model.get("recursion_limit", 50)},
+                    config={
+                        "recursion_limit": self.config.model.get("recursion_limit", 50),
+                        "metadata": llm_call_metadata("summarize_docs", f"chunk {i+1}/{len(chunks)}"),
+                    },
                 )
 
                 # Handle different response types
@@ -0,0 +1,224 @@
+import heapq
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import tiktoken
+
+from .models import CodeFile, PipelineConfig
+from .prompts.generate_file_documentation_system_message import (
+    GENERATED_FILE_DOCUMENTATION_HUMAN_MESSAGE,
+    GENERATED_FILE_DOCUMENTATION_SYSTEM_MESSAGE,
+)
+from .utilities.file_reader import BinaryFileError, read_text_file
+from .utilities.token_manager import get_encoding
+
+# Files are read and encoded in batches to bound memory on large repositories
+ENCODE_BATCH_SIZE = 512
+
+# Used when the configured model has no known tiktoken encoding
+DEFAULT_ENCODING = "cl100k_base"
+
+# Tokens added to each chat message for its role and separators
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+class CostEstimator:
+    """Projects tokens, cost and wall time of documenting a set of code files."""
+
+    def __init__(self, config: PipelineConfig):
+        self.config = config
+        self.estimation = config.estimation
+        self.logger = logging.getLogger(__name__)
+        self.encoding = self._get_encoding(
+            config.model.get("name", ""), approximate=config.model.get("provider") == "fake"
+        )
+
+    @staticmethod
+    def _get_encoding(model_name: str, approximate: bool = False):
+        """Get the tiktoken encoding used by the configured model.
+
+        The fake provider, and a machine that cannot load the encoding data,
+        get an estimate of four characters per token instead.
+        """
+        if not approximate:
+            try:
+                return tiktoken.encoding_for_model(model_name)
+            except Exception:
+                # Unknown model, or the encoding data could not be loaded
+                pass
+        return get_encoding(DEFAULT_ENCODING, approximate=approximate)
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.encoding.encode_ordinary(text))
+
+    def estimate(
+        self,
+        code_files: List[CodeFile],
+        context: str = "",
+        concurrency: Optional[int] = None,
+    ) -> dict:
+        """Project the token usage, cost and wall time of documenting ``code_files``.
+
+        Files are read in parallel and encoded in batches with tiktoken's
+        multi-threaded batch encoder; all totals are accumulated in the same
+        pass over the results.
+
+        Args:
+            code_files: Files that would be documented
+            context: Existing documentation context prepended to every prompt
+            concurrency: Number of parallel LLM requests (default: from config)
+
+        Returns:
+            Dictionary with overall totals, per-extension and per-directory
+            totals, and the most expensive files
+        """
+        if concurrency is None:
+            concurrency = self.config.processing.get("concurrency", 1)
+        concurrency = max(1, concurrency or 1)
+
+        input_cost = self.estimation.get("input_cost_per_million", 0.0) / 1_000_000
+        output_cost = self.estimation.get("output_cost_per_million", 0.0) / 1_000_000
+        completion_ratio = self.estimation.get("completion_ratio", 0.5)
+        min_completion = self.estimation.get("min_completion_tokens", 300)
+        max_completion = self.config.model.get("max_tokens") or float("inf")
+        request_overhead = self.estimation.get("request_overhead_seconds", 1.0)
+        output_rate = self.estimation.get("output_tokens_per_second", 50)
+
+        context_tokens = self.count_tokens(context) if context else 0
+        prompt_overhead = self._prompt_overhead_tokens(context_tokens)
+
+        totals = _TokenTotals()
+        by_extension: Dict[str, _TokenTotals] = {}
+        by_directory: Dict[str, _TokenTotals] = {}
+        largest: List[tuple] = []
+        unreadable = 0
+        durations: List[float] = []
+
+        workers = min(32, (os.cpu_count() or 1) + 4)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for start in range(0, len(code_files), ENCODE_BATCH_SIZE):
+                batch = code_files[start:start + ENCODE_BATCH_SIZE]
+                texts = list(executor.map(self._read_for_estimate, batch))
+                # Path and extension are formatted into the prompt as well, so
+                # they are encoded in the same batch as the contents
+                encoded = self.encoding.encode_ordinary_batch(
+                    [text or "" for text in texts]
+                    + [f"{cf.extension} {cf.relative_path}" for cf in batch],
+                    num_threads=workers,
+                )
+                token_counts = [len(tokens) for tokens in encoded]
+
+                for code_file, text, file_tokens, path_tokens in zip(
+                    batch, texts, token_counts, token_counts[len(batch):]
+                ):
+                    if text is None:
+                        unreadable += 1
+                        continue
+
+                    prompt_tokens = prompt_overhead + file_tokens + path_tokens
+                    completion_tokens = int(
+                        min(max_completion, max(min_completion, file_tokens * completion_ratio))
+                    )
+                    cost = prompt_tokens * input_cost + completion_tokens * output_cost
+
+                    totals.add(file_tokens, prompt_tokens, completion_tokens, cost)
+                    extension = code_file.extension or "(no extension)"
+                    by_extension.setdefault(extension, _TokenTotals()).add(
+                        file_tokens, prompt_tokens, completion_tokens, cost
+                    )
+                    directory = str(Path(code_file.relative_path).parent)
+                    by_directory.setdefault(directory, _TokenTotals()).add(
+                        file_tokens, prompt_tokens, completion_tokens, cost
+                    )
+
+                    entry = (prompt_tokens, code_file.relative_path, completion_tokens, cost)
+                    if len(largest) < 10:
+                        heapq.heappush(largest, entry)
+                    else:
+                        heapq.heappushpop(largest, entry)
+
+                    durations.append(request_overhead + completion_tokens / output_rate)
+
+        sequential_seconds = sum(durations)
+        return {
+            "encoding": self.encoding.name,
+            "files": totals.files,
+            "unreadable_files": unreadable,
+            "context_tokens": context_tokens,
+            "totals": totals.as_dict(),
+            "by_extension": {key: value.as_dict() for key, value in by_extension.items()},
+            "by_directory": {key: value.as_dict() for key, value in by_directory.items()},
+            "most_expensive_files": [
+                {
+                    "relative_path": relative_path,
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "cost": cost,
+                }
+                for prompt_tokens, relative_path, completion_tokens, cost in sorted(largest, reverse=True)
+            ],
+            "concurrency": concurrency,
+            "sequential_seconds": sequential_seconds,
+            "wall_seconds": self._makespan(durations, concurrency),
+        }
+
+    def _prompt_overhead_tokens(self, context_tokens: int) -> int:
+        """Tokens every prompt has besides the file content, path and extension."""
+        system_template = GENERATED_FILE_DOCUMENTATION_SYSTEM_MESSAGE.format(context="")
+        human_template = GENERATED_FILE_DOCUMENTATION_HUMAN_MESSAGE.format(
+            current_file_extension="", current_file_relative_path="", language="", content=""
+        )
+        return (
+            self.count_tokens(system_template)
+            + self.count_tokens(human_template)
+            + context_tokens
+            + 2 * MESSAGE_OVERHEAD_TOKENS
+        )
+
+    def _read_for_estimate(self, code_file: CodeFile) -> Optional[str]:
+        try:
+            return read_text_file(code_file.path)
+        except (BinaryFileError, OSError):
+            return None
+
+    @staticmethod
+    def _makespan(durations: List[float], concurrency: int) -> float:
+        """Wall time of running the requests longest-first on ``concurrency`` workers."""
+        if not durations:
+            return 0.0
+        workers = [0.0] * min(concurrency, len(durations))
+        for duration in sorted(durations, reverse=True):
+            heapq.heapreplace(workers, workers[0] + duration)
+        return max(workers)
+
+
+class _TokenTotals:
+    """Running token and cost totals for a group of files."""
+
+    __slots__ = ("files", "file_tokens", "prompt_tokens", "completion_tokens", "cost")
+
+    def __init__(self):
+        self.files = 0
+        self.file_tokens = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost = 0.0
+
+    def add(self, file_tokens: int, prompt_tokens: int, completion_tokens: int, cost: float) -> None:
+        self.files += 1
+        self.file_tokens += file_tokens
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.cost += cost
+
+    def as_dict(self) -> dict:
+        return {
+            "files": self.files,
+            "file_tokens": self.file_tokens,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cost": self.cost,
+        }
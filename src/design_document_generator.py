@@ -23,6 +23,8 @@ from .models import (
     DesignDocumentationState,
     DocumentationContext,
 )
+from .response_stream import is_truncated
+from .telemetry import llm_call_metadata
 
 class DesignDocumentGenerator:
     """Handles generation of comprehensive design documentation."""
@@ -31,7 +33,7 @@ class DesignDocumentGenerator:
         self.llm = llm
         self.config = config
         self.doc_processor = doc_processor
-        self.token_counter = TokenCounter()
+        self.token_counter = TokenCounter(approximate=config.model.get("provider") == "fake")
 
     def initialize_design_documents(self, state: PipelineState) -> Dict[str, Any]:
         """Initialize the design documentation state with configured documents."""
@@ -182,7 +184,15 @@ class DesignDocumentGenerator:
                 prompt = self._create_section_prompt(document, section, context)
 
                 # Generate content
-                response = llm_with_tools.invoke(prompt, max_tokens=section.max_tokens)
+                response = llm_with_tools.invoke(
+                    prompt,
+                    config={
+                        "metadata": llm_call_metadata(
+                            "design_section", f"{document.name}: {section.name}", attempt
+                        )
+                    },
+                    max_tokens=section.max_tokens,
+                )
 
                 if hasattr(response, "content"):
                     content = response.content
@@ -190,7 +200,7 @@ class DesignDocumentGenerator:
                     content = str(response)
 
                 # Check if content was truncated
-                if self._is_content_truncated(content, section.max_tokens):
+                if self._is_content_truncated(content, section.max_tokens, response):
                     retry_config = self.config.retry_config
                     if retry_config.get("retry_on_truncation", True):
                         print(
@@ -236,8 +246,16 @@ class DesignDocumentGenerator:
             ),
         ]
 
-    def _is_content_truncated(self, content: str, max_tokens: int) -> bool:
-        """Check if content appears to be truncated."""
+    def _is_content_truncated(self, content: str, max_tokens: int, response=None) -> bool:
+        """Check if content was truncated.
+
+        The finish reason the provider reported with the response decides
+        when there is one; otherwise the content is checked with a heuristic.
+        """
+        truncated = is_truncated(response)
+        if truncated is not None:
+            return truncated
+
         # Simple heuristic: if content ends abruptly without proper conclusion
         content = content.strip()
 
@@ -294,7 +312,15 @@ class DesignDocumentGenerator:
         try:
             # Bind tools to LLM for continuation as well
             llm_with_tools = self.llm.bind_tools(tools)
-            response = llm_with_tools.invoke(prompt, max_tokens=section.max_tokens // 2)
+            response = llm_with_tools.invoke(
+                prompt,
+                config={
+                    "metadata": llm_call_metadata(
+                        "design_continuation", f"{document.name}: {section.name}"
+                    )
+                },
+                max_tokens=section.max_tokens // 2,
+            )
 
             if hasattr(response, "content"):
                 continuation = response.content
@@ -367,7 +393,10 @@ class DesignDocumentGenerator:
         )
 
         try:
-            response = self.llm.invoke(assembly_prompt.format_messages())
+            response = self.llm.invoke(
+                assembly_prompt.format_messages(),
+                config={"metadata": llm_call_metadata("design_assembly", document.name)},
+            )
 
             if hasattr(response, "content"):
                 return response.content
@@ -397,8 +426,11 @@ class DesignDocumentGenerator:
 
 """
 
-        with open(file_path, "w", encoding="utf-8") as f:
+        # Atomic write so an interrupted run never leaves half a document behind
+        temp_file = file_path.with_suffix(".tmp")
+        with open(temp_file, "w", encoding="utf-8") as f:
             f.write(header + content)
+        temp_file.replace(file_path)
 
         document.file_path = file_path
         print(f"  ✓ Saved design document: {file_path}")
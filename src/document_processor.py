@@ -1,7 +1,8 @@
-import tiktoken
 from typing import List, Tuple, Optional
 from pathlib import Path
 from .models import DocumentationContext, PipelineConfig
+from .utilities.file_reader import read_text_file
+from .utilities.token_manager import get_encoding
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document
 
@@ -11,7 +12,9 @@ class DocumentProcessor:
     
     def __init__(self, config: PipelineConfig):
         self.config = config
-        self.encoding = tiktoken.get_encoding("cl100k_base")  # GPT-4 encoding
+        self.encoding = get_encoding(
+            "cl100k_base", approximate=config.model.get("provider") == "fake"
+        )  # GPT-4 encoding
         
     def count_tokens(self, text: str) -> int:
         """Count the number of tokens in a text string."""
@@ -46,19 +49,8 @@ class DocumentProcessor:
         )
     
     def _read_file_content(self, file_path: Path) -> str:
-        """Read content from a file, handling different encodings."""
-        encodings = ['utf-8', 'utf-16', 'cp1252', 'iso-8859-1']
-        
-        for encoding in encodings:
-            try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    return f.read()
-            except UnicodeDecodeError:
-                continue
-        
-        # If all encodings fail, try binary mode and decode with errors='ignore'
-        with open(file_path, 'rb') as f:
-            return f.read().decode('utf-8', errors='ignore')
+        """Read content from a file, handling different encodings and rejecting binary files."""
+        return read_text_file(file_path)
     
     def needs_summarization(self, docs: DocumentationContext) -> bool:
         """Check if documentation needs summarization based on token count."""
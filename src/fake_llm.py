@@ -0,0 +1,365 @@
+"""
+Offline Fake LLM
+
+A chat model that answers without a network connection, for benchmarking
+the pipeline and for CI. Select it with ``model.provider: fake``; it gets
+the response cache, rate limits, telemetry, streaming, hedging and routing
+hooks like any other provider, so a run exercises the same code paths as a
+real one.
+
+Answers are deterministic: the randomness of a call is seeded from the
+configured seed, the request text and how often that same request was seen
+before, so a retried request can get a different outcome while two runs over
+the same repository produce the same output. Each call site gets an answer
+of the shape it parses (call sites are read from the ``call_site`` invoke
+metadata):
+
+- file documentation: markdown naming the file and its definitions
+- packed file documentation: one marked section per file in the request
+- MCP file relevance, file discovery and feature synthesis: JSON built from
+  the entries of the documentation guide in the prompt
+- everything else: markdown
+
+The completion length is proportional to the prompt, latency is a time to
+first token plus the completion length over a token throughput, and
+configurable shares of calls fail with a server error, are rejected with a
+429 or, for JSON call sites, return malformed JSON or miss required fields.
+Token counts are estimated at four characters per token so no tokenizer
+data has to be downloaded; the pipeline's own token counters use the same
+estimate with this provider.
+"""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+_CHARS_PER_TOKEN = 4
+# Completion tokens sent per streamed chunk
+_STREAM_CHUNK_TOKENS = 8
+
+_RELATIVE_PATH_PATTERN = re.compile(r"^Relative path: (.+)$", re.MULTILINE)
+_DEFINITION_PATTERN = re.compile(
+    r"^\s*(?:export\s+)?(?:async\s+)?(?:def|class|function|func|fn|interface|struct|type)\s+([A-Za-z_]\w*)",
+    re.MULTILINE,
+)
+_GUIDE_ENTRY_PATTERN = re.compile(
+    r"^### (?P<source>.+?)\n\n\*\*Documentation:\*\* `(?P<doc>.+?)`\n\n\*\*Summary:\*\* (?P<summary>.+?)$",
+    re.MULTILINE,
+)
+_CODE_BLOCK_PATTERN = re.compile(r"^```[^\n]*\n(.*?)^```", re.MULTILINE | re.DOTALL)
+_LOADED_FILE_PATTERN = re.compile(r"^=== Content from (.+?) ===$", re.MULTILINE)
+_QUERY_PATTERN = re.compile(
+    r"^(?:USER QUERY|FEATURE TO UNDERSTAND|USER'S FEATURE QUESTION): (.+)$", re.MULTILINE
+)
+_WORD_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]{2,}")
+
+_VOCABULARY = (
+    "the module handles configuration state requests files data results values "
+    "errors input output processing each function returns a list of entries and "
+    "updates the cache when the caller passes an option that controls how records "
+    "are read validated and written back to disk"
+).split()
+
+# Fields the MCP feature synthesis answer must contain
+_SYNTHESIS_FIELDS = [
+    "feature_description",
+    "comprehensive_answer",
+    "key_components",
+    "implementation_details",
+    "usage_examples",
+    "related_concepts",
+]
+
+
+class FakeLLMError(Exception):
+    """A server error injected by the fake LLM."""
+
+    def __init__(self, message: str, status_code: int = 500):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class FakeRateLimitError(FakeLLMError):
+    """A 429 injected by the fake LLM that was still rejected after its retries."""
+
+    def __init__(self, message: str):
+        super().__init__(message, status_code=429)
+
+
+class FakeChatModel(BaseChatModel):
+    """Deterministic offline chat model with configurable latency, throughput and failures."""
+
+    model_name: str = "fake"
+    seed: int = 0
+    latency_seconds: float = 0.0  # Time to first token
+    latency_jitter: float = 0.0  # Share of the latency added or removed at random
+    tokens_per_second: float = 0.0  # Completion throughput after the first token (0 for instant)
+    output_ratio: float = 0.3  # Completion tokens per prompt token
+    min_output_tokens: int = 50
+    max_output_tokens: int = 2000
+    error_rate: float = 0.0  # Share of calls failing with a server error
+    rate_limit_rate: float = 0.0  # Share of attempts rejected with a 429
+    max_retries: int = 2  # 429s retried before the call fails, like the provider clients
+    retry_after_seconds: float = 1.0  # Wait before retrying a 429
+    invalid_json_rate: float = 0.0  # Share of JSON answers that are malformed or miss fields
+    streaming: bool = False  # Send the completion to the token callbacks in chunks
+    stream_usage: Optional[bool] = None  # Accepted for LLMManager's hooks; usage is always reported
+
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _seen: Dict[str, int] = PrivateAttr(default_factory=dict)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name, "seed": self.seed}
+
+    def bind_tools(self, tools, **kwargs):
+        """Accept tools; the fake model answers with text and never calls them."""
+        return self
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        text, usage, reason, latency = self._answer(messages, run_manager, kwargs)
+        time.sleep(latency)
+        if self.streaming and run_manager:
+            # Streamed here rather than in _stream, which LangChain calls
+            # without the run manager that holds the call site metadata
+            chunk_chars = _STREAM_CHUNK_TOKENS * _CHARS_PER_TOKEN
+            for start in range(0, len(text), chunk_chars):
+                if start and self.tokens_per_second > 0:
+                    time.sleep(_STREAM_CHUNK_TOKENS / self.tokens_per_second)
+                token = text[start : start + chunk_chars]
+                run_manager.on_llm_new_token(
+                    token, chunk=ChatGenerationChunk(message=AIMessageChunk(content=token))
+                )
+        elif self.tokens_per_second > 0:
+            time.sleep(usage["output_tokens"] / self.tokens_per_second)
+        message = AIMessage(
+            content=text,
+            usage_metadata=usage,
+            response_metadata={"finish_reason": reason, "model_name": self.model_name},
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _answer(
+        self,
+        messages: List[BaseMessage],
+        run_manager: Optional[CallbackManagerForLLMRun],
+        kwargs: Dict[str, Any],
+    ):
+        """Decide the outcome of a call.
+
+        Returns:
+            The completion text, its usage metadata, the finish reason and
+            the seconds to the first token
+
+        Raises:
+            FakeLLMError: For an injected server error
+            FakeRateLimitError: For an injected 429 that outlasted the retries
+        """
+        prompt = "\n\n".join(_message_text(message) for message in messages)
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        with self._lock:
+            occurrence = self._seen.get(digest, 0)
+            self._seen[digest] = occurrence + 1
+        rng = random.Random(f"{self.seed}:{digest}:{occurrence}")
+
+        for attempt in range(self.max_retries + 1):
+            if rng.random() >= self.rate_limit_rate:
+                break
+            if attempt == self.max_retries:
+                raise FakeRateLimitError(
+                    f"Fake provider rate limit exceeded (429) after {self.max_retries} retries"
+                )
+            time.sleep(self.retry_after_seconds)
+        if rng.random() < self.error_rate:
+            raise FakeLLMError("Fake provider internal server error (500)")
+
+        call_site = (run_manager.metadata.get("call_site") if run_manager else None) or ""
+        # The first human message holds the request; later ones are corrections
+        request = next((_message_text(m) for m in messages if isinstance(m, HumanMessage)), prompt)
+        input_tokens = _estimate_tokens(prompt)
+        output_tokens = min(
+            self.max_output_tokens,
+            max(self.min_output_tokens, int(input_tokens * self.output_ratio)),
+        )
+
+        invalid = rng.random() < self.invalid_json_rate
+        if call_site == "mcp_file_relevance":
+            text = _relevance_json(rng, request, invalid)
+        elif call_site == "mcp_file_discovery":
+            text = _discovery_json(rng, request, invalid)
+        elif call_site == "mcp_feature_synthesis":
+            text = _synthesis_json(rng, request, output_tokens, invalid)
+        elif call_site == "packed_file_documentation":
+            files = _file_sections(request)
+            text = "\n\n".join(
+                f"===== BEGIN DOCUMENTATION: {path} =====\n"
+                f"{_file_markdown(rng, path, section, max(1, output_tokens // max(1, len(files))))}\n"
+                f"===== END DOCUMENTATION: {path} ====="
+                for path, section in files
+            )
+        else:
+            files = _file_sections(request) or [(None, request)]
+            text = _file_markdown(rng, files[0][0], files[0][1], output_tokens)
+
+        reason = "stop"
+        max_tokens = kwargs.get("max_tokens")
+        if max_tokens and _estimate_tokens(text) > max_tokens:
+            text = text[: max_tokens * _CHARS_PER_TOKEN]
+            reason = "length"
+
+        usage = {
+            "input_tokens": input_tokens,
+            "output_tokens": _estimate_tokens(text),
+            "total_tokens": input_tokens + _estimate_tokens(text),
+        }
+        latency = self.latency_seconds * (1 + self.latency_jitter * (2 * rng.random() - 1))
+        return text, usage, reason, max(0.0, latency)
+
+
+def _message_text(message: BaseMessage) -> str:
+    if isinstance(message.content, str):
+        return message.content
+    return "\n".join(
+        part if isinstance(part, str) else str(part.get("text", ""))
+        for part in message.content
+    )
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // _CHARS_PER_TOKEN)
+
+
+def _sentences(rng: random.Random, words: List[str], tokens: int) -> str:
+    """Filler prose of about ``tokens`` tokens drawn from ``words`` and a fixed vocabulary."""
+    pool = _VOCABULARY + words
+    target = tokens * _CHARS_PER_TOKEN
+    sentences = []
+    length = 0
+    while length < target:
+        sentence = " ".join(rng.choice(pool) for _ in range(rng.randint(8, 16)))
+        sentence = sentence[0].upper() + sentence[1:] + "."
+        sentences.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(sentences)
+
+
+def _file_sections(request: str) -> List[tuple]:
+    """Split a request into the relative path and text of each file it contains."""
+    matches = list(_RELATIVE_PATH_PATTERN.finditer(request))
+    return [
+        (match.group(1).strip(), request[match.end() : matches[i + 1].start() if i + 1 < len(matches) else None])
+        for i, match in enumerate(matches)
+    ]
+
+
+def _file_markdown(rng: random.Random, path: Optional[str], source: str, tokens: int) -> str:
+    """Documentation of a file: an overview, its definitions and details."""
+    definitions = list(dict.fromkeys(_DEFINITION_PATTERN.findall(source)))
+    code = _CODE_BLOCK_PATTERN.findall(source)
+    words = _WORD_PATTERN.findall("\n".join(code) or source)[:200]
+    subject = f"`{path}`" if path else "This code"
+    lines = ["## Overview", "", f"{subject} {_sentences(rng, words, max(1, tokens // 4))}", ""]
+    if definitions:
+        lines += ["## Key Components", ""]
+        lines += [f"- `{name}`: {_sentences(rng, words, 12)}" for name in definitions[:20]]
+        lines.append("")
+    remaining = tokens - _estimate_tokens("\n".join(lines))
+    if remaining > 0:
+        lines += ["## Details", "", _sentences(rng, words, remaining)]
+    return "\n".join(lines).rstrip() + "\n"
+
+
+def _query_words(request: str) -> set:
+    match = _QUERY_PATTERN.search(request)
+    return {word.lower() for word in _WORD_PATTERN.findall(match.group(1))} if match else set()
+
+
+def _ranked_guide_entries(rng: random.Random, request: str) -> List[tuple]:
+    """Guide entries of the prompt with their score, those sharing most words with the query first."""
+    query = _query_words(request)
+    scored = []
+    for match in _GUIDE_ENTRY_PATTERN.finditer(request):
+        text = f"{match.group('source')} {match.group('summary')}".lower()
+        overlap = sum(1 for word in query if word in text)
+        scored.append((overlap + rng.random() / 2, match))
+    scored.sort(key=lambda item: item[0], reverse=True)
+    top = scored[0][0] if scored else 1.0
+    return [(round(0.3 + 0.7 * score / (top or 1.0), 2), match) for score, match in scored]
+
+
+def _json_answer(data: Dict[str, Any], rng: random.Random, invalid: bool) -> str:
+    text = json.dumps(data, indent=2)
+    if invalid:
+        # Cut the answer off mid-way, as a model running out of tokens would
+        return text[: rng.randint(1, max(1, len(text) - 2))]
+    return text
+
+
+def _relevance_json(rng: random.Random, request: str, invalid: bool) -> str:
+    entries = _ranked_guide_entries(rng, request)
+    data = {
+        "relevant_files": [
+            {
+                "file_path": match.group("source"),
+                "summary": match.group("summary"),
+                "relevance_score": score,
+                "reasoning": _sentences(rng, [], 15),
+            }
+            for score, match in entries[:10]
+        ],
+        "total_files_analyzed": len(entries),
+    }
+    return _json_answer(data, rng, invalid)
+
+
+def _discovery_json(rng: random.Random, request: str, invalid: bool) -> str:
+    match = _QUERY_PATTERN.search(request)
+    data = {
+        "feature_description": match.group(1).strip() if match else "",
+        "relevant_documentation_files": [
+            f"documentation_output/{entry.group('doc')}"
+            for _, entry in _ranked_guide_entries(rng, request)[:5]
+        ],
+        "discovery_reasoning": _sentences(rng, [], 30),
+    }
+    return _json_answer(data, rng, invalid)
+
+
+def _synthesis_json(rng: random.Random, request: str, tokens: int, invalid: bool) -> str:
+    match = _QUERY_PATTERN.search(request)
+    words = _WORD_PATTERN.findall(request)[:200]
+    sources = _LOADED_FILE_PATTERN.findall(request)
+    data = {
+        "feature_description": match.group(1).strip() if match else "",
+        "comprehensive_answer": _sentences(rng, words, max(1, tokens // 2)),
+        "key_components": [source.rsplit("/", 1)[-1] for source in sources] or ["main"],
+        "implementation_details": _sentences(rng, words, max(1, tokens // 4)),
+        "usage_examples": _sentences(rng, words, max(1, tokens // 8)),
+        "related_concepts": list(dict.fromkeys(rng.choice(words or _VOCABULARY) for _ in range(4))),
+        "source_documentation_files": sources,
+    }
+    if invalid and rng.random() < 0.5:
+        # Leave out a required field instead of breaking the JSON
+        del data[rng.choice(_SYNTHESIS_FIELDS)]
+        return json.dumps(data, indent=2)
+    return _json_answer(data, rng, invalid)
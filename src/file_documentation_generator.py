@@ -0,0 +1,850 @@
+"""
+File Documentation Generation
+
+Documents source files through stages connected by bounded queues: walk,
+filter/hash, prompt build, LLM call and write. Every stage runs in its own
+thread, so directory listing, hashing, file reads and network waits overlap,
+and each result is available as soon as its file has been written. Files
+can be scheduled longest and least up to date first, and small files are
+packed several to a request to save round trips. Byte-identical files are
+documented once and the documentation is reused for every copy. Model
+routes can send each file to a cheaper or stronger model than
+``model.name``. With ``model.stream_responses`` the documentation of a file
+is streamed into its file as it is generated.
+"""
+
+import contextvars
+import itertools
+import logging
+import queue
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+from .chunked_documenter import ChunkedDocumenter
+from .file_scheduler import FileScheduler
+from .model_router import ModelRouter
+from .models import (
+    SKIPPED_DOCUMENTATION,
+    CodeFile,
+    DocumentationResult,
+    PipelineState,
+    TokenUsage,
+)
+from .prompts.generate_file_documentation_system_message import (
+    GENERATED_FILE_DOCUMENTATION_HUMAN_MESSAGE,
+    GENERATED_FILE_DOCUMENTATION_SYSTEM_MESSAGE,
+    GENERATED_PACKED_FILE_DOCUMENTATION_HUMAN_MESSAGE,
+    GENERATED_PACKED_FILE_ENTRY,
+)
+from .response_stream import StreamedFileWriter, is_truncated
+from .run_checkpoint import RunJournal
+from .scan_index import ScanIndex
+from .sharding import in_shard
+from .telemetry import llm_call_metadata
+from .utilities.file_reader import BinaryFileError
+from .utilities.packed_response import split_packed_response
+
+# Reason kept on the skipped result of a file that is not text
+BINARY_FILE_SKIP_REASON = "binary file"
+
+# Marks the end of a stage's output
+_DONE = object()
+
+
+class _Cancelled(Exception):
+    """Raised inside a stage thread when the run has been stopped."""
+
+
+class _PackedRequest(NamedTuple):
+    """Small files documented together in one LLM request."""
+
+    files: List[Tuple[CodeFile, str]]  # (file, content)
+    messages: List[BaseMessage]
+    route: Optional[str] = None
+
+
+class _ContentGroup:
+    """Files with the same content and extension, documented through the first of them."""
+
+    def __init__(self, representative: CodeFile):
+        self.representative = representative
+        # Files waiting for the representative's result
+        self.duplicates: List[CodeFile] = []
+        self.result: Optional[DocumentationResult] = None
+
+
+class _Duplicate(NamedTuple):
+    """A file whose identical representative already has its result."""
+
+    code_file: CodeFile
+    group: _ContentGroup
+
+
+class FileDocumentationGenerator:
+    """Generates documentation for individual code files."""
+
+    def __init__(
+        self,
+        config,
+        llm,
+        code_analyzer,
+        file_processor,
+        guide_generator,
+        doc_processor,
+        model_router: Optional[ModelRouter] = None,
+    ):
+        self.config = config
+        self.llm = llm
+        # Chooses the model of each file when model routes are configured
+        self.model_router = model_router
+        self.code_analyzer = code_analyzer
+        self.file_processor = file_processor
+        self.guide_generator = guide_generator
+        self.doc_processor = doc_processor
+        self.chunked_documenter = ChunkedDocumenter(config, llm, doc_processor.count_tokens)
+        self.logger = logging.getLogger(__name__)
+        # Usage totals are updated from several LLM worker threads
+        self._usage_lock = threading.Lock()
+
+    def start(
+        self,
+        state: PipelineState,
+        scan_index: Optional[ScanIndex] = None,
+        code_files: Optional[List[CodeFile]] = None,
+        max_files: Optional[int] = None,
+        journal: Optional[RunJournal] = None,
+    ) -> "FileDocumentationRun":
+        """Create a run that documents files as it is iterated.
+
+        Args:
+            state: Pipeline state with the request and existing documentation
+            scan_index: Index used to reuse content digests, if enabled
+            code_files: Files to document; the repository is walked when None
+            max_files: Maximum number of files taken from the walk
+            journal: Journal of the pipeline run; files it records as done
+                are not checked or documented again
+        """
+        return FileDocumentationRun(self, state, scan_index, code_files, max_files, journal)
+
+    def build_system_message(self, context: str, route: Optional[str] = None) -> SystemMessage:
+        """Build the system message shared by every file in a run sent through ``route``.
+
+        It contains no file-specific text, so providers can serve it from
+        their prompt cache: OpenAI caches long identical prefixes
+        automatically, and for Anthropic the message is marked with
+        ``cache_control``. The provider is that of the route's model.
+        """
+        text = GENERATED_FILE_DOCUMENTATION_SYSTEM_MESSAGE.format(context=context)
+        route_model = self.model_router.get_route_model(route) if self.model_router is not None else None
+        if route_model is None:
+            provider = self.config.model.get("provider")
+            prompt_caching = self.config.model.get("prompt_caching", True)
+        else:
+            provider = route_model.get("provider", "openai")
+            prompt_caching = route_model.get("prompt_caching", self.config.model.get("prompt_caching", True))
+        if provider == "anthropic" and prompt_caching:
+            return SystemMessage(
+                content=[{"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}]
+            )
+        return SystemMessage(content=text)
+
+    def build_messages(
+        self, code_file: CodeFile, content: str, system_message: SystemMessage
+    ) -> List[BaseMessage]:
+        """Build the documentation prompt for a single file."""
+        return [
+            system_message,
+            HumanMessage(
+                content=GENERATED_FILE_DOCUMENTATION_HUMAN_MESSAGE.format(
+                    current_file_extension=code_file.extension or "text",
+                    current_file_relative_path=code_file.relative_path,
+                    language=code_file.extension[1:] if code_file.extension else "text",
+                    content=content,
+                )
+            ),
+        ]
+
+    def build_packed_messages(
+        self, files: List[Tuple[CodeFile, str]], system_message: SystemMessage
+    ) -> List[BaseMessage]:
+        """Build one prompt documenting several small files.
+
+        The system message is the same as for single files, so packed and
+        single requests share the cached prefix.
+        """
+        entries = [
+            GENERATED_PACKED_FILE_ENTRY.format(
+                current_file_extension=code_file.extension or "text",
+                current_file_relative_path=code_file.relative_path,
+                language=code_file.extension[1:] if code_file.extension else "text",
+                content=content,
+            )
+            for code_file, content in files
+        ]
+        return [
+            system_message,
+            HumanMessage(
+                content=GENERATED_PACKED_FILE_DOCUMENTATION_HUMAN_MESSAGE.format(
+                    file_count=len(files), files="\n\n".join(entries)
+                )
+            ),
+        ]
+
+    def generate(
+        self,
+        messages: List[BaseMessage],
+        usage: Optional[TokenUsage] = None,
+        subject: Optional[str] = None,
+        call_site: str = "file_documentation",
+        stream_to: Optional[StreamedFileWriter] = None,
+        route: Optional[str] = None,
+    ) -> str:
+        """Send a documentation prompt to the LLM and return the documentation text.
+
+        Args:
+            messages: Prompt messages
+            usage: Totals to add the response's token usage to
+            subject: File (or files) the prompt documents, for telemetry
+            call_site: Name of the call in telemetry
+            stream_to: Writer the tokens are streamed to as they arrive
+            route: Model route chosen for the prompt; the default model is used when None
+        """
+        config = {
+            "recursion_limit": self.config.model.get("recursion_limit", 50),
+            "metadata": llm_call_metadata(call_site, subject, route=route),
+        }
+        if stream_to is not None:
+            config["callbacks"] = [stream_to]
+        llm = self.model_router.get_llm(route) if self.model_router is not None else self.llm
+        response = llm.invoke(messages, config=config)
+        if usage is not None:
+            with self._usage_lock:
+                usage.add_response(response)
+        if is_truncated(response):
+            self.logger.warning(f"Documentation of {subject} stopped at the max tokens limit")
+
+        # Handle different response types
+        if hasattr(response, "content"):
+            return response.content
+        return str(response)
+
+
+class FileDocumentationRun:
+    """A single pass of file documentation.
+
+    Iterating the run starts the stage threads and yields each
+    DocumentationResult as it completes, so results of concurrent LLM calls
+    arrive in completion order; use ``sort_results`` for path order.
+    Stopping the iteration early cancels the stages that are still running.
+    """
+
+    def __init__(
+        self,
+        generator: FileDocumentationGenerator,
+        state: PipelineState,
+        scan_index: Optional[ScanIndex],
+        code_files: Optional[List[CodeFile]],
+        max_files: Optional[int],
+        journal: Optional[RunJournal] = None,
+    ):
+        self.generator = generator
+        self.state = state
+        self.scan_index = scan_index
+        self.max_files = max_files
+        self.journal = journal
+        self._source_files = code_files
+        self.logger = generator.logger
+
+        # Files taken from the walk, in the order they are sent
+        self.code_files: List[CodeFile] = []
+        self.completed = False
+
+        queue_size = max(1, state.request.config.processing.get("stage_queue_size", 16))
+        self._to_filter = queue.Queue(maxsize=queue_size)
+        self._to_prompt = queue.Queue(maxsize=queue_size)
+        self._to_llm = queue.Queue(maxsize=queue_size)
+        self._to_write = queue.Queue(maxsize=queue_size)
+        self._output = queue.Queue(maxsize=queue_size)
+
+        processing = state.request.config.processing
+        token_limits = state.request.config.token_limits
+        # Files documented by the LLM at the same time
+        self.concurrency = max(1, processing.get("concurrency", 1) or 1)
+        # Documentation is streamed to its file and not kept in the results
+        self.stream_responses = state.request.config.model.get("stream_responses", False)
+
+        # Small files are packed into shared requests up to these limits
+        self.pack_max_files = (
+            max(1, processing.get("pack_max_files", 6))
+            if processing.get("pack_small_files", True)
+            else 1
+        )
+        self.pack_file_tokens = token_limits.get("pack_file_tokens", 1000)
+        self.pack_budget = token_limits.get("pack_budget", 6000)
+        # Files held back for packing and their tokens, per model route
+        self._packs: Dict[Optional[str], Tuple[List[Tuple[CodeFile, str]], int]] = {}
+
+        # Byte-identical files are documented once, grouped by digest and extension
+        self.deduplicate = processing.get("deduplicate", True)
+        self._groups: Dict[Tuple[str, str], _ContentGroup] = {}
+        self._group_of: Dict[Path, _ContentGroup] = {}  # By representative path
+        self._groups_lock = threading.Lock()
+        # Files documented from an identical file's result instead of an LLM call
+        self.deduplicated = 0
+
+        # Files are ordered before they are sent, unless both orderings are off
+        self.scheduler = FileScheduler.from_config(generator.file_processor, processing)
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._context = ""
+        # System message of each model route, None for the default model
+        self._system_messages: Dict[Optional[str], SystemMessage] = {}
+        # Token usage of the LLM calls made by this run
+        self.usage = TokenUsage()
+
+    def __iter__(self) -> Iterator[DocumentationResult]:
+        # The existing docs context is the same for every file
+        self._context = self.generator.doc_processor.prepare_context(self.state.existing_docs)
+        routes = [None]
+        if self.generator.model_router is not None:
+            routes += [route.name for route in self.generator.model_router.routes]
+        self._system_messages = {
+            route: self.generator.build_system_message(self._context, route) for route in routes
+        }
+
+        # (handler, input queue, output queue, worker threads, end of input handler)
+        stages = [
+            (self._walk, None, self._to_filter, 1, None),
+            (self._filter, self._to_filter, self._to_prompt, 1, None),
+            (self._build_prompt, self._to_prompt, self._to_llm, 1, self._flush_packs),
+            (self._call_llm, self._to_llm, self._to_write, self.concurrency, None),
+            (self._write, self._to_write, self._output, 1, None),
+        ]
+        threads = []
+        for handle, source, sink, workers, finish in stages:
+            remaining = [workers]
+            for worker in range(workers):
+                threads.append(
+                    threading.Thread(
+                        # Run in a copy of the graph node's context, so LLM calls
+                        # are attributed to the node in telemetry
+                        target=contextvars.copy_context().run,
+                        args=(self._run_stage, handle, source, sink, remaining, finish),
+                        name=f"file-docs-{handle.__name__.lstrip('_')}-{worker}",
+                        daemon=True,
+                    )
+                )
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                try:
+                    item = self._output.get(timeout=0.1)
+                except queue.Empty:
+                    if self._error is not None:
+                        raise self._error
+                    continue
+                if item is _DONE:
+                    break
+                for result in self._resolve_duplicates(item):
+                    if self.journal is not None and result.success:
+                        # Failed files are retried when an interrupted run resumes
+                        self.journal.record_file_result(result)
+                    self._print_result(result)
+                    yield result
+
+            for thread in threads:
+                thread.join()
+            if self._error is not None:
+                raise self._error
+            self.completed = True
+        finally:
+            # Stages blocked on a queue notice this and exit; one waiting on
+            # the LLM exits when its call returns
+            self._stop.set()
+
+    def sort_results(self, results: List[DocumentationResult]) -> List[DocumentationResult]:
+        """Order results by the path of their files, independent of schedule and completion order."""
+        positions = {
+            code_file.path: index
+            for index, code_file in enumerate(
+                sorted(self.code_files, key=lambda code_file: code_file.relative_path)
+            )
+        }
+        return sorted(results, key=lambda result: positions.get(result.file_path, len(positions)))
+
+    def _run_stage(
+        self,
+        handle,
+        source: Optional[queue.Queue],
+        sink: queue.Queue,
+        remaining: List[int],
+        finish=None,
+    ) -> None:
+        """Feed items from ``source`` to ``handle``; the stage's last worker closes ``sink``.
+
+        ``remaining`` counts the stage's workers that are still running.
+        ``finish`` is called by the last worker before it closes ``sink``.
+        """
+        try:
+            if source is None:
+                handle()
+            else:
+                while True:
+                    item = self._get(source)
+                    if item is _DONE:
+                        # Pass the end marker on to this stage's other workers
+                        self._put(source, _DONE)
+                        break
+                    handle(item)
+
+            with self._lock:
+                remaining[0] -= 1
+                last_worker = remaining[0] == 0
+            if last_worker:
+                if finish is not None:
+                    finish()
+                self._put(sink, _DONE)
+        except _Cancelled:
+            pass
+        except BaseException as e:
+            self.logger.error(f"File documentation stage failed: {e}", exc_info=True)
+            if self._error is None:
+                self._error = e
+            self._stop.set()
+
+    def _get(self, source: queue.Queue):
+        while True:
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                if self._stop.is_set():
+                    raise _Cancelled()
+
+    def _put(self, sink: queue.Queue, item) -> None:
+        while True:
+            try:
+                sink.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                if self._stop.is_set():
+                    raise _Cancelled()
+
+    def _resolve_duplicates(self, item) -> List[DocumentationResult]:
+        """Return the results for an output item: its own and those of files identical to it."""
+        if isinstance(item, _Duplicate):
+            return [self._copy_result(item.group, item.code_file)]
+
+        with self._groups_lock:
+            group = self._group_of.pop(item.file_path, None)
+            if group is None:
+                return [item]
+            group.result = item
+            duplicates, group.duplicates = group.duplicates, []
+        return [item] + [self._copy_result(group, code_file) for code_file in duplicates]
+
+    def _copy_result(self, group: _ContentGroup, code_file: CodeFile) -> DocumentationResult:
+        """Document a file from the result of its identical representative.
+
+        Only the title and the metadata footer are specific to the path, so
+        the representative's documentation is written again for it.
+        """
+        source = group.result
+        representative = group.representative
+        if not source.success:
+            return DocumentationResult(
+                file_path=code_file.path,
+                documentation="",
+                success=False,
+                error_message=f"Identical to {representative.relative_path}: {source.error_message}",
+                duplicate_of=representative.path,
+            )
+        if source.documentation == SKIPPED_DOCUMENTATION:
+            # Nothing was documented, for example because the content is binary
+            return DocumentationResult(
+                file_path=code_file.path,
+                documentation=SKIPPED_DOCUMENTATION,
+                success=True,
+                error_message=source.error_message,
+                duplicate_of=representative.path,
+            )
+
+        result = DocumentationResult(
+            file_path=code_file.path,
+            documentation=source.documentation,
+            success=True,
+            file_hash=code_file.file_hash,
+            duplicate_of=representative.path,
+        )
+        file_processor = self.generator.file_processor
+        try:
+            if source.saved:
+                file_processor.copy_documentation(
+                    self.state, representative.relative_path, code_file.relative_path
+                )
+                result.documentation = ""
+                result.saved = True
+            elif self.state.request.config.processing.get("save_incrementally", True):
+                file_processor.save_single_result(self.state, result)
+        except Exception as e:
+            result.documentation = ""
+            result.success = False
+            result.error_message = f"Save failed: {str(e)}"
+            return result
+
+        self.deduplicated += 1
+        return result
+
+    def _print_result(self, result: DocumentationResult) -> None:
+        """Print the outcome of a file.
+
+        Results are printed as they arrive on the consuming thread, so the
+        lines of one file are never mixed with those of another; the stages
+        only log.
+        """
+        relative_path = result.file_path.relative_to(self.state.request.repo_path).as_posix()
+        print(f"Processing file: {relative_path}")
+        if not result.success:
+            print(f"  ✗ Error generating documentation: {result.error_message}")
+        elif result.documentation == SKIPPED_DOCUMENTATION:
+            if result.error_message == BINARY_FILE_SKIP_REASON:
+                print("  → Binary file, skipping")
+            else:
+                print("  → File unchanged, skipping")
+        else:
+            if result.duplicate_of is not None:
+                source_path = result.duplicate_of.relative_to(self.state.request.repo_path)
+                print(f"  → Identical to {source_path}, its documentation was reused")
+            saved = result.saved or self.stream_responses or self.state.request.config.processing.get(
+                "save_incrementally", True
+            )
+            if saved:
+                doc_path = self.generator.file_processor.get_documentation_path(self.state, relative_path)
+                print(f"  ✓ Saved documentation: {doc_path}")
+            else:
+                print("  ✓ Documentation generated")
+
+    def _system_message(self, route: Optional[str]) -> SystemMessage:
+        """Return the system message for the provider of a model route."""
+        return self._system_messages.get(route, self._system_messages[None])
+
+    def _failed(self, code_file: CodeFile, error: Exception) -> DocumentationResult:
+        self.logger.error(
+            f"Failed to generate documentation for {code_file.relative_path}: {error}",
+            exc_info=True,
+        )
+        return DocumentationResult(
+            file_path=code_file.path,
+            documentation="",
+            success=False,
+            error_message=str(error),
+        )
+
+    # Stages
+
+    def _walk(self) -> None:
+        """Take files from the repository walk or the given list.
+
+        Without a scheduler files are passed on as the walk reaches them.
+        With one the walk is finished first, which only lists directories,
+        and ``max_files`` applies to the scheduled order. A sharded run only
+        takes the files of its shard.
+        """
+        shard = self.state.request.shard
+        if self._source_files is not None:
+            code_files = self._source_files
+        elif self.scheduler is not None or shard is not None:
+            code_files = self.generator.code_analyzer.iter_repository(self.state.request.repo_path)
+        else:
+            code_files = self.generator.code_analyzer.iter_repository(
+                self.state.request.repo_path, max_files=self.max_files
+            )
+
+        if shard is not None:
+            code_files = (code_file for code_file in code_files if in_shard(code_file.relative_path, shard))
+        if self.scheduler is not None:
+            code_files = self.scheduler.order(self.state, list(code_files))
+        if self.max_files:
+            code_files = itertools.islice(code_files, self.max_files)
+
+        for code_file in code_files:
+            self.code_files.append(code_file)
+            self._put(self._to_filter, code_file)
+
+    def _filter(self, code_file: CodeFile) -> None:
+        """Fill in the content digest and skip files whose documentation is current."""
+        if self.journal is not None:
+            recorded = self.journal.get_file_result(code_file.path)
+            if recorded is not None:
+                self.logger.info(f"Already processed before the run was interrupted: {code_file.relative_path}")
+                self._put(self._output, recorded)
+                return
+
+        try:
+            if code_file.file_hash is None and self.scan_index is not None:
+                code_file.file_hash = self.generator.code_analyzer.get_file_digest(
+                    code_file, self.scan_index
+                )
+            if code_file.file_hash is None and self.deduplicate:
+                code_file.file_hash = self.generator.file_processor.calculate_file_hash(code_file.path)
+
+            if not self.generator.file_processor.should_generate_documentation(
+                self.state, code_file, self.generator.guide_generator
+            ):
+                self.logger.info(f"Skipping unchanged file: {code_file.relative_path}")
+                # Create a "skipped" result to track that we processed this file
+                self._put(
+                    self._output,
+                    DocumentationResult(
+                        file_path=code_file.path,
+                        documentation=SKIPPED_DOCUMENTATION,
+                        success=True,
+                        error_message=None,
+                    ),
+                )
+                return
+        except _Cancelled:
+            raise
+        except Exception as e:
+            self._put(self._output, self._failed(code_file, e))
+            return
+
+        if self.deduplicate and self._hold_duplicate(code_file):
+            return
+        self._put(self._to_prompt, code_file)
+
+    def _hold_duplicate(self, code_file: CodeFile) -> bool:
+        """Group a file with identical files; return True if it is documented from another one."""
+        if code_file.file_hash in (None, "unknown"):
+            return False
+        key = (code_file.file_hash, code_file.extension)
+        with self._groups_lock:
+            group = self._groups.get(key)
+            if group is None:
+                group = _ContentGroup(code_file)
+                self._groups[key] = group
+                self._group_of[code_file.path] = group
+                return False
+            self.logger.info(
+                f"{code_file.relative_path} is identical to {group.representative.relative_path}, "
+                "its documentation will be reused"
+            )
+            if group.result is None:
+                group.duplicates.append(code_file)
+                return True
+        self._put(self._output, _Duplicate(code_file, group))
+        return True
+
+    def _build_prompt(self, code_file: CodeFile) -> None:
+        """Read the file content, choose its model route and build its prompt.
+
+        Files too large for one prompt get no messages here; they are
+        documented chunk by chunk in the LLM stage with the default model.
+        Small files are held back and packed into a request with other
+        small files of the same route.
+        """
+        route = None
+        try:
+            # The content is loaded only now that it is about to be sent
+            content = self.generator.code_analyzer.read_content(code_file)
+            if self.generator.chunked_documenter.needs_chunking(content):
+                messages = None
+            else:
+                model_router = self.generator.model_router
+                if self.pack_max_files > 1 or model_router is not None:
+                    tokens = self.generator.doc_processor.count_tokens(content)
+                    if model_router is not None:
+                        route = model_router.select(code_file, content, tokens)
+                    if self.pack_max_files > 1 and tokens <= self.pack_file_tokens:
+                        self._add_to_pack(code_file, content, tokens, route)
+                        return
+                messages = self.generator.build_messages(code_file, content, self._system_message(route))
+                content = None
+        except _Cancelled:
+            raise
+        except BinaryFileError:
+            self.logger.info(f"Skipping binary file: {code_file.relative_path}")
+            self._put(
+                self._output,
+                DocumentationResult(
+                    file_path=code_file.path,
+                    documentation=SKIPPED_DOCUMENTATION,
+                    success=True,
+                    error_message=BINARY_FILE_SKIP_REASON,
+                ),
+            )
+            return
+        except Exception as e:
+            self._put(self._output, self._failed(code_file, e))
+            return
+
+        self._put(self._to_llm, (code_file, messages, content, route))
+
+    def _add_to_pack(self, code_file: CodeFile, content: str, tokens: int, route: Optional[str]) -> None:
+        files, pack_tokens = self._packs.get(route, ([], 0))
+        if files and pack_tokens + tokens > self.pack_budget:
+            self._flush_pack(route)
+            files, pack_tokens = [], 0
+        files.append((code_file, content))
+        self._packs[route] = (files, pack_tokens + tokens)
+        if len(files) >= self.pack_max_files:
+            self._flush_pack(route)
+
+    def _flush_pack(self, route: Optional[str]) -> None:
+        """Send the small files of a route held back so far to the LLM stage."""
+        files, _ = self._packs.pop(route, ([], 0))
+        if len(files) == 1:
+            code_file, content = files[0]
+            messages = self.generator.build_messages(code_file, content, self._system_message(route))
+            self._put(self._to_llm, (code_file, messages, None, route))
+        elif files:
+            messages = self.generator.build_packed_messages(files, self._system_message(route))
+            self._put(self._to_llm, _PackedRequest(files, messages, route))
+
+    def _flush_packs(self) -> None:
+        """Send the small files held back for every route to the LLM stage."""
+        for route in list(self._packs):
+            self._flush_pack(route)
+
+    def _call_llm(self, item) -> None:
+        """Generate the documentation text."""
+        if isinstance(item, _PackedRequest):
+            self._call_llm_packed(item)
+            return
+
+        code_file, messages, content, route = item
+        self.logger.info(f"Generating documentation for: {code_file.relative_path}")
+        if messages is not None and self.stream_responses:
+            self._call_llm_streamed(code_file, messages, route)
+            return
+
+        try:
+            if messages is None:
+                documentation = self.generator.chunked_documenter.document(
+                    code_file, content, self._context, self.state.request.output_path
+                )
+            else:
+                documentation = self.generator.generate(
+                    messages, self.usage, subject=code_file.relative_path, route=route
+                )
+        except Exception as e:
+            self._put(self._output, self._failed(code_file, e))
+            return
+
+        result = DocumentationResult(
+            file_path=code_file.path,
+            documentation=documentation,
+            success=True,
+            file_hash=code_file.file_hash,
+        )
+        self._put(self._to_write, (code_file, result))
+
+    def _call_llm_streamed(
+        self, code_file: CodeFile, messages: List[BaseMessage], route: Optional[str]
+    ) -> None:
+        """Generate the documentation of a file, streaming it into its documentation file."""
+        file_processor = self.generator.file_processor
+        try:
+            writer = file_processor.start_streamed_result(self.state, code_file)
+        except Exception as e:
+            self._put(self._output, self._failed(code_file, e))
+            return
+
+        try:
+            documentation = self.generator.generate(
+                messages, self.usage, subject=code_file.relative_path, stream_to=writer, route=route
+            )
+        except Exception as e:
+            writer.abort()
+            self._put(self._output, self._failed(code_file, e))
+            return
+
+        result = DocumentationResult(
+            file_path=code_file.path,
+            documentation=documentation,
+            success=True,
+            file_hash=code_file.file_hash,
+        )
+        try:
+            file_processor.finish_streamed_result(self.state, writer, result, documentation)
+        except Exception as e:
+            result.documentation = ""
+            result.success = False
+            result.error_message = f"Save failed: {str(e)}"
+        self._put(self._to_write, (code_file, result))
+
+    def _call_llm_packed(self, request: _PackedRequest) -> None:
+        """Document several small files with one request, splitting the answer per file.
+
+        Files whose section is missing from the answer, or all of them if the
+        request fails, are sent again on their own.
+        """
+        relative_paths = [code_file.relative_path for code_file, _ in request.files]
+        self.logger.info(f"Generating documentation for: {', '.join(relative_paths)}")
+        try:
+            sections = split_packed_response(
+                self.generator.generate(
+                    request.messages,
+                    self.usage,
+                    subject=", ".join(relative_paths),
+                    call_site="packed_file_documentation",
+                    route=request.route,
+                ),
+                relative_paths,
+            )
+        except Exception as e:
+            self.logger.warning(f"Packed documentation request failed, sending files one by one: {e}")
+            sections = {}
+
+        for code_file, content in request.files:
+            documentation = sections.get(code_file.relative_path)
+            if documentation is None:
+                self.logger.info(
+                    f"No documentation section for {code_file.relative_path} in packed response, "
+                    "sending it on its own"
+                )
+                messages = self.generator.build_messages(code_file, content, self._system_message(request.route))
+                self._call_llm((code_file, messages, None, request.route))
+                continue
+
+            result = DocumentationResult(
+                file_path=code_file.path,
+                documentation=documentation,
+                success=True,
+                file_hash=code_file.file_hash,
+            )
+            self._put(self._to_write, (code_file, result))
+
+    def _write(self, item) -> None:
+        """Save the documentation if incremental saving is enabled.
+
+        Streamed documentation was saved as it was generated. When streaming,
+        the rest is always saved here so that no results keep their text.
+        """
+        code_file, result = item
+        save_incrementally = self.state.request.config.processing.get(
+            "save_incrementally", True
+        )
+        if (save_incrementally or self.stream_responses) and result.success:
+            try:
+                self.generator.file_processor.save_single_result(self.state, result)
+                self.logger.info(
+                    f"Successfully saved documentation for: {code_file.relative_path}"
+                )
+                if self.stream_responses:
+                    result.documentation = ""
+                    result.saved = True
+            except Exception as save_error:
+                self.logger.error(
+                    f"Failed to save documentation for {code_file.relative_path}: {save_error}"
+                )
+                result.success = False
+                result.error_message = f"Save failed: {str(save_error)}"
+
+        self._put(self._output, result)
@@ -1,10 +1,12 @@
-import hashlib
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 import logging
 
-from .models import PipelineState, DocumentationResult, CodeFile
+from .models import PipelineState, DocumentationResult, CodeFile, SKIPPED_DOCUMENTATION
+from .utilities.file_reader import BinaryFileError, read_text_file
+from .scan_index import compute_file_digest
+from .response_stream import StreamedFileWriter
 
 
 class FileProcessor:
@@ -26,17 +28,17 @@ class FileProcessor:
 
         # If no existing documentation, generate it
         if not doc_path.exists():
-            print(f"  → No existing documentation found, will generate")
+            self.logger.info(f"No existing documentation for {relative_path}, will generate")
             return True
 
         # Extract metadata from existing documentation
         existing_metadata = guide_generator.extract_metadata_from_doc(doc_path)
         if not existing_metadata:
-            print(f"  → No metadata found in existing documentation, will regenerate")
+            self.logger.info(f"No metadata in the existing documentation of {relative_path}, will regenerate")
             return True
 
-        # Calculate current file hash
-        current_hash = self.calculate_file_hash(code_file.path)
+        # Use the digest from the scan index, hashing only if it is missing
+        current_hash = code_file.file_hash or self.calculate_file_hash(code_file.path)
         current_relative_path = str(relative_path)
 
         # Compare with existing metadata
@@ -44,31 +46,39 @@ class FileProcessor:
         existing_path = existing_metadata.get("relative_path")
 
         if existing_hash == current_hash and existing_path == current_relative_path:
-            print(f"  → File unchanged (hash: {current_hash[:8]}...), skipping")
+            self.logger.info(f"{relative_path} unchanged (hash: {current_hash[:8]}...), skipping")
             return False
         else:
             if existing_hash != current_hash:
-                print(
-                    f"  → File changed (hash: {existing_hash[:8] if existing_hash else 'unknown'}... → {current_hash[:8]}...), will regenerate"
+                self.logger.info(
+                    f"{relative_path} changed (hash: {existing_hash[:8] if existing_hash else 'unknown'}... → {current_hash[:8]}...), will regenerate"
                 )
             if existing_path != current_relative_path:
-                print(
-                    f"  → Path changed ({existing_path} → {current_relative_path}), will regenerate"
+                self.logger.info(
+                    f"Path changed ({existing_path} → {current_relative_path}), will regenerate"
                 )
             return True
 
     def save_single_result(
         self, state: PipelineState, result: DocumentationResult
-    ) -> None:
-        """Save documentation for a single file immediately with error handling."""
+    ) -> Optional[Path]:
+        """Save documentation for a single file immediately with error handling.
+
+        Returns:
+            The documentation path, or None if there was nothing to save
+        """
         if not result.success:
             self.logger.debug(f"Skipping save for failed result: {result.file_path}")
-            return
+            return None
 
         # Skip saving if this was a skipped file
-        if result.documentation == "[SKIPPED - No changes detected]":
+        if result.documentation == SKIPPED_DOCUMENTATION:
             self.logger.debug(f"Skipping save for unchanged file: {result.file_path}")
-            return
+            return None
+
+        if result.saved:
+            self.logger.debug(f"Already saved while it was generated: {result.file_path}")
+            return None
 
         try:
             output_path = state.request.output_path
@@ -82,67 +92,206 @@ class FileProcessor:
             # Create directory if needed
             doc_path.parent.mkdir(parents=True, exist_ok=True)
 
-            # Calculate file hash and generation timestamp
-            file_hash = self.calculate_file_hash(result.file_path)
-            generation_date = datetime.now().isoformat()
-
             # Write documentation with header notice and footer metadata
             with open(doc_path, "w", encoding="utf-8") as f:
-                # Header notice
-                f.write("<!-- AUTO-GENERATED DOCUMENTATION -->\n")
-                f.write(
-                    "<!-- This file was automatically generated and should not be manually edited -->\n"
-                )
-                f.write(
-                    "<!-- To update this documentation, regenerate it using the documentation pipeline -->\n\n"
-                )
-
-                # Original title and LLM-generated content
-                f.write(f"# Documentation for {relative_path}\n\n")
+                f.write(self.documentation_header(relative_path))
                 f.write(result.documentation)
+                f.write(self.documentation_footer(result, relative_path))
 
-                # Include original code if configured
-                if self.config.output.get("include_code", True):
-                    f.write(f"\n\n## Original Code\n\n")
-                    f.write(
-                        f"```{result.file_path.suffix[1:] if result.file_path.suffix else 'text'}\n"
-                    )
-                    with open(
-                        result.file_path, "r", encoding="utf-8", errors="ignore"
-                    ) as code_file:
-                        f.write(code_file.read())
-                    f.write("\n```")
-
-                # Footer with machine-readable metadata
-                f.write("\n\n---\n")
-                f.write("<!-- GENERATION METADATA -->\n")
-                f.write("```yaml\n")
-                f.write("# Documentation Generation Metadata\n")
-                f.write(f"file_hash: {file_hash}\n")
-                f.write(f"relative_path: {relative_path}\n")
-                f.write(f"generation_date: {generation_date}\n")
-                f.write("```\n")
-                f.write("<!-- END GENERATION METADATA -->\n")
-
-            self.logger.debug(f"Successfully saved documentation to: {doc_path}")
-            print(f"  ✓ Saved documentation: {doc_path}")
+            self.logger.info(f"Saved documentation: {doc_path}")
+            return doc_path
 
         except Exception as e:
             error_msg = f"Failed to save documentation for {result.file_path}: {e}"
             self.logger.error(error_msg, exc_info=True)
             raise Exception(error_msg) from e
 
+    def documentation_header(self, relative_path: Path) -> str:
+        """Text of a documentation file before the LLM-generated content."""
+        return (
+            "<!-- AUTO-GENERATED DOCUMENTATION -->\n"
+            "<!-- This file was automatically generated and should not be manually edited -->\n"
+            "<!-- To update this documentation, regenerate it using the documentation pipeline -->\n\n"
+            f"# Documentation for {relative_path}\n\n"
+        )
+
+    def documentation_footer(self, result: DocumentationResult, relative_path: Path) -> str:
+        """Text of a documentation file after the LLM-generated content.
+
+        Holds the original code, if configured, and the machine-readable
+        metadata used to detect changes.
+        """
+        file_hash = result.file_hash or self.calculate_file_hash(result.file_path)
+        generation_date = datetime.now().isoformat()
+
+        footer = ""
+        if self.config.output.get("include_code", True):
+            try:
+                code = read_text_file(result.file_path)
+            except BinaryFileError:
+                self.logger.info(f"Not including the code of binary file: {result.file_path}")
+            else:
+                footer += "\n\n## Original Code\n\n"
+                footer += f"```{result.file_path.suffix[1:] if result.file_path.suffix else 'text'}\n"
+                footer += code
+                footer += "\n```"
+
+        footer += "\n\n---\n"
+        footer += "<!-- GENERATION METADATA -->\n"
+        footer += "```yaml\n"
+        footer += "# Documentation Generation Metadata\n"
+        footer += f"file_hash: {file_hash}\n"
+        footer += f"relative_path: {relative_path}\n"
+        footer += f"generation_date: {generation_date}\n"
+        footer += "```\n"
+        footer += "<!-- END GENERATION METADATA -->\n"
+        return footer
+
+    def start_streamed_result(self, state: PipelineState, code_file: CodeFile) -> StreamedFileWriter:
+        """Open the documentation file of ``code_file`` for a completion streamed into it."""
+        state.request.output_path.mkdir(parents=True, exist_ok=True)
+        relative_path = code_file.path.relative_to(state.request.repo_path)
+        return StreamedFileWriter(
+            self.get_documentation_path(state, code_file.relative_path),
+            header=self.documentation_header(relative_path),
+        )
+
+    def finish_streamed_result(
+        self,
+        state: PipelineState,
+        writer: StreamedFileWriter,
+        result: DocumentationResult,
+        documentation: str,
+    ) -> None:
+        """Complete a streamed documentation file and move it into place.
+
+        The result is marked as saved and does not keep the documentation text.
+        """
+        relative_path = result.file_path.relative_to(state.request.repo_path)
+        try:
+            doc_path = writer.finish(documentation, self.documentation_footer(result, relative_path))
+        except Exception as e:
+            writer.abort()
+            error_msg = f"Failed to save documentation for {result.file_path}: {e}"
+            self.logger.error(error_msg, exc_info=True)
+            raise Exception(error_msg) from e
+
+        result.documentation = ""
+        result.saved = True
+        self.logger.info(f"Saved documentation: {doc_path}")
+
+    def get_documentation_path(self, state: PipelineState, relative_path: str) -> Path:
+        """Get the documentation file path for a repository-relative source path."""
+        relative_path = Path(relative_path)
+        doc_filename = f"{relative_path.stem}_documentation.md"
+        return state.request.output_path / relative_path.parent / doc_filename
+
+    def move_documentation(
+        self, state: PipelineState, old_relative_path: str, new_relative_path: str
+    ) -> bool:
+        """Move the documentation of a renamed source file instead of regenerating it.
+
+        The title and the relative_path in the metadata footer are rewritten
+        for the new location; the file hash is kept since the content of a
+        pure rename is unchanged.
+
+        Returns:
+            True if documentation existed and was moved
+        """
+        old_doc_path = self.get_documentation_path(state, old_relative_path)
+        new_doc_path = self.get_documentation_path(state, new_relative_path)
+        if not old_doc_path.exists():
+            return False
+
+        try:
+            with open(old_doc_path, "r", encoding="utf-8") as f:
+                content = f.read()
+
+            content = self._retarget_documentation(content, old_relative_path, new_relative_path)
+
+            new_doc_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(new_doc_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            if old_doc_path != new_doc_path:
+                old_doc_path.unlink()
+
+            print(f"  ✓ Moved documentation: {old_relative_path} → {new_relative_path}")
+            return True
+
+        except Exception as e:
+            self.logger.error(
+                f"Failed to move documentation for {old_relative_path}: {e}", exc_info=True
+            )
+            return False
+
+    def copy_documentation(
+        self, state: PipelineState, source_relative_path: str, target_relative_path: str
+    ) -> Path:
+        """Write the documentation of a source file for a byte-identical file at another path.
+
+        Only the title and the relative_path in the metadata footer differ
+        from the source's documentation.
+        """
+        source_doc_path = self.get_documentation_path(state, source_relative_path)
+        target_doc_path = self.get_documentation_path(state, target_relative_path)
+        try:
+            with open(source_doc_path, "r", encoding="utf-8") as f:
+                content = f.read()
+
+            content = self._retarget_documentation(content, source_relative_path, target_relative_path)
+
+            target_doc_path.parent.mkdir(parents=True, exist_ok=True)
+            # Atomic write to prevent corruption
+            temp_file = target_doc_path.with_name(target_doc_path.name + ".tmp")
+            with open(temp_file, "w", encoding="utf-8") as f:
+                f.write(content)
+            temp_file.replace(target_doc_path)
+        except Exception as e:
+            error_msg = f"Failed to copy documentation of {source_relative_path} to {target_relative_path}: {e}"
+            self.logger.error(error_msg, exc_info=True)
+            raise Exception(error_msg) from e
+
+        self.logger.info(f"Saved documentation: {target_doc_path} (copied from {source_relative_path})")
+        return target_doc_path
+
+    @staticmethod
+    def _retarget_documentation(content: str, old_relative_path: str, new_relative_path: str) -> str:
+        """Rewrite the path-specific title and metadata of a documentation file."""
+        content = content.replace(
+            f"# Documentation for {old_relative_path}\n",
+            f"# Documentation for {new_relative_path}\n",
+            1,
+        )
+        return content.replace(
+            f"relative_path: {old_relative_path}\n",
+            f"relative_path: {new_relative_path}\n",
+            1,
+        )
+
+    def remove_documentation(self, state: PipelineState, relative_path: str) -> bool:
+        """Remove the documentation of a deleted source file.
+
+        Returns:
+            True if documentation existed and was removed
+        """
+        doc_path = self.get_documentation_path(state, relative_path)
+        if not doc_path.exists():
+            return False
+
+        try:
+            doc_path.unlink()
+            print(f"  ✓ Removed documentation for deleted file: {relative_path}")
+            return True
+        except OSError as e:
+            self.logger.error(f"Failed to remove documentation for {relative_path}: {e}")
+            return False
+
     def calculate_file_hash(self, file_path: Path) -> str:
         """Calculate SHA-256 hash of a file."""
-        sha256_hash = hashlib.sha256()
         try:
-            with open(file_path, "rb") as f:
-                # Read file in chunks to handle large files efficiently
-                for chunk in iter(lambda: f.read(4096), b""):
-                    sha256_hash.update(chunk)
-            return sha256_hash.hexdigest()
+            return compute_file_digest(file_path)
         except Exception as e:
-            print(f"Warning: Could not calculate hash for {file_path}: {e}")
+            self.logger.warning(f"Could not calculate hash for {file_path}: {e}")
             return "unknown"
 
     def create_output_directory_structure(self, state: PipelineState):
@@ -0,0 +1,98 @@
+"""
+File Scheduling
+
+Orders the files of a documentation run before they are sent to the LLM.
+Files are taken longest first, so the largest requests start while the other
+workers still have short files to pick up instead of one large file holding
+up the end of the run. Files without documentation, or changed since it was
+written, can be put ahead of the rest so a run capped by ``max_files`` or
+stopped early spends its time on the documentation that is missing or stale.
+"""
+
+import logging
+from typing import List, Optional
+
+from .models import CodeFile, PipelineState
+
+# Rough source bytes per token, enough to compare files without reading them
+BYTES_PER_TOKEN = 4
+
+# Priorities, lowest first
+MISSING_DOCUMENTATION = 0
+CHANGED_SINCE_DOCUMENTED = 1
+DOCUMENTED = 2
+
+
+class FileScheduler:
+    """Orders code files by documentation priority and estimated size."""
+
+    def __init__(self, file_processor, longest_first: bool = True, changed_first: bool = True):
+        """Initialize the scheduler.
+
+        Args:
+            file_processor: Resolves the documentation path of a source file
+            longest_first: Order files by estimated tokens, largest first
+            changed_first: Put files with missing or outdated documentation first
+        """
+        self.file_processor = file_processor
+        self.longest_first = longest_first
+        self.changed_first = changed_first
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def from_config(cls, file_processor, processing: dict) -> Optional["FileScheduler"]:
+        """Create the scheduler for the ``processing`` settings, or None if both orderings are off.
+
+        Both are off by default: a schedule needs the whole repository walk
+        before the first file is documented.
+        """
+        longest_first = processing.get("schedule", "walk") == "longest_first"
+        changed_first = processing.get("changed_first", False)
+        if not (longest_first or changed_first):
+            return None
+        return cls(file_processor, longest_first, changed_first)
+
+    @staticmethod
+    def estimate_tokens(code_file: CodeFile) -> int:
+        """Estimate the tokens of a file from its size at scan time."""
+        return code_file.size // BYTES_PER_TOKEN
+
+    def order(self, state: PipelineState, code_files: List[CodeFile]) -> List[CodeFile]:
+        """Return ``code_files`` in the order they should be documented.
+
+        Files that compare equal keep their walk order.
+        """
+        priorities = {}
+        if self.changed_first:
+            priorities = {
+                code_file.relative_path: self.get_priority(state, code_file) for code_file in code_files
+            }
+
+        def sort_key(code_file: CodeFile):
+            return (
+                priorities.get(code_file.relative_path, DOCUMENTED),
+                -self.estimate_tokens(code_file) if self.longest_first else 0,
+            )
+
+        ordered = sorted(code_files, key=sort_key)
+        if self.changed_first:
+            pending = sum(1 for priority in priorities.values() if priority != DOCUMENTED)
+            self.logger.info(
+                f"Scheduled {len(ordered)} files, {pending} with missing or outdated documentation first"
+            )
+        return ordered
+
+    def get_priority(self, state: PipelineState, code_file: CodeFile) -> int:
+        """Classify a file by the state of its documentation, using only stat calls.
+
+        The content hash decides later whether the file is really
+        regenerated; this is only a cheap guess for ordering.
+        """
+        doc_path = self.file_processor.get_documentation_path(state, code_file.relative_path)
+        try:
+            doc_mtime_ns = doc_path.stat().st_mtime_ns
+        except OSError:
+            return MISSING_DOCUMENTATION
+        if code_file.mtime_ns > doc_mtime_ns:
+            return CHANGED_SINCE_DOCUMENTED
+        return DOCUMENTED
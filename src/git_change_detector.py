@@ -0,0 +1,163 @@
+import json
+import logging
+import subprocess
+from pathlib import Path
+from typing import List, Optional
+
+from .models import SourceChangeSet
+
+# Value of --since that means "the commit recorded by the last successful run"
+LAST_DOCUMENTED_COMMIT = "last"
+
+
+class GitChangeDetector:
+    """Detects changed source files using the repository's git history."""
+
+    def __init__(self, repo_path: Path, output_path: Path):
+        """Initialize the change detector.
+
+        Args:
+            repo_path: Path to the repository being documented
+            output_path: Path where documentation is output
+        """
+        self.repo_path = repo_path
+        self.state_file = output_path / ".documentation_state" / "git_state.json"
+        self.logger = logging.getLogger(__name__)
+
+    def is_available(self) -> bool:
+        """Check whether the repository path is inside a git work tree."""
+        try:
+            return self._run_git(["rev-parse", "--is-inside-work-tree"]).strip() == "true"
+        except Exception:
+            return False
+
+    def get_head_commit(self) -> str:
+        """Return the commit hash of HEAD."""
+        return self._run_git(["rev-parse", "HEAD"]).strip()
+
+    def load_last_documented_commit(self) -> Optional[str]:
+        """Load the commit recorded by the last successful documentation run."""
+        if not self.state_file.exists():
+            return None
+
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data.get("last_documented_commit")
+        except Exception as e:
+            self.logger.error(f"Failed to load git state: {e}")
+            return None
+
+    def save_last_documented_commit(self, commit: str) -> None:
+        """Record the commit that the documentation now reflects."""
+        try:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+
+            # Atomic write to prevent corruption
+            temp_file = self.state_file.with_suffix(".tmp")
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump({"last_documented_commit": commit}, f, indent=2)
+
+            temp_file.replace(self.state_file)
+            self.logger.info(f"Recorded last documented commit: {commit}")
+
+        except Exception as e:
+            self.logger.error(f"Failed to save git state: {e}")
+
+    def resolve_since(self, since: str) -> Optional[str]:
+        """Resolve a --since value to a commit hash.
+
+        Args:
+            since: A git revision, or ``"last"`` for the last documented commit
+
+        Returns:
+            The commit hash, or None if ``"last"`` was requested but no run
+            has been recorded yet
+
+        Raises:
+            ValueError: If the revision can't be resolved
+        """
+        if since == LAST_DOCUMENTED_COMMIT:
+            since = self.load_last_documented_commit()
+            if not since:
+                return None
+
+        try:
+            return self._run_git(["rev-parse", "--verify", f"{since}^{{commit}}"]).strip()
+        except subprocess.CalledProcessError as e:
+            raise ValueError(f"Unknown git revision '{since}': {e.stderr.strip()}") from e
+
+    def detect_changes(self, since_commit: str) -> SourceChangeSet:
+        """List files changed between a commit and the working tree.
+
+        Covers committed, staged and unstaged changes plus untracked files
+        that are not ignored. Paths are relative to the repository path.
+
+        Args:
+            since_commit: Commit to compare against
+
+        Returns:
+            SourceChangeSet with added, modified, deleted and renamed paths
+        """
+        changes = SourceChangeSet(
+            since_commit=since_commit, head_commit=self.get_head_commit()
+        )
+
+        # -z keeps paths unquoted; --relative limits output to repo_path
+        output = self._run_git(
+            ["diff", "--name-status", "-z", "-M", "--relative", since_commit]
+        )
+        tokens = output.split("\0")
+        i = 0
+        while i < len(tokens) and tokens[i]:
+            status = tokens[i]
+            kind = status[0]
+            if kind in ("R", "C"):
+                old_path, new_path = self._to_local(tokens[i + 1]), self._to_local(tokens[i + 2])
+                i += 3
+                if kind == "R":
+                    changes.renamed[old_path] = new_path
+                    # A rename with edits still needs new documentation
+                    if status[1:] != "100":
+                        changes.modified.append(new_path)
+                else:
+                    changes.added.append(new_path)
+                continue
+
+            path = self._to_local(tokens[i + 1])
+            i += 2
+            if kind == "A":
+                changes.added.append(path)
+            elif kind == "D":
+                changes.deleted.append(path)
+            else:
+                # M, T (type change) and U (unmerged) all mean new content
+                changes.modified.append(path)
+
+        untracked = self._run_git(["ls-files", "--others", "--exclude-standard", "-z"])
+        for path in untracked.split("\0"):
+            if path:
+                changes.added.append(self._to_local(path))
+
+        self.logger.info(
+            f"Git changes since {since_commit[:8]}: {len(changes.added)} added, "
+            f"{len(changes.modified)} modified, {len(changes.deleted)} deleted, "
+            f"{len(changes.renamed)} renamed"
+        )
+        return changes
+
+    def _to_local(self, git_path: str) -> str:
+        """Convert a git path to the platform's relative path format."""
+        return str(Path(git_path))
+
+    def _run_git(self, args: List[str]) -> str:
+        """Run a git command in the repository and return its output."""
+        result = subprocess.run(
+            ["git", *args],
+            cwd=self.repo_path,
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            check=True,
+        )
+        return result.stdout
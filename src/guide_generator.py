@@ -22,6 +22,7 @@ from .models import (
 )
 from .document_processor import DocumentProcessor
 from .guide_metadata_manager import GuideMetadataManager
+from .telemetry import llm_call_metadata
 
 
 class GuideGenerator:
@@ -43,6 +44,8 @@ class GuideGenerator:
         self.config = config
         self.doc_processor = doc_processor
         self.metadata_manager = None  # Will be initialized when needed
+        # Journal of the pipeline run, set while the guide node runs
+        self.run_journal = None
 
         self.logger = logging.getLogger(__name__)
 
@@ -190,6 +193,11 @@ class GuideGenerator:
         if state.request.force_full_guide:
             print("Force full guide enabled - loading all existing docs...")
             successful_results = self.load_existing_documentation_results(state)
+        elif state.source_changes is not None:
+            # A run limited to source changes only has results for the changed
+            # files, so a full guide has to be built from all existing docs
+            print("Run limited to source changes - loading all existing docs...")
+            successful_results = self.load_existing_documentation_results(state)
         else:
             # Process each successful documentation result from this run
             successful_results = [
@@ -275,6 +283,13 @@ class GuideGenerator:
 
     def _generate_doc_summary(self, doc_content: str, file_path: str) -> str:
         """Generate a concise summary of documentation content using LLM."""
+        journal_key = None
+        if self.run_journal is not None:
+            # Summaries made before an interrupted run stopped are reused
+            journal_key = hashlib.sha256(f"{file_path}\0{doc_content}".encode("utf-8")).hexdigest()
+            recorded = self.run_journal.get_guide_summary(journal_key)
+            if recorded is not None:
+                return recorded
 
         summary_prompt = ChatPromptTemplate.from_messages(
             [
@@ -289,13 +304,17 @@ class GuideGenerator:
 
         try:
             messages = summary_prompt.format_messages()
-            response = self.llm.invoke(messages)
+            response = self.llm.invoke(
+                messages, config={"metadata": llm_call_metadata("guide_summary", str(file_path))}
+            )
 
             if hasattr(response, "content"):
                 summary = response.content.strip()
             else:
                 summary = str(response).strip()
 
+            if journal_key is not None:
+                self.run_journal.record_guide_summary(journal_key, summary)
             return summary
 
         except Exception as e:
@@ -465,8 +484,22 @@ Use this guide to quickly locate relevant documentation when working on specific
         # Files that need new guide entries
         files_to_process = changeset.new_files + changeset.modified_files
         
-        # Generate new guide entries for changed files
         new_generated_entries = {}
+        
+        # Move entries of renamed files, keeping their summaries
+        for old_path, new_path in changeset.renamed_files.items():
+            old_entry = existing_entries.pop(old_path, None)
+            if old_entry and new_path not in files_to_process:
+                new_doc_path = Path(new_path).parent / f"{Path(new_path).stem}_documentation.md"
+                existing_entries[new_path] = DocumentationGuideEntry(
+                    doc_file_path=str(new_doc_path),
+                    summary=old_entry.summary,
+                    original_file_path=new_path,
+                )
+                new_generated_entries[new_path] = old_entry.summary
+                self.logger.debug(f"Moved guide entry: {old_path} -> {new_path}")
+        
+        # Generate new guide entries for changed files
         for relative_path in files_to_process:
             guide_entry = self._generate_guide_entry_for_file(state, relative_path)
             if guide_entry:
@@ -491,7 +524,7 @@ Use this guide to quickly locate relevant documentation when working on specific
         # Update metadata
         metadata_manager.update_metadata_after_generation(state, new_generated_entries)
         
-        total_changes = len(files_to_process) + len(changeset.deleted_files)
+        total_changes = len(files_to_process) + len(changeset.deleted_files) + len(changeset.renamed_files)
         print(f"Updated documentation guide: {total_changes} changes, {len(updated_entries)} total entries")
         self.logger.info(f"Incremental guide generation complete: {total_changes} changes processed")
         
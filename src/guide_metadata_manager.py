@@ -13,6 +13,7 @@ from .models import (
     PipelineState,
     DocumentationResult,
 )
+from .utilities.path_matcher import PathMatcher
 
 
 class GuideMetadataManager:
@@ -117,7 +118,6 @@ class GuideMetadataManager:
             ChangeSet describing what needs to be updated
         """
         metadata = self.load_metadata()
-        changeset = ChangeSet()
         
         # Build map of current results by relative path (only newly generated files)
         current_generated_files = {}
@@ -126,6 +126,86 @@ class GuideMetadataManager:
                 relative_path = str(result.file_path.relative_to(state.request.repo_path))
                 current_generated_files[relative_path] = result
         
+        if state.source_changes is not None:
+            changeset = self._detect_changes_from_change_set(state, metadata, current_generated_files)
+        else:
+            changeset = self._detect_changes_from_docs(state, metadata, current_generated_files)
+        
+        # Check if this is the first run (no previous guide)
+        guide_path = self.output_path / "documentation_guide.md"
+        if not guide_path.exists() or len(metadata.tracked_files) == 0:
+            changeset.force_full_rebuild = True
+            self.logger.info("First run or missing guide - forcing full rebuild")
+        
+        return changeset
+    
+    def _detect_changes_from_change_set(self,
+                                        state: PipelineState,
+                                        metadata: GuideMetadata,
+                                        current_generated_files: Dict[str, DocumentationResult]) -> ChangeSet:
+        """Detect guide changes from known source changes instead of scanning all documentation.
+        
+        Only changed paths (from git or the file watcher) and files documented
+        in this run are checked, so the cost scales with the size of the change.
+        
+        Args:
+            state: Current pipeline state with source changes
+            metadata: Loaded guide metadata
+            current_generated_files: Files documented in this run, by relative path
+            
+        Returns:
+            ChangeSet describing what needs to be updated
+        """
+        source_changes = state.source_changes
+        changeset = ChangeSet()
+        
+        candidates = set(current_generated_files)
+        candidates.update(source_changes.added)
+        candidates.update(source_changes.modified)
+        
+        for relative_path in sorted(candidates):
+            doc_filename = f"{Path(relative_path).stem}_documentation.md"
+            doc_path = self.output_path / Path(relative_path).parent / doc_filename
+            if not doc_path.exists():
+                continue
+            
+            if relative_path not in metadata.tracked_files:
+                changeset.new_files.append(relative_path)
+            elif relative_path in current_generated_files:
+                changeset.modified_files.append(relative_path)
+            elif self._calculate_file_hash(doc_path) != metadata.tracked_files[relative_path].doc_file_hash:
+                changeset.modified_files.append(relative_path)
+        
+        # Renamed files keep their guide entry under the new path
+        for old_path, new_path in source_changes.renamed.items():
+            if old_path in metadata.tracked_files:
+                changeset.renamed_files[old_path] = new_path
+                changeset.deleted_files.append(old_path)
+        
+        for relative_path in source_changes.deleted:
+            if relative_path in metadata.tracked_files:
+                changeset.deleted_files.append(relative_path)
+        
+        self.logger.info(f"Change detection (source changes): {len(changeset.new_files)} new, {len(changeset.modified_files)} modified, {len(changeset.deleted_files)} deleted, {len(changeset.renamed_files)} renamed files")
+        
+        return changeset
+    
+    def _detect_changes_from_docs(self,
+                                  state: PipelineState,
+                                  metadata: GuideMetadata,
+                                  current_generated_files: Dict[str, DocumentationResult]) -> ChangeSet:
+        """Detect guide changes by comparing all existing documentation with the metadata.
+        
+        Args:
+            state: Current pipeline state
+            metadata: Loaded guide metadata
+            current_generated_files: Files documented in this run, by relative path
+            
+        Returns:
+            ChangeSet describing what needs to be updated
+        """
+        changeset = ChangeSet()
+        
         # Find ALL existing documentation files (not just current generation results)
         all_existing_doc_files = self._discover_all_documentation_files(state)
         
@@ -171,12 +251,6 @@ class GuideMetadataManager:
                     changeset.deleted_files.append(relative_path)
                     self.logger.debug(f"Detected deleted file: {relative_path}")
         
-        # Check if this is the first run (no previous guide)
-        guide_path = self.output_path / "documentation_guide.md"
-        if not guide_path.exists() or len(metadata.tracked_files) == 0:
-            changeset.force_full_rebuild = True
-            self.logger.info("First run or missing guide - forcing full rebuild")
-        
         total_changes = len(changeset.new_files) + len(changeset.modified_files) + len(changeset.deleted_files)
         total_documented = len(all_documented_files)
         self.logger.info(f"Change detection: {len(changeset.new_files)} new, {len(changeset.modified_files)} modified, {len(changeset.deleted_files)} deleted files out of {total_documented} total documented files")
@@ -197,6 +271,9 @@ class GuideMetadataManager:
         if not self.output_path.exists():
             return documented_files
         
+        # Sources matching the exclude patterns are no longer documented
+        matcher = PathMatcher.from_config(state.request.config, state.request.repo_path)
+        
         # Find all documentation files
         for doc_file in self.output_path.rglob("*_documentation.md"):
             try:
@@ -222,6 +299,9 @@ class GuideMetadataManager:
                             potential_source = potential_source_dir / f"{base_name}{ext}"
                             if potential_source.exists():
                                 relative_source = str(potential_source.relative_to(state.request.repo_path))
+                                if matcher.is_path_excluded(relative_source):
+                                    self.logger.debug(f"Skipping excluded documented file: {relative_source}")
+                                    break
                                 documented_files.append(relative_source)
                                 self.logger.debug(f"Found documented file: {relative_source}")
                                 break
@@ -237,6 +317,9 @@ class GuideMetadataManager:
                                 match = re.search(metadata_pattern, content)
                                 if match:
                                     relative_source = match.group(1).strip()
+                                    if matcher.is_path_excluded(relative_source):
+                                        self.logger.debug(f"Skipping excluded documented file: {relative_source}")
+                                        continue
                                     documented_files.append(relative_source)
                                     self.logger.debug(f"Found documented file from metadata: {relative_source}")
                             except Exception as e:
@@ -297,14 +380,16 @@ class GuideMetadataManager:
         metadata = self.load_metadata()
         current_time = time.time()
         
+        # Index successful results by path once instead of searching per entry
+        results_by_path = {}
+        for r in state.results:
+            if r.success:
+                results_by_path.setdefault(str(r.file_path.relative_to(state.request.repo_path)), r)
+        
         # Update metadata for generated entries
         for relative_path, guide_entry_content in generated_entries.items():
             # Find corresponding result from current generation
-            result = None
-            for r in state.results:
-                if r.success and str(r.file_path.relative_to(state.request.repo_path)) == relative_path:
-                    result = r
-                    break
+            result = results_by_path.get(relative_path)
             
             if result:
                 # File was just generated in this run
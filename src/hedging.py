@@ -0,0 +1,205 @@
+"""
+Hedged LLM Requests
+
+Sends a call to a secondary provider when the primary is slow. Latencies of
+the primary's answered calls are kept in a rolling window; a call still
+waiting after the configured percentile of that window (never less than a
+floor) gets a duplicate sent to the secondary, and whichever answer comes
+first is used. A call the primary fails is failed over to the secondary
+straight away.
+
+The losing request is not cancelled (the HTTP client offers no way to), its
+answer is dropped. Both requests count in the telemetry, since both are
+billed.
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, Optional
+
+from .response_cache import CACHE_HIT_METADATA_KEY
+from .telemetry import percentile
+
+
+class LatencyWindow:
+    """Rolling window of observed call latencies."""
+
+    def __init__(self, size: int):
+        self.latencies = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self.latencies.append(seconds)
+
+    def percentile(self, fraction: float, min_samples: int) -> Optional[float]:
+        """Return the percentile of the window, or None until it holds ``min_samples`` latencies."""
+        with self._lock:
+            if len(self.latencies) < min_samples:
+                return None
+            latencies = list(self.latencies)
+        return percentile(latencies, fraction)
+
+
+class HedgingStats:
+    """Counts of hedged calls and which provider answered them."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.calls = 0
+        self.hedged = 0
+        self.primary_wins = 0
+        self.secondary_wins = 0
+        self.failovers = 0
+
+    def count(self, **increments: int) -> None:
+        with self._lock:
+            for name, increment in increments.items():
+                setattr(self, name, getattr(self, name) + increment)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "hedged": self.hedged,
+                "hedge_rate": self.hedged / self.calls if self.calls else 0.0,
+                "primary_wins": self.primary_wins,
+                "secondary_wins": self.secondary_wins,
+                "failovers": self.failovers,
+            }
+
+
+def combine_hedging_stats(stats_list) -> Dict[str, Any]:
+    """Add up the hedging stats of several runs, such as the shards of a sharded run."""
+    combined = {
+        key: sum(stats[key] for stats in stats_list)
+        for key in ("calls", "hedged", "primary_wins", "secondary_wins", "failovers")
+    }
+    combined["hedge_rate"] = combined["hedged"] / combined["calls"] if combined["calls"] else 0.0
+    return combined
+
+
+class HedgedChatModel:
+    """Chat model that hedges slow calls of a primary model with a secondary one.
+
+    It supports the parts of the chat model interface the pipeline uses:
+    ``invoke`` and ``bind_tools``.
+    """
+
+    def __init__(
+        self,
+        primary,
+        secondary,
+        settings: Dict[str, Any],
+        window: Optional[LatencyWindow] = None,
+        stats: Optional[HedgingStats] = None,
+        executor: Optional[ThreadPoolExecutor] = None,
+    ):
+        """Initialize the hedged model.
+
+        Args:
+            primary: Chat model every call is sent to
+            secondary: Chat model slow or failed calls are also sent to
+            settings: The ``model.hedging`` configuration
+            window: Latencies of the primary, shared with models bound from this one
+            stats: Hedging counters, shared with models bound from this one
+            executor: Threads the requests run in, shared with models bound from this one
+        """
+        self.primary = primary
+        self.secondary = secondary
+        self.settings = settings
+        self.percentile = settings.get("percentile", 0.95)
+        self.min_samples = settings.get("min_samples", 20)
+        self.min_delay = settings.get("min_delay_seconds", 1.0)
+        self.initial_delay = settings.get("initial_delay_seconds", 30.0)
+        self.window = window or LatencyWindow(settings.get("window", 200))
+        self.stats = stats or HedgingStats()
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=settings.get("max_workers", 32), thread_name_prefix="llm-hedge"
+        )
+        self.logger = logging.getLogger(__name__)
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait for the primary before hedging."""
+        threshold = self.window.percentile(self.percentile, self.min_samples)
+        if threshold is None:
+            return self.initial_delay
+        return max(self.min_delay, threshold)
+
+    def bind_tools(self, tools, **kwargs) -> "HedgedChatModel":
+        return HedgedChatModel(
+            self.primary.bind_tools(tools, **kwargs),
+            self.secondary.bind_tools(tools, **kwargs),
+            self.settings,
+            window=self.window,
+            stats=self.stats,
+            executor=self.executor,
+        )
+
+    def invoke(self, input, config: Optional[Dict[str, Any]] = None, **kwargs):
+        self.stats.count(calls=1)
+        delay = self.hedge_delay()
+        primary = self._submit(self.primary, input, config, kwargs, observe=True)
+
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            try:
+                return primary.result()
+            except Exception as e:
+                self.logger.warning(f"Primary LLM failed, failing over to the secondary: {e}")
+                self.stats.count(failovers=1)
+                return self._submit(self.secondary, input, config, kwargs, hedge=True).result()
+
+        self.logger.info(f"Primary LLM slower than {delay:.1f}s, sending a hedged request")
+        self.stats.count(hedged=1)
+        secondary = self._submit(self.secondary, input, config, kwargs, hedge=True)
+
+        pending = {primary, secondary}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in (primary, secondary):
+                if future not in done or future.exception() is not None:
+                    continue
+                if future is primary:
+                    self.stats.count(primary_wins=1)
+                else:
+                    self.stats.count(secondary_wins=1)
+                return future.result()
+
+        # Both failed; report the primary's error
+        return primary.result()
+
+    def _submit(
+        self,
+        model,
+        input,
+        config: Optional[Dict[str, Any]],
+        kwargs: Dict[str, Any],
+        observe: bool = False,
+        hedge: bool = False,
+    ) -> Future:
+        """Start a call of ``model`` in the executor.
+
+        The caller's context is copied so the call stays part of the
+        caller's LangChain run (for example the LangGraph node it is in).
+        """
+        if hedge:
+            config = dict(config or {})
+            config["metadata"] = {**config.get("metadata", {}), "hedge": True}
+
+        def call():
+            started = time.monotonic()
+            response = model.invoke(input, config=config, **kwargs)
+            cached = (getattr(response, "response_metadata", None) or {}).get(CACHE_HIT_METADATA_KEY)
+            if observe and not cached:
+                self.window.add(time.monotonic() - started)
+            return response
+
+        return self.executor.submit(contextvars.copy_context().run, call)
@@ -1,9 +1,18 @@
 import os
 import logging
-from typing import Union
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
 from langchain_openai import ChatOpenAI
 from langchain_anthropic import ChatAnthropic
 
+from .fake_llm import FakeChatModel
+from .hedging import HedgedChatModel, HedgingStats
+from .model_router import DEFAULT_ROUTE
+from .models import ModelRoute
+from .rate_limiter import RateLimitCallbackHandler, get_rate_limiter
+from .response_cache import ResponseCache
+from .telemetry import LLMTelemetry, TelemetryCallbackHandler
+
 
 class LLMManager:
     """Handles LLM initialization and configuration."""
@@ -12,15 +21,110 @@ class LLMManager:
         self.config_manager = config_manager
         self.logger = logging.getLogger(__name__)
 
-    def initialize_llm(self) -> Union[ChatOpenAI, ChatAnthropic]:
-        """Initialize the language model based on configuration."""
         model_config = self.config_manager.get_model_config()
+        self.response_cache = None
+        if model_config.get("response_cache", True):
+            max_mb = model_config.get("response_cache_max_mb", 512)
+            self.response_cache = ResponseCache(max_bytes=int(max_mb * 1024 * 1024))
+
+        self.telemetry = LLMTelemetry(self.config_manager.load_config())
+        self.hedging_stats = HedgingStats()
+        # Chat models of the model routes, by route name
+        self.route_llms: Dict[str, Any] = {}
+
+    def use_cache_directory(self, output_path: Path) -> None:
+        """Keep cached LLM responses in the state directory of an output path."""
+        if self.response_cache is not None:
+            self.response_cache.open(output_path / ".documentation_state")
+
+    def start_run(self, output_path: Path) -> None:
+        """Use the state directory of an output path and start collecting telemetry for a new run."""
+        self.use_cache_directory(output_path)
+        if self.response_cache is not None:
+            self.response_cache.reset_stats()
+        self.hedging_stats.reset()
+        self.telemetry.start_run(output_path)
+
+    def initialize_llm(
+        self, model_config: Optional[dict] = None
+    ) -> Union[ChatOpenAI, ChatAnthropic, HedgedChatModel]:
+        """Initialize the language model based on configuration.
+
+        With a ``secondary`` provider configured, slow or failed calls are
+        hedged to it.
+
+        Args:
+            model_config: Model configuration; ``model`` from the config file when None
+        """
+        if model_config is None:
+            model_config = self.config_manager.get_model_config()
+        llm = self._initialize_provider_llm(model_config)
+
+        secondary_config = model_config.get("secondary")
+        if not secondary_config:
+            return llm
+
+        secondary_config = self._derive_model_config(model_config, secondary_config)
+        secondary = self._initialize_provider_llm(secondary_config)
+        self.logger.info(
+            f"Hedging slow {model_config.get('provider', 'openai')} calls with "
+            f"{secondary_config.get('provider', 'openai')} {secondary_config.get('name', '')}"
+        )
+        return HedgedChatModel(
+            llm, secondary, model_config.get("hedging", {}), stats=self.hedging_stats
+        )
+
+    def get_model_routes(self) -> List[ModelRoute]:
+        """Parse the ``model.routes`` rules.
+
+        Raises:
+            ValueError: If route names are missing, repeated or reserved
+        """
+        routes = [ModelRoute(**route) for route in self.config_manager.get_model_config().get("routes") or []]
+        names = [route.name for route in routes]
+        if DEFAULT_ROUTE in names:
+            raise ValueError(f"The route name '{DEFAULT_ROUTE}' is reserved for files no route matches")
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"Model routes defined more than once: {', '.join(duplicates)}")
+        return routes
+
+    def initialize_route_llms(self, routes: List[ModelRoute]) -> Dict[str, Any]:
+        """Initialize the chat model of every route, keeping them in the route pool."""
+        model_config = self.config_manager.get_model_config()
+        for route in routes:
+            if route.name not in self.route_llms:
+                self.route_llms[route.name] = self.initialize_llm(
+                    self._derive_model_config(model_config, route.model)
+                )
+                self.logger.info(
+                    f"Model route {route.name}: {route.model.get('provider', 'openai')} "
+                    f"{route.model.get('name', '')}"
+                )
+        return {route.name: self.route_llms[route.name] for route in routes}
+
+    def _derive_model_config(self, model_config: dict, overrides: dict) -> dict:
+        """Build the configuration of another model, such as a secondary provider or a route.
+
+        It uses its own API key and limits, and the sampling and streaming
+        settings of ``model_config`` unless it sets its own.
+        """
+        return {
+            "temperature": model_config.get("temperature", 0.2),
+            "stream_responses": model_config.get("stream_responses", False),
+            **overrides,
+        }
+
+    def _initialize_provider_llm(self, model_config: dict) -> Union[ChatOpenAI, ChatAnthropic]:
+        """Initialize the chat model of the provider in ``model_config``."""
         provider = model_config.get("provider", "openai")
 
         if provider == "openai":
             return self._initialize_openai_llm(model_config)
         elif provider == "anthropic":
             return self._initialize_anthropic_llm(model_config)
+        elif provider == "fake":
+            return self._initialize_fake_llm(model_config)
         else:
             raise ValueError(f"Unsupported provider: {provider}")
 
@@ -36,6 +140,7 @@ class LLMManager:
             model=model_config.get("name", "gpt-4o"),
             temperature=model_config.get("temperature", 0.2),
             api_key=api_key,
+            **self._get_model_hooks("openai", model_config.get("name", "gpt-4o"), model_config),
         )
         
         self.logger.info(f"Initialized OpenAI LLM: {model_config.get('name', 'gpt-4o')}")
@@ -53,7 +158,59 @@ class LLMManager:
             temperature=model_config.get("temperature", 0.2),
             api_key=api_key,
             timeout=model_config.get("timeout", 60.0),
+            **self._get_model_hooks(
+                "anthropic", model_config.get("name", "claude-3.5-sonnet-latest"), model_config
+            ),
         )
         
         self.logger.info(f"Initialized Anthropic LLM: {model_config.get('name', 'claude-3.5-sonnet-latest')}")
-        return llm
\ No newline at end of file
+        return llm
+
+    def _initialize_fake_llm(self, model_config: dict) -> FakeChatModel:
+        """Initialize the offline fake LLM used for benchmarks and CI; no API key is needed."""
+        model_name = model_config.get("name", "fake")
+        llm = FakeChatModel(
+            model_name=model_name,
+            **model_config.get("fake", {}),
+            **self._get_model_hooks("fake", model_name, model_config),
+        )
+
+        self.logger.info(f"Initialized offline fake LLM: {model_name}")
+        return llm
+
+    def _get_model_hooks(self, provider: str, model_name: str, model_config: dict) -> dict:
+        """Get the chat model arguments that apply the response cache, rate limits, telemetry and streaming.
+
+        The rate limiter is shared by all LLMs created for the same provider
+        and model in this process. Streamed calls still return the complete
+        response from ``invoke``, so they are cached like any other.
+        """
+        hooks = {"callbacks": []}
+        if model_config.get("stream_responses", False):
+            hooks["streaming"] = True
+            # Token usage is only reported in streams that ask for it
+            hooks["stream_usage"] = True
+        if self.response_cache is not None:
+            hooks["cache"] = self.response_cache
+        if self.telemetry.enabled:
+            hooks["callbacks"].append(
+                TelemetryCallbackHandler(
+                    self.telemetry,
+                    model_name,
+                    model_config.get("input_cost_per_million"),
+                    model_config.get("output_cost_per_million"),
+                )
+            )
+
+        requests_per_minute = model_config.get("requests_per_minute")
+        tokens_per_minute = model_config.get("tokens_per_minute")
+        limiter = get_rate_limiter(provider, model_name, requests_per_minute, tokens_per_minute)
+        if limiter is not None:
+            self.logger.info(
+                f"Rate limiting {model_name}: {requests_per_minute or 'unlimited'} requests/min, "
+                f"{tokens_per_minute or 'unlimited'} tokens/min"
+            )
+            handler = RateLimitCallbackHandler(limiter, model_name, approximate_tokens=provider == "fake")
+            hooks["callbacks"].append(handler)
+            hooks["rate_limiter"] = handler
+        return hooks
@@ -25,6 +25,7 @@ from .prompts.mcp_file_relevance_prompt import (
     MCP_FEATURE_DISCOVERY_SYSTEM_PROMPT,
     MCP_FEATURE_SYNTHESIS_SYSTEM_PROMPT,
 )
+from .telemetry import llm_call_metadata
 
 
 class MCPManager:
@@ -211,7 +212,10 @@ Please analyze the documentation and identify the most relevant SOURCE CODE file
                 with open(debug_log_path, "a") as f:
                     f.write(f"MCPManager: Calling self.llm.invoke()...\n")
 
-                response = self.llm.invoke([system_message, human_message])
+                response = self.llm.invoke(
+                    [system_message, human_message],
+                    config={"metadata": llm_call_metadata("mcp_file_relevance", state.user_query)},
+                )
 
                 with open(debug_log_path, "a") as f:
                     f.write(f"MCPManager: LLM invoke completed\n")
@@ -384,7 +388,14 @@ Please analyze the documentation guide and identify which documentation files co
                     with open(debug_log_path, "a") as f:
                         f.write(f"MCPManager: LLM call attempt {retry_count + 1}/{max_retries}\n")
                     
-                    response = self.llm.invoke(messages)
+                    response = self.llm.invoke(
+                        messages,
+                        config={
+                            "metadata": llm_call_metadata(
+                                "mcp_file_discovery", state.user_query, retry_count
+                            )
+                        },
+                    )
                     response_content = response.content
                     
                     with open(debug_log_path, "a") as f:
@@ -633,7 +644,14 @@ Please synthesize this information to provide a comprehensive understanding of t
                     with open(debug_log_path, "a") as f:
                         f.write(f"MCPManager: Synthesis LLM call attempt {retry_count + 1}/{max_retries}\n")
                     
-                    response = self.llm.invoke(messages)
+                    response = self.llm.invoke(
+                        messages,
+                        config={
+                            "metadata": llm_call_metadata(
+                                "mcp_feature_synthesis", state.user_query, retry_count
+                            )
+                        },
+                    )
                     response_content = response.content
                     
                     with open(debug_log_path, "a") as f:
@@ -791,6 +809,7 @@ Please fix the JSON formatting and provide a valid JSON response that matches th
     ) -> MCPRelevantFilesResponse:
         """Find relevant files based on description."""
         start_time = time.time()
+        self.llm_manager.start_run(repo_path / "documentation_output")
 
         # Create initial state
         initial_state = MCPState(
@@ -891,6 +910,7 @@ Please fix the JSON formatting and provide a valid JSON response that matches th
         import time
 
         start_time = time.time()
+        self.llm_manager.start_run(repo_path / "documentation_output")
         # Create initial state
         initial_state = MCPState(
             request_type="understand_feature",
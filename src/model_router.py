@@ -0,0 +1,121 @@
+"""
+Model Routing
+
+Sends each file to the model of the first configured route it matches, so
+trivial files can go to a fast, cheap model and only large or complex ones
+to ``model.name``. Routes match on the file's prompt tokens, extension,
+path globs and a complexity score; files no route matches use the default
+model.
+
+The complexity score counts definitions and branches: function and class
+definitions, conditionals, loops, exception handlers and boolean operators.
+Python files are scored from their AST, other languages by matching the
+usual keywords, so the same thresholds fit both.
+"""
+
+import ast
+import fnmatch
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+from .models import CodeFile, ModelRoute
+
+DEFAULT_ROUTE = "default"
+
+_PYTHON_COMPLEXITY_NODES = (
+    ast.FunctionDef,
+    ast.AsyncFunctionDef,
+    ast.ClassDef,
+    ast.If,
+    ast.IfExp,
+    ast.For,
+    ast.AsyncFor,
+    ast.While,
+    ast.Try,
+    ast.ExceptHandler,
+    ast.With,
+    ast.AsyncWith,
+    ast.BoolOp,
+    ast.comprehension,
+)
+
+_COMPLEXITY_PATTERN = re.compile(
+    r"\b(?:if|elif|elsif|for|foreach|while|case|when|catch|except|rescue|switch|match"
+    r"|function|def|class|struct|interface|trait|impl|fn|func)\b|&&|\|\|"
+)
+
+
+def complexity_score(code_file: CodeFile, content: str) -> int:
+    """Count the definitions and branches in a file."""
+    if code_file.extension == ".py":
+        try:
+            tree = ast.parse(content)
+        except (SyntaxError, ValueError):
+            pass
+        else:
+            return sum(1 for node in ast.walk(tree) if isinstance(node, _PYTHON_COMPLEXITY_NODES))
+    return len(_COMPLEXITY_PATTERN.findall(content))
+
+
+class ModelRouter:
+    """Chooses the model a file is documented with."""
+
+    def __init__(self, routes: List[ModelRoute], llms: Dict[str, Any], default_llm):
+        """Initialize the router.
+
+        Args:
+            routes: Routes in the order they are tried
+            llms: Chat model of each route, by route name
+            default_llm: Chat model of files no route matches
+        """
+        self.routes = routes
+        self.llms = llms
+        self.default_llm = default_llm
+        self.uses_complexity = any(
+            route.min_complexity is not None or route.max_complexity is not None for route in routes
+        )
+        self.logger = logging.getLogger(__name__)
+
+    def select(self, code_file: CodeFile, content: str, tokens: int) -> str:
+        """Return the name of the route ``code_file`` is documented through."""
+        # The score is only computed when a route needs it
+        complexity = complexity_score(code_file, content) if self.uses_complexity else None
+        for route in self.routes:
+            if self._matches(route, code_file, tokens, complexity):
+                self.logger.debug(f"Routing {code_file.relative_path} to {route.name}")
+                return route.name
+        return DEFAULT_ROUTE
+
+    def get_llm(self, route: Optional[str]):
+        """Return the chat model of a route."""
+        if route is None or route == DEFAULT_ROUTE:
+            return self.default_llm
+        return self.llms[route]
+
+    def get_route_model(self, route: Optional[str]) -> Optional[dict]:
+        """Return the model settings of a route, or None for the default model."""
+        for candidate in self.routes:
+            if candidate.name == route:
+                return candidate.model
+        return None
+
+    @staticmethod
+    def _matches(route: ModelRoute, code_file: CodeFile, tokens: int, complexity: Optional[int]) -> bool:
+        if route.min_file_tokens is not None and tokens < route.min_file_tokens:
+            return False
+        if route.max_file_tokens is not None and tokens > route.max_file_tokens:
+            return False
+        if route.min_complexity is not None and complexity < route.min_complexity:
+            return False
+        if route.max_complexity is not None and complexity > route.max_complexity:
+            return False
+        if route.extensions and code_file.extension.lower() not in {
+            extension.lower() for extension in route.extensions
+        }:
+            return False
+        if route.paths and not any(
+            fnmatch.fnmatch(code_file.relative_path, pattern) for pattern in route.paths
+        ):
+            return False
+        return True
@@ -1,4 +1,5 @@
-from typing import Dict, Any, List, Optional
+import operator
+from typing import Annotated, Dict, Any, List, Optional, Tuple
 from pydantic import BaseModel, Field
 from pathlib import Path
 
@@ -15,6 +16,9 @@ class PipelineConfig(BaseModel):
     templates: Dict[str, Any] = Field(default_factory=dict)
     design_docs: Dict[str, Any] = Field(default_factory=dict)
     retry_config: Dict[str, Any] = Field(default_factory=dict)  
+    watch: Dict[str, Any] = Field(default_factory=dict)
+    estimation: Dict[str, Any] = Field(default_factory=dict)
+    telemetry: Dict[str, Any] = Field(default_factory=dict)
 
 
 class DocumentationRequest(BaseModel):
@@ -28,15 +32,86 @@ class DocumentationRequest(BaseModel):
     design_docs: bool = False
     guide: bool = False
     force_full_guide: bool = False
+    since: Optional[str] = None  # Git revision to detect changes from ("last" for the last documented commit)
+    shard: Optional[Tuple[int, int]] = None  # (index, count) with a 1-based index: only this shard's files
 
 
 class CodeFile(BaseModel):
-    """Model representing a code file to be documented."""
+    """Model representing a code file to be documented.
+
+    Content is loaded on demand through ``CodeAnalyzer.read_content`` so that
+    the pipeline state only holds lightweight file descriptors.
+    """
 
     path: Path
-    content: str
     extension: str
     relative_path: str
+    size: int = 0  # File size in bytes at scan time
+    mtime_ns: int = 0  # Modification time in nanoseconds at scan time
+    inode: int = 0  # Inode number at scan time
+    file_hash: Optional[str] = None  # SHA-256 of the content, set from the scan index
+    content: Optional[str] = None  # Only set when content was preloaded
+
+
+class ModelRoute(BaseModel):
+    """A rule sending the files it matches to a configured model.
+
+    Every condition that is set must hold for a file to match.
+    """
+
+    name: str
+    model: Dict[str, Any]  # Model configuration, as under ``model``
+    min_file_tokens: Optional[int] = None
+    max_file_tokens: Optional[int] = None
+    min_complexity: Optional[int] = None
+    max_complexity: Optional[int] = None
+    extensions: List[str] = Field(default_factory=list)  # For example [".json", ".md"]
+    paths: List[str] = Field(default_factory=list)  # Globs matched against the relative path
+
+
+class CodeChunk(BaseModel):
+    """A contiguous range of lines from a code file that is documented on its own."""
+
+    index: int = 0  # Position of the chunk within the file
+    name: str  # Definitions covered by the chunk, or its line range
+    start_line: int  # 1-based, inclusive
+    end_line: int  # 1-based, inclusive
+    content: str
+
+
+class TokenUsage(BaseModel):
+    """Token counts reported by the LLM provider, summed over calls."""
+
+    calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0  # Input tokens served from the provider's prompt cache
+    cache_creation_tokens: int = 0  # Input tokens written to the prompt cache
+
+    def add_response(self, response) -> None:
+        """Add the usage metadata of a chat model response, if it has any."""
+        usage = getattr(response, "usage_metadata", None)
+        if not usage:
+            return
+        if (getattr(response, "response_metadata", None) or {}).get("response_cache_hit"):
+            # Served from the local response cache, the provider was not called
+            return
+        details = usage.get("input_token_details") or {}
+        self.calls += 1
+        self.input_tokens += usage.get("input_tokens", 0)
+        self.output_tokens += usage.get("output_tokens", 0)
+        self.cache_read_tokens += details.get("cache_read") or 0
+        self.cache_creation_tokens += details.get("cache_creation") or 0
+
+
+class ScanIndexEntry(BaseModel):
+    """Stat signature and content digest of a source file from a previous scan."""
+
+    relative_path: str
+    size: int
+    mtime_ns: int
+    inode: int
+    sha256: str
 
 
 class DocumentationContext(BaseModel):
@@ -48,6 +123,10 @@ class DocumentationContext(BaseModel):
     original_docs: List[str] = Field(default_factory=list)
 
 
+# Documentation of a result whose file was not sent to the LLM
+SKIPPED_DOCUMENTATION = "[SKIPPED - No changes detected]"
+
+
 class DocumentationResult(BaseModel):
     """Model representing the generated documentation for a file."""
 
@@ -55,6 +134,9 @@ class DocumentationResult(BaseModel):
     documentation: str
     success: bool
     error_message: Optional[str] = None
+    file_hash: Optional[str] = None  # SHA-256 of the documented source, if known
+    saved: bool = False  # Already written to its documentation file; the text is not kept here
+    duplicate_of: Optional[Path] = None  # Byte-identical file whose documentation was reused
 
 
 class DocumentationGuideEntry(BaseModel):
@@ -130,17 +212,51 @@ class ChangeSet(BaseModel):
     new_files: List[str] = Field(default_factory=list)  # New source files
     modified_files: List[str] = Field(default_factory=list)  # Modified source files
     deleted_files: List[str] = Field(default_factory=list)  # Deleted source files
+    renamed_files: Dict[str, str] = Field(default_factory=dict)  # Old path -> new path, entries are moved
     force_full_rebuild: bool = False  # Force complete guide regeneration
 
+class SourceChangeSet(BaseModel):
+    """Source files known to have changed, from git or from file system events."""
+    
+    since_commit: Optional[str] = None  # Git commit the changes are relative to
+    head_commit: Optional[str] = None  # Git HEAD at detection time
+    added: List[str] = Field(default_factory=list)  # Added or untracked files
+    modified: List[str] = Field(default_factory=list)  # Modified files, including renames with edits
+    deleted: List[str] = Field(default_factory=list)  # Deleted files
+    renamed: Dict[str, str] = Field(default_factory=dict)  # Old path -> new path
+
+class ShardFileResult(BaseModel):
+    """Outcome of one file in a sharded run, as recorded in the shard's report fragment."""
+
+    relative_path: str  # Source path relative to the repository
+    documentation_path: str  # Documentation path relative to the output path
+    success: bool
+    skipped: bool = False  # Documentation was already up to date
+    error_message: Optional[str] = None
+    duplicate_of: Optional[str] = None  # Relative path of the identical file it was documented from
+
+class ShardReport(BaseModel):
+    """Report fragment written by a sharded run and combined by the merge step."""
+
+    shard_index: int  # 1-based
+    shard_count: int
+    files: List[ShardFileResult] = Field(default_factory=list)
+    llm_calls: List[Dict[str, Any]] = Field(default_factory=list)  # Telemetry records of the run
+    response_cache_stats: Optional[Dict[str, int]] = None
+    hedging_stats: Optional[Dict[str, Any]] = None
+
 class PipelineState(BaseModel):
     """State model for the LangGraph pipeline."""
 
     request: DocumentationRequest
     existing_docs: DocumentationContext
     code_files: List[CodeFile] = Field(default_factory=list)
-    results: List[DocumentationResult] = Field(default_factory=list)
+    # Nodes return only new results; LangGraph appends them to the channel
+    results: Annotated[List[DocumentationResult], operator.add] = Field(default_factory=list)
     current_file_index: int = 0
     completed: bool = False
     documentation_guide: Optional[DocumentationGuide] = None
     design_documentation_state: Optional[DesignDocumentationState] = None
-    guide_change_set: Optional[ChangeSet] = None  # For incremental guide updates
\ No newline at end of file
+    guide_change_set: Optional[ChangeSet] = None  # For incremental guide updates
+    source_changes: Optional[SourceChangeSet] = None  # Only these files are visited when set
+    file_documentation_usage: Optional[TokenUsage] = None  # Provider token usage of file documentation
\ No newline at end of file
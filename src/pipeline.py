@@ -1,15 +1,10 @@
-from datetime import datetime
+import asyncio
 import logging
-from typing import Dict, Any, List, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, END
-from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_core.prompts import ChatPromptTemplate
 from pathlib import Path
 
-from .prompts.generate_file_documentation_system_message import (
-    GENERATED_FILE_DOCUMENTATION_SYSTEM_MESSAGE,
-)
-
 from .guide_generator import GuideGenerator
 from .design_document_generator import DesignDocumentGenerator
 from .file_processor import FileProcessor
@@ -17,6 +12,7 @@ from .report_generator import ReportGenerator
 from .context_manager import ContextManager
 from .state_manager import StateManager
 from .llm_manager import LLMManager
+from .file_documentation_generator import FileDocumentationGenerator, FileDocumentationRun
 
 from .models import (
     PipelineState,
@@ -24,10 +20,17 @@ from .models import (
     DocumentationResult,
     CodeFile,
     DocumentationRequest,
+    SourceChangeSet,
 )
 from .config import ConfigManager
 from .document_processor import DocumentProcessor
 from .code_analyzer import CodeAnalyzer
+from .run_checkpoint import RunCheckpoint, RunJournal
+from .scan_index import ScanIndex
+from .git_change_detector import GitChangeDetector
+from .sharding import ShardMerger, write_shard_report
+from .hedging import combine_hedging_stats
+from .model_router import ModelRouter
 
 
 class DocumentationPipeline:
@@ -52,8 +55,31 @@ class DocumentationPipeline:
         )
         self.file_processor = FileProcessor(self.config)
         self.report_generator = ReportGenerator(self.config)
+
+        # File documentation may go to other models through model routes
+        self.model_router = None
+        routes = self.llm_manager.get_model_routes()
+        if routes:
+            self.model_router = ModelRouter(
+                routes, self.llm_manager.initialize_route_llms(routes), self.llm
+            )
         self.context_manager = ContextManager(self.config, self.doc_processor, self.llm)
         self.state_manager = StateManager(self.config)
+        self.file_documentation_generator = FileDocumentationGenerator(
+            self.config,
+            self.llm,
+            self.code_analyzer,
+            self.file_processor,
+            self.guide_generator,
+            self.doc_processor,
+            self.model_router,
+        )
+
+        # Kept across runs so repeated runs (watch mode) skip recompiling the
+        # graph and reloading the scan index; both are per output path
+        self._compiled_pipelines: Dict[Path, Any] = {}
+        self._run_checkpoints: Dict[Path, RunCheckpoint] = {}
+        self._scan_indexes: Dict[Path, ScanIndex] = {}
 
         self._setup_logging()
 
@@ -74,8 +100,13 @@ class DocumentationPipeline:
         self.logger = logging.getLogger(__name__)
         self.logger.info("Documentation pipeline initialized")
 
-    def create_pipeline(self):
-        """Create the LangGraph pipeline."""
+    def create_pipeline(self, checkpointer=None):
+        """Create the LangGraph pipeline.
+
+        Args:
+            checkpointer: LangGraph checkpointer that saves the state after
+                every node, so an interrupted run can be resumed
+        """
         workflow = StateGraph(PipelineState)
 
         # Add nodes
@@ -85,7 +116,6 @@ class DocumentationPipeline:
         )
         workflow.add_node("load_documentation_guide", self.load_documentation_guide)
         workflow.add_node("summarize_docs", self.summarize_docs)
-        workflow.add_node("scan_repository", self.scan_repository)
         workflow.add_node("generate_documentation", self.generate_documentation)
         workflow.add_node(
             "generate_documentation_guide", self.generate_documentation_guide_node
@@ -125,21 +155,13 @@ class DocumentationPipeline:
             "check_file_generation",
             self.should_generate_files,
             {
-                "generate": "scan_repository",
+                "generate": "generate_documentation",
                 "skip": "check_guide_generation",
             },  # CHANGED
         )
 
         workflow.add_edge("summarize_docs", "check_file_generation")
-        workflow.add_edge("scan_repository", "generate_documentation")
-        workflow.add_conditional_edges(
-            "generate_documentation",
-            self.has_more_files,
-            {
-                "continue": "generate_documentation",
-                "finish": "check_guide_generation",
-            },  # CHANGED
-        )
+        workflow.add_edge("generate_documentation", "check_guide_generation")
 
         # Guide generation check and flow
         workflow.add_node("check_guide_generation", self.check_guide_generation_step)
@@ -184,7 +206,7 @@ class DocumentationPipeline:
 
         workflow.add_edge("save_results", END)
 
-        return workflow.compile()
+        return workflow.compile(checkpointer=checkpointer)
 
     # Pipeline node methods - delegate to appropriate managers
     def load_existing_docs(self, state: PipelineState) -> Dict[str, Any]:
@@ -201,11 +223,20 @@ class DocumentationPipeline:
         """Load existing documentation files instead of generating new ones."""
         return self.guide_generator.load_existing_documentation(state)
 
-    def generate_documentation_guide_node(self, state: PipelineState) -> Dict[str, Any]:
+    def generate_documentation_guide_node(
+        self, state: PipelineState, config: Optional[RunnableConfig] = None
+    ) -> Dict[str, Any]:
         """Generate documentation guide as a separate workflow step."""
         if not state.request.guide:
             return {"completed": True}
 
+        self.guide_generator.run_journal = self._get_run_journal(state, config)
+        try:
+            return self._generate_guide(state)
+        finally:
+            self.guide_generator.run_journal = None
+
+    def _generate_guide(self, state: PipelineState) -> Dict[str, Any]:
         print("Generating documentation guide...")
 
         # Check if full regeneration is forced
@@ -221,6 +252,7 @@ class DocumentationPipeline:
                 changeset.new_files
                 or changeset.modified_files
                 or changeset.deleted_files
+                or changeset.renamed_files
             ):
                 if changeset.force_full_rebuild:
                     print("Full guide rebuild required...")
@@ -261,138 +293,156 @@ class DocumentationPipeline:
         """Summarize existing documentation if it's too large."""
         return self.context_manager.summarize_docs(state)
 
-    def scan_repository(self, state: PipelineState) -> Dict[str, Any]:
-        """Scan the repository for code files."""
-        print(f"Scanning repository: {state.request.repo_path}")
-
-        code_files = self.code_analyzer.scan_repository(state.request.repo_path)
-
-        # Apply max_files limit if configured
-        max_files = state.request.config.processing.get("max_files")
-        if max_files and max_files > 0:
-            code_files = code_files[:max_files]
-            print(f"Limited to {max_files} files (configured maximum)")
-
-        print(f"Found {len(code_files)} code files to document")
-
-        return {"code_files": code_files, "current_file_index": 0}
-
-    def generate_documentation(self, state: PipelineState) -> Dict[str, Any]:
-        """Generate documentation for the current code file with enhanced error handling."""
-        if state.current_file_index >= len(state.code_files):
-            return {"completed": True}
-
-        current_file = state.code_files[state.current_file_index]
-        total_files = len(state.code_files)
-        current_index = state.current_file_index + 1
-
-        self.logger.info(
-            f"Processing file {current_index}/{total_files}: {current_file.relative_path}"
-        )
-        print(
-            f"Processing file: {current_file.relative_path} ({current_index}/{total_files})"
+    def generate_documentation(
+        self, state: PipelineState, config: Optional[RunnableConfig] = None
+    ) -> Dict[str, Any]:
+        """Scan the repository and document each code file as the scan finds it."""
+        run, scan_index = self._start_file_documentation(
+            state, journal=self._get_run_journal(state, config)
         )
 
-        # Check if we should generate documentation for this file
-        if not self.file_processor.should_generate_documentation(
-            state, current_file, self.guide_generator
-        ):
-            self.logger.info(f"Skipping unchanged file: {current_file.relative_path}")
-            # Create a "skipped" result to track that we processed this file
-            result = DocumentationResult(
-                file_path=current_file.path,
-                documentation="[SKIPPED - No changes detected]",
-                success=True,
-                error_message=None,
+        results = []
+        successful_so_far = 0
+        for result in run:
+            results.append(result)
+            if result.success:
+                successful_so_far += 1
+            self.logger.info(
+                f"Progress: {len(results)} processed, {successful_so_far} successful, "
+                f"{len(results) - successful_so_far} failed"
             )
 
-            # Update results and move to next file
-            new_results = state.results + [result]
-            new_index = state.current_file_index + 1
-            return {"results": new_results, "current_file_index": new_index}
+        self._finish_file_documentation(state, run, scan_index)
 
-        self.logger.info(f"Generating documentation for: {current_file.relative_path}")
-        print(f"  → Generating documentation...")
+        return {
+            "code_files": run.code_files,
+            # Concurrent files finish in any order; the report follows the scan
+            "results": run.sort_results(results),
+            "current_file_index": len(run.code_files),
+            "file_documentation_usage": run.usage,
+        }
 
-        try:
-            # Prepare context
-            context = self.doc_processor.prepare_context(state.existing_docs)
-
-            # Create documentation prompt
-            doc_prompt = ChatPromptTemplate.from_messages(
-                [
-                    SystemMessage(
-                        content=GENERATED_FILE_DOCUMENTATION_SYSTEM_MESSAGE.format(
-                            context=context,
-                            current_file_extension=current_file.extension or "text",
-                            current_file_relative_path=current_file.relative_path,
-                        )
-                    ),
-                    HumanMessage(
-                        content=f"Document this code file:\n\n```{current_file.extension[1:] if current_file.extension else 'text'}\n{current_file.content}\n```"
-                    ),
-                ]
-            )
+    def _start_file_documentation(
+        self, state: PipelineState, journal: Optional[RunJournal] = None
+    ) -> Tuple[FileDocumentationRun, Optional[ScanIndex]]:
+        """Create a file documentation run for the request in ``state``."""
+        print(f"Scanning repository: {state.request.repo_path}")
 
-            messages = doc_prompt.format_messages()
-            response = self.llm.invoke(
-                messages,
-                config={
-                    "recursion_limit": self.config.model.get("recursion_limit", 50)
-                },
-            )
+        # Apply max_files limit if configured; the scan stops once it is reached
+        max_files = self._get_max_files()
+
+        # Reuse content digests of files whose stat signature is unchanged
+        scan_index = None
+        if state.request.config.processing.get("use_scan_index", True):
+            scan_index = self._get_scan_index(state.request.output_path)
+
+        code_files = None
+        if state.source_changes is not None:
+            # Only the files known to have changed are visited
+            code_files = self._scan_source_changes(state, scan_index)
+
+        run = self.file_documentation_generator.start(
+            state,
+            scan_index=scan_index,
+            code_files=code_files,
+            max_files=max_files,
+            journal=journal,
+        )
+        return run, scan_index
+
+    def _finish_file_documentation(
+        self, state: PipelineState, run: FileDocumentationRun, scan_index: Optional[ScanIndex]
+    ) -> None:
+        """Report the scan size and save the scan index after a run."""
+        max_files = self._get_max_files()
+        limited = bool(max_files and len(run.code_files) >= max_files)
+        if limited:
+            print(f"Limited to {max_files} files (configured maximum)")
 
-            # Handle different response types
-            if hasattr(response, "content"):
-                documentation = response.content
-            else:
-                documentation = str(response)
+        if scan_index is not None:
+            # A partial scan did not visit every file, so keep their entries
+            full_scan = run.completed and state.source_changes is None and not limited
+            scan_index.save(prune=full_scan)
 
-            result = DocumentationResult(
-                file_path=current_file.path, documentation=documentation, success=True
+        print(f"Processed {len(run.code_files)} code files")
+        if run.deduplicated:
+            print(
+                f"✓ {run.deduplicated} byte-identical files documented from a copy, "
+                f"saving {run.deduplicated} LLM calls"
             )
 
-            # Save immediately if incremental saving is enabled
-            save_incrementally = state.request.config.processing.get(
-                "save_incrementally", True
+        usage = run.usage
+        if usage.calls:
+            cached_share = usage.cache_read_tokens / usage.input_tokens if usage.input_tokens else 0
+            message = (
+                f"Prompt cache: {usage.cache_read_tokens:,} of {usage.input_tokens:,} input tokens "
+                f"read from cache ({cached_share:.0%}), {usage.cache_creation_tokens:,} written, "
+                f"over {usage.calls} requests"
             )
-            if save_incrementally:
-                try:
-                    self.file_processor.save_single_result(state, result)
-                    self.logger.info(
-                        f"Successfully saved documentation for: {current_file.relative_path}"
-                    )
-                except Exception as save_error:
-                    self.logger.error(
-                        f"Failed to save documentation for {current_file.relative_path}: {save_error}"
-                    )
-                    result.success = False
-                    result.error_message = f"Save failed: {str(save_error)}"
-
-        except Exception as e:
-            error_msg = f"Failed to generate documentation for {current_file.relative_path}: {str(e)}"
-            self.logger.error(error_msg, exc_info=True)
-
-            result = DocumentationResult(
-                file_path=current_file.path,
-                documentation="",
-                success=False,
-                error_message=str(e),
-            )
-            print(f"  → Error generating documentation: {e}")
+            self.logger.info(message)
+            print(message)
+
+    def _get_max_files(self) -> Optional[int]:
+        """Get the configured maximum number of files, or None for no limit."""
+        max_files = self.config.processing.get("max_files")
+        if not max_files or max_files <= 0:
+            return None
+        return max_files
+
+    def _get_run_checkpoint(self, output_path: Path) -> RunCheckpoint:
+        """Return the checkpoint storage for an output path, opening it on first use."""
+        checkpoint = self._run_checkpoints.get(output_path)
+        if checkpoint is None:
+            checkpoint = RunCheckpoint(output_path)
+            self._run_checkpoints[output_path] = checkpoint
+        return checkpoint
+
+    def _get_run_journal(
+        self, state: PipelineState, config: Optional[RunnableConfig]
+    ) -> Optional[RunJournal]:
+        """Return the journal of the checkpointed run a node belongs to, if any."""
+        thread_id = (config or {}).get("configurable", {}).get("thread_id")
+        if not thread_id:
+            return None
+        return self._get_run_checkpoint(state.request.output_path).journal(thread_id)
+
+    def _get_scan_index(self, output_path: Path) -> ScanIndex:
+        """Return the scan index for an output path, loading it on first use."""
+        scan_index = self._scan_indexes.get(output_path)
+        if scan_index is None:
+            scan_index = ScanIndex(output_path)
+            self._scan_indexes[output_path] = scan_index
+        else:
+            scan_index.begin_scan()
+        return scan_index
+
+    def _scan_source_changes(self, state: PipelineState, scan_index) -> List[CodeFile]:
+        """Apply known deletions and renames, and return the changed files to document."""
+        source_changes = state.source_changes
+        origin = (
+            f"git changes since {source_changes.since_commit[:8]}"
+            if source_changes.since_commit
+            else "detected changes"
+        )
+        print(
+            f"Using {origin}: "
+            f"{len(source_changes.added)} added, {len(source_changes.modified)} modified, "
+            f"{len(source_changes.deleted)} deleted, {len(source_changes.renamed)} renamed"
+        )
 
-        # Update results and move to next file
-        new_results = state.results + [result]
-        new_index = state.current_file_index + 1
+        for relative_path in source_changes.deleted:
+            self.file_processor.remove_documentation(state, relative_path)
 
-        # Log progress
-        successful_so_far = len([r for r in new_results if r.success])
-        failed_so_far = len([r for r in new_results if not r.success])
-        self.logger.info(
-            f"Progress: {current_index}/{total_files} processed, {successful_so_far} successful, {failed_so_far} failed"
-        )
+        # Renamed files keep their documentation; renames with edits are also
+        # listed as modified and get regenerated if their hash changed
+        for old_path, new_path in source_changes.renamed.items():
+            self.file_processor.move_documentation(state, old_path, new_path)
 
-        return {"results": new_results, "current_file_index": new_index}
+        return self.code_analyzer.scan_paths(
+            state.request.repo_path,
+            source_changes.added + source_changes.modified,
+            scan_index=scan_index,
+        )
 
     def generate_design_documentation(self, state: PipelineState) -> Dict[str, Any]:
         """Generate design documentation from the individual file documentation."""
@@ -442,7 +492,29 @@ class DocumentationPipeline:
 
     def save_results(self, state: PipelineState) -> Dict[str, Any]:
         """Save the summary report and handle any remaining non-incremental saves."""
-        return self.report_generator.save_results(state, self.file_processor)
+        response_cache = self.llm_manager.response_cache
+        response_cache_stats = response_cache.stats() if response_cache is not None else None
+        hedging_stats = self.llm_manager.hedging_stats.stats()
+        telemetry = self.llm_manager.telemetry
+        telemetry.write_prometheus()
+        if state.request.shard is not None:
+            report_path = write_shard_report(
+                state,
+                self.file_processor,
+                telemetry.run_records(),
+                response_cache_stats,
+                hedging_stats,
+            )
+            print(f"✓ Shard report saved: {report_path}")
+        return self.report_generator.save_results(
+            state,
+            self.file_processor,
+            response_cache_stats=response_cache_stats,
+            llm_call_summary=telemetry.summary() if telemetry.enabled else None,
+            hedging_stats=hedging_stats,
+            llm_route_summary=telemetry.summary("route") if telemetry.enabled else None,
+            llm_node_summary=telemetry.summary("node") if telemetry.enabled else None,
+        )
 
     # State management methods - delegate to StateManager
     def should_load_existing_docs(self, state: PipelineState) -> str:
@@ -461,10 +533,6 @@ class DocumentationPipeline:
         """Determine if design documentation should be generated."""
         return self.state_manager.should_generate_design_docs(state)
 
-    def has_more_files(self, state: PipelineState) -> str:
-        """Check if there are more files to process."""
-        return self.state_manager.has_more_files(state)
-
     def has_more_sections(self, state: PipelineState) -> str:
         """Check if there are more sections to process in the current document."""
         return self.state_manager.has_more_sections(state)
@@ -490,17 +558,253 @@ class DocumentationPipeline:
         design_docs: bool = False,
         guide: bool = False,
         force_full_guide: bool = False,
+        since: Optional[str] = None,
+        changes: Optional[SourceChangeSet] = None,
+        resume: bool = False,
+        shard: Optional[Tuple[int, int]] = None,
     ) -> PipelineState:
-        """Run the complete documentation pipeline."""
+        """Run the complete documentation pipeline.
 
-        if output_path is None:
-            output_path = repo_path / "documentation_output"
+        When ``since`` is given, file documentation, the guide and cleanup of
+        deleted files are driven by the git diff between that revision (or the
+        last documented commit for ``"last"``) and the working tree.
+        ``changes`` does the same for an already known set of changed files,
+        such as those reported by the file watcher.
+
+        Progress is checkpointed under the output path. With ``resume``, an
+        interrupted run for the same output path continues after its last
+        completed node with the options it was started with; files and guide
+        entries it already finished are not sent to the LLM again.
+
+        ``shard`` (index, count) documents only the files of one shard; the
+        outputs of all shards are combined with ``merge_shards``.
+        """
 
         # Validate that at least one action is specified
         if not (file_docs or design_docs or guide):
             raise ValueError(
                 "Must specify at least one of --file-docs, --design-docs, or --guide"
             )
+        if shard is not None and (design_docs or guide):
+            raise ValueError(
+                "--shard only generates file documentation; the guide is built by merge"
+            )
+
+        if output_path is None:
+            output_path = repo_path / "documentation_output"
+        checkpoint = self._get_run_checkpoint(output_path)
+        self.llm_manager.start_run(output_path)
+
+        interrupted = checkpoint.interrupted_run()
+        if resume and interrupted:
+            print(f"Resuming interrupted run {interrupted['thread_id'][:8]}")
+            thread_id = interrupted["thread_id"]
+            head_commit = interrupted.get("head_commit")
+            git_detector = GitChangeDetector(repo_path, output_path)
+            # The graph continues from its last checkpoint
+            pipeline_input = None
+        else:
+            if resume:
+                print("No interrupted run to resume, starting a new run")
+            elif interrupted:
+                print("Discarding an interrupted run (use --resume to continue it)")
+            pipeline_input, git_detector, head_commit = self._create_initial_state(
+                repo_path,
+                docs_path=docs_path,
+                output_path=output_path,
+                file_docs=file_docs,
+                design_docs=design_docs,
+                guide=guide,
+                force_full_guide=force_full_guide,
+                since=since,
+                changes=changes,
+                shard=shard,
+            )
+            thread_id = checkpoint.start_run(head_commit)
+
+        pipeline = self._compiled_pipelines.get(output_path)
+        if pipeline is None:
+            pipeline = self.create_pipeline(checkpointer=checkpoint.saver)
+            self._compiled_pipelines[output_path] = pipeline
+        model_config = self.config_manager.get_model_config()
+        final_state = pipeline.invoke(
+            pipeline_input,
+            config={
+                "recursion_limit": model_config.get("recursion_limit", 50),
+                "configurable": {"thread_id": thread_id},
+            },
+        )
+        checkpoint.finish_run(thread_id)
+
+        if final_state["request"].file_docs and head_commit:
+            self._record_documented_commit(git_detector, head_commit, final_state)
+
+        return final_state
+
+    async def stream(
+        self,
+        repo_path: Path,
+        docs_path: Optional[Path] = None,
+        output_path: Optional[Path] = None,
+        since: Optional[str] = None,
+        changes: Optional[SourceChangeSet] = None,
+    ) -> AsyncIterator[DocumentationResult]:
+        """Generate file documentation, yielding each result as soon as it is written.
+
+        This runs only the file documentation part of the pipeline (existing
+        docs are loaded and summarized first as in ``run``), so callers can
+        index documentation while the rest of the repository is still being
+        processed. Guide and design documents are not generated.
+
+        Example:
+            async for result in pipeline.stream(Path("repo")):
+                print(result.file_path, result.success)
+        """
+        state, git_detector, head_commit = self._create_initial_state(
+            repo_path,
+            docs_path=docs_path,
+            output_path=output_path,
+            file_docs=True,
+            since=since,
+            changes=changes,
+        )
+
+        self.llm_manager.start_run(state.request.output_path)
+
+        loop = asyncio.get_running_loop()
+        state = await loop.run_in_executor(None, self._load_file_documentation_context, state)
+
+        run, scan_index = self._start_file_documentation(state)
+        results = iter(run)
+        collected = []
+        try:
+            while True:
+                # The stages run in their own threads; only waiting for the
+                # next result is moved off the event loop
+                result = await loop.run_in_executor(None, next, results, None)
+                if result is None:
+                    break
+                collected.append(result)
+                yield result
+        finally:
+            results.close()
+
+        self._finish_file_documentation(state, run, scan_index)
+        self.llm_manager.telemetry.write_prometheus()
+        if head_commit:
+            self._record_documented_commit(
+                git_detector,
+                head_commit,
+                {"results": collected, "code_files": run.code_files},
+            )
+
+    def merge_shards(
+        self,
+        repo_path: Path,
+        shard_paths: List[Path],
+        output_path: Optional[Path] = None,
+        docs_path: Optional[Path] = None,
+        guide: bool = True,
+    ) -> PipelineState:
+        """Merge the outputs of a sharded run and build the documentation guide once.
+
+        The summary report covers the files of every shard, and the LLM
+        calls of the shards and of the guide.
+        """
+        if output_path is None:
+            output_path = repo_path / "documentation_output"
+
+        merger = ShardMerger(repo_path, output_path)
+        reports = merger.merge(shard_paths)
+
+        existing_docs = DocumentationContext(
+            content="", token_count=0, summarized=False, original_docs=[]
+        )
+        documentation_guide = None
+        if guide:
+            final_state = self.run(
+                repo_path, docs_path=docs_path, output_path=output_path, guide=True
+            )
+            existing_docs = final_state["existing_docs"]
+            documentation_guide = final_state.get("documentation_guide")
+        else:
+            self.llm_manager.start_run(output_path)
+
+        # The guide run started a new telemetry run; add the shards' calls to it
+        telemetry = self.llm_manager.telemetry
+        for report in reports:
+            telemetry.add_records(report.llm_calls)
+        telemetry.write_prometheus()
+
+        response_cache = self.llm_manager.response_cache
+        cache_stats = [report.response_cache_stats for report in reports if report.response_cache_stats]
+        if response_cache is not None:
+            cache_stats.append(response_cache.stats())
+        response_cache_stats = None
+        if cache_stats:
+            response_cache_stats = {
+                key: sum(stats.get(key, 0) for stats in cache_stats) for key in cache_stats[0]
+            }
+
+        hedging_stats = combine_hedging_stats(
+            [report.hedging_stats for report in reports if report.hedging_stats]
+            + [self.llm_manager.hedging_stats.stats()]
+        )
+
+        state = PipelineState(
+            request=DocumentationRequest(
+                repo_path=repo_path,
+                docs_path=docs_path,
+                output_path=output_path,
+                config=self.config,
+                file_docs=True,
+                guide=guide,
+            ),
+            existing_docs=existing_docs,
+            results=merger.combined_results(reports),
+            documentation_guide=documentation_guide,
+        )
+        self.report_generator.generate_summary_report(
+            state,
+            response_cache_stats,
+            telemetry.summary() if telemetry.enabled else None,
+            hedging_stats,
+            telemetry.summary("route") if telemetry.enabled else None,
+            telemetry.summary("node") if telemetry.enabled else None,
+        )
+
+        successful = len([r for r in state.results if r.success])
+        print(f"✓ {successful} of {len(state.results)} files from {len(reports)} shards documented successfully")
+        return state
+
+    def _load_file_documentation_context(self, state: PipelineState) -> PipelineState:
+        """Load existing documentation into ``state``, summarizing it if needed."""
+        state.existing_docs = self.load_existing_docs(state)["existing_docs"]
+        if self.should_summarize(state) == "summarize":
+            state.existing_docs = self.summarize_docs(state)["existing_docs"]
+        return state
+
+    def _create_initial_state(
+        self,
+        repo_path: Path,
+        docs_path: Optional[Path] = None,
+        output_path: Optional[Path] = None,
+        file_docs: bool = False,
+        design_docs: bool = False,
+        guide: bool = False,
+        force_full_guide: bool = False,
+        since: Optional[str] = None,
+        changes: Optional[SourceChangeSet] = None,
+        shard: Optional[Tuple[int, int]] = None,
+    ) -> Tuple[PipelineState, GitChangeDetector, Optional[str]]:
+        """Build the initial pipeline state and resolve the changed files.
+
+        Returns:
+            The state, the git change detector, and the HEAD commit to record
+            once the run succeeds (None outside git or for known changes)
+        """
+        if output_path is None:
+            output_path = repo_path / "documentation_output"
 
         request = DocumentationRequest(
             repo_path=repo_path,
@@ -511,6 +815,8 @@ class DocumentationPipeline:
             design_docs=design_docs,
             guide=guide,
             force_full_guide=force_full_guide,
+            since=since,
+            shard=shard,
         )
 
         # Create initial state with empty existing_docs
@@ -518,13 +824,37 @@ class DocumentationPipeline:
             content="", token_count=0, summarized=False, original_docs=[]
         )
 
-        initial_state = PipelineState(request=request, existing_docs=initial_docs)
+        git_detector = GitChangeDetector(repo_path, output_path)
+        git_available = changes is None and git_detector.is_available()
+        head_commit = git_detector.get_head_commit() if git_available else None
+
+        source_changes = changes
+        if since and changes is None:
+            if not git_available:
+                raise ValueError(f"--since requires a git repository: {repo_path}")
+            since_commit = git_detector.resolve_since(since)
+            if since_commit:
+                source_changes = git_detector.detect_changes(since_commit)
+            else:
+                print("No last documented commit recorded, checking all files")
 
-        pipeline = self.create_pipeline()
-        model_config = self.config_manager.get_model_config()
-        final_state = pipeline.invoke(
-            initial_state,
-            config={"recursion_limit": model_config.get("recursion_limit", 50)},
+        initial_state = PipelineState(
+            request=request, existing_docs=initial_docs, source_changes=source_changes
         )
-
-        return final_state
+        return initial_state, git_detector, head_commit
+
+    def _record_documented_commit(
+        self, git_detector: GitChangeDetector, head_commit: str, final_state
+    ) -> None:
+        """Record HEAD as documented if every file was processed successfully."""
+        results = final_state.get("results", [])
+        if any(not r.success for r in results):
+            self.logger.info("Not recording documented commit: some files failed")
+            return
+
+        max_files = self._get_max_files()
+        if max_files and len(final_state.get("code_files", [])) >= max_files:
+            self.logger.info("Not recording documented commit: max_files limit reached")
+            return
+
+        git_detector.save_last_documented_commit(head_commit)
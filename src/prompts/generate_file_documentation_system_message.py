@@ -1,8 +1,8 @@
+# The system message holds only instructions and the shared project context,
+# so it is identical for every file and can be served from a provider's
+# prompt cache. Everything specific to a file goes in the human message.
 GENERATED_FILE_DOCUMENTATION_SYSTEM_MESSAGE = """You are a technical documentation generator. Create comprehensive documentation for the provided code file.
 
-Use this existing project documentation as context:
-{context}
-
 Generate documentation that includes:
 1. **Purpose**: What this file does and why it exists
 2. **Functionality**: Detailed explanation of the main functions/classes
@@ -11,5 +11,34 @@ Generate documentation that includes:
 5. **Usage Examples**: How this code would typically be used
 
 Format the output as clean Markdown. Be thorough but concise.
-File extension: {current_file_extension}
-Relative path: {current_file_relative_path}"""
\ No newline at end of file
+
+Use this existing project documentation as context:
+{context}"""
+
+GENERATED_FILE_DOCUMENTATION_HUMAN_MESSAGE = """File extension: {current_file_extension}
+Relative path: {current_file_relative_path}
+
+Document this code file:
+
+```{language}
+{content}
+```"""
+
+# Several small files documented in one request. Each file's documentation
+# must come back between the markers so it can be split per file.
+GENERATED_PACKED_FILE_DOCUMENTATION_HUMAN_MESSAGE = """Document each of the following {file_count} code files separately, as if each had been sent on its own.
+
+Reply with one section per file, in the order given, using exactly these marker lines and nothing outside the sections:
+
+===== BEGIN DOCUMENTATION: <relative path> =====
+<documentation for that file>
+===== END DOCUMENTATION: <relative path> =====
+
+{files}"""
+
+GENERATED_PACKED_FILE_ENTRY = """File extension: {current_file_extension}
+Relative path: {current_file_relative_path}
+
+```{language}
+{content}
+```"""
@@ -0,0 +1,210 @@
+"""
+LLM Rate Limiting
+
+Keeps LLM requests under the provider's requests-per-minute and
+tokens-per-minute limits. One limiter exists per provider and model for the
+whole process, and it is attached to every chat model LLMManager creates, so
+file documentation, guide summaries, context summarization, design documents
+and MCP analysis all draw from the same buckets.
+
+Prompt tokens are estimated before a request is sent and reserved from the
+token bucket; when the response arrives the reservation is settled against
+the token usage the provider reports. Responses served from the response
+cache are not limited.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import LLMResult
+from langchain_core.rate_limiters import BaseRateLimiter
+
+from .utilities.token_manager import TokenCounter
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """A bucket refilled continuously up to a per-minute limit.
+
+    Reservations are taken immediately and may leave the bucket negative;
+    the caller then waits until the deficit has been refilled, so waiting
+    callers are served in the order they reserved.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Take ``amount`` from the bucket and return the seconds to wait before using it."""
+        self._refill(now)
+        # A single request larger than the bucket would otherwise never fit
+        self.level -= min(amount, self.capacity)
+        return max(0.0, -self.level / self.rate)
+
+    def adjust(self, amount: float, now: float) -> None:
+        """Return ``amount`` to the bucket, or take it when negative."""
+        self._refill(now)
+        self.level = min(self.capacity, self.level + amount)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits for one provider and model."""
+
+    def __init__(self, requests_per_minute: Optional[float], tokens_per_minute: Optional[float]):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._lock = threading.Lock()
+
+    def acquire(self, estimated_tokens: int) -> float:
+        """Block until a request of ``estimated_tokens`` tokens may be sent.
+
+        Returns:
+            Seconds waited
+        """
+        with self._lock:
+            now = time.monotonic()
+            wait = 0.0
+            if self.requests is not None:
+                wait = max(wait, self.requests.reserve(1, now))
+            if self.tokens is not None:
+                wait = max(wait, self.tokens.reserve(estimated_tokens, now))
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def settle(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """Correct a reservation once the actual token usage is known."""
+        if self.tokens is None:
+            return
+        with self._lock:
+            self.tokens.adjust(estimated_tokens - actual_tokens, time.monotonic())
+
+
+_limiters: Dict[Tuple[str, str], RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(
+    provider: str,
+    model: str,
+    requests_per_minute: Optional[float],
+    tokens_per_minute: Optional[float],
+) -> Optional[RateLimiter]:
+    """Return the process-wide limiter for a provider and model, or None when unlimited."""
+    if not requests_per_minute and not tokens_per_minute:
+        return None
+    with _limiters_lock:
+        limiter = _limiters.get((provider, model))
+        if limiter is None:
+            limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+            _limiters[(provider, model)] = limiter
+        return limiter
+
+
+class RateLimitCallbackHandler(BaseCallbackHandler, BaseRateLimiter):
+    """Applies a RateLimiter to every request of the chat model it is attached to.
+
+    It is attached both as a callback, which estimates the prompt tokens when
+    a call starts and settles them when it ends, and as the model's rate
+    limiter, which LangChain only calls once the response cache has missed.
+    The estimate is handed from one to the other through a thread local, as
+    both run in the calling thread.
+    """
+
+    raise_error = True
+
+    def __init__(self, limiter: RateLimiter, model: str, approximate_tokens: bool = False):
+        self.limiter = limiter
+        self.model = model
+        self.token_counter = TokenCounter(approximate=approximate_tokens)
+        # Reserved tokens of the requests in flight, by run id
+        self._pending: Dict[UUID, int] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def on_chat_model_start(
+        self,
+        serialized: Dict[str, Any],
+        messages: List[List[BaseMessage]],
+        *,
+        run_id: UUID,
+        **kwargs: Any,
+    ) -> None:
+        estimated = sum(
+            self.token_counter.count_tokens(_message_text(message), self.model)
+            for batch in messages
+            for message in batch
+        )
+        self._local.starting = (run_id, estimated)
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        run_id, estimated = getattr(self._local, "starting", (None, 0))
+        self._local.starting = (None, 0)
+
+        waited = self.limiter.acquire(estimated)
+        if waited > 0:
+            logger.debug(f"Waited {waited:.1f}s for the {self.model} rate limit")
+        if run_id is not None:
+            with self._lock:
+                self._pending[run_id] = estimated
+        return True
+
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        # Async calls are limited by request count; their tokens are not
+        # estimated because the callback may run in another thread
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, lambda: self.acquire(blocking=blocking))
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        self._forget_start(run_id)
+        with self._lock:
+            estimated = self._pending.pop(run_id, None)
+        if estimated is None:
+            # Served from the cache, nothing was reserved
+            return
+
+        actual = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    actual += usage.get("total_tokens") or (
+                        usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
+                    )
+        if actual:
+            self.limiter.settle(estimated, actual)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._forget_start(run_id)
+        # The reservation is kept: a failed request may still count against the limit
+        with self._lock:
+            self._pending.pop(run_id, None)
+
+    def _forget_start(self, run_id: UUID) -> None:
+        """Drop the estimate of a call that ended without acquiring, such as a cache hit."""
+        if getattr(self._local, "starting", (None, 0))[0] == run_id:
+            self._local.starting = (None, 0)
+
+
+def _message_text(message: BaseMessage) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    # Content blocks, e.g. a system message marked for prompt caching
+    return "".join(
+        block.get("text", "") if isinstance(block, dict) else str(block) for block in content
+    )
@@ -1,7 +1,8 @@
 import logging
 from pathlib import Path
+from typing import Optional
 
-from .models import PipelineState
+from .models import PipelineState, TokenUsage
 
 
 class ReportGenerator:
@@ -11,7 +12,16 @@ class ReportGenerator:
         self.config = config
         self.logger = logging.getLogger(__name__)
 
-    def save_results(self, state: PipelineState, file_processor) -> dict:
+    def save_results(
+        self,
+        state: PipelineState,
+        file_processor,
+        response_cache_stats: Optional[dict] = None,
+        llm_call_summary: Optional[dict] = None,
+        hedging_stats: Optional[dict] = None,
+        llm_route_summary: Optional[dict] = None,
+        llm_node_summary: Optional[dict] = None,
+    ) -> dict:
         """Save the summary report and handle any remaining non-incremental saves."""
         print(f"Finalizing documentation in: {state.request.output_path}")
 
@@ -32,10 +42,19 @@ class ReportGenerator:
             # Save individual file documentation
             for result in state.results:
                 if result.success:
-                    file_processor.save_single_result(state, result)
+                    doc_path = file_processor.save_single_result(state, result)
+                    if doc_path is not None:
+                        print(f"  ✓ Saved documentation: {doc_path}")
 
         # Generate summary report
-        self.generate_summary_report(state)
+        self.generate_summary_report(
+            state,
+            response_cache_stats,
+            llm_call_summary,
+            hedging_stats,
+            llm_route_summary,
+            llm_node_summary,
+        )
 
         successful_count = len([r for r in state.results if r.success])
         failed_count = len([r for r in state.results if not r.success])
@@ -44,6 +63,17 @@ class ReportGenerator:
         print(f"✓ {successful_count} files documented successfully")
         if failed_count > 0:
             print(f"✗ {failed_count} files failed")
+        if response_cache_stats and response_cache_stats["hits"]:
+            print(f"✓ {response_cache_stats['hits']} LLM responses served from cache")
+        if llm_call_summary:
+            total_cost = sum(values["cost"] for values in llm_call_summary.values())
+            total_calls = sum(values["calls"] for values in llm_call_summary.values())
+            print(f"✓ {total_calls} LLM calls, ${total_cost:.2f}")
+        if hedging_stats and hedging_stats["hedged"]:
+            print(
+                f"✓ {hedging_stats['hedged']} slow LLM calls hedged, "
+                f"{hedging_stats['secondary_wins']} answered by the secondary provider"
+            )
 
         # Report on design documentation if generated
         if state.design_documentation_state:
@@ -95,7 +125,15 @@ class ReportGenerator:
         if failed_sections > 0:
             print(f"   ⚠️  {failed_sections} sections failed")
 
-    def generate_summary_report(self, state: PipelineState):
+    def generate_summary_report(
+        self,
+        state: PipelineState,
+        response_cache_stats: Optional[dict] = None,
+        llm_call_summary: Optional[dict] = None,
+        hedging_stats: Optional[dict] = None,
+        llm_route_summary: Optional[dict] = None,
+        llm_node_summary: Optional[dict] = None,
+    ):
         """Generate a summary report of the documentation process."""
         successful = [
             r
@@ -108,27 +146,38 @@ class ReportGenerator:
             if r.success and r.documentation == "[SKIPPED - No changes detected]"
         ]
         failed = [r for r in state.results if not r.success]
+        copied = [r for r in successful if r.duplicate_of is not None]
 
         report_content = f"""# Documentation Generation Report
 
 ## Summary
 - **Total files processed**: {len(state.results)}
 - **Successfully documented**: {len(successful)}
-- **Skipped (unchanged)**: {len(skipped)}
+- **Skipped (unchanged or binary)**: {len(skipped)}
 - **Failed**: {len(failed)}
-
-## Successfully Documented Files
 """
+        if copied:
+            report_content += (
+                f"- **Copied from identical files**: {len(copied)} ({len(copied)} LLM calls saved)\n"
+            )
 
+        report_content += "\n## Successfully Documented Files\n"
         for result in successful:
             relative_path = result.file_path.relative_to(state.request.repo_path)
-            report_content += f"- {relative_path}\n"
+            if result.duplicate_of is not None:
+                source_path = result.duplicate_of.relative_to(state.request.repo_path)
+                report_content += f"- {relative_path} (identical to {source_path})\n"
+            else:
+                report_content += f"- {relative_path}\n"
 
         if skipped:
-            report_content += "\n## Skipped Files (No Changes)\n"
+            report_content += "\n## Skipped Files\n"
             for result in skipped:
                 relative_path = result.file_path.relative_to(state.request.repo_path)
-                report_content += f"- {relative_path}\n"
+                if result.error_message:
+                    report_content += f"- {relative_path} ({result.error_message})\n"
+                else:
+                    report_content += f"- {relative_path}\n"
 
         if failed:
             report_content += "\n## Failed Files\n"
@@ -149,6 +198,25 @@ class ReportGenerator:
                 f"- **Original documents**: {len(state.existing_docs.original_docs)}\n"
             )
 
+        if response_cache_stats is not None:
+            report_content += self.generate_response_cache_report_section(response_cache_stats)
+
+        if llm_call_summary:
+            report_content += self.generate_llm_calls_report_section(llm_call_summary)
+
+        if llm_node_summary:
+            report_content += self.generate_llm_nodes_report_section(llm_node_summary)
+
+        if llm_route_summary:
+            report_content += self.generate_llm_routes_report_section(llm_route_summary)
+
+        if hedging_stats and hedging_stats["calls"]:
+            report_content += self.generate_hedging_report_section(hedging_stats)
+
+        usage = state.file_documentation_usage
+        if usage is not None and usage.calls:
+            report_content += self.generate_prompt_cache_report_section(usage)
+
         # Add processing configuration info
         max_files = state.request.config.processing.get("max_files")
         save_incrementally = state.request.config.processing.get(
@@ -171,6 +239,98 @@ class ReportGenerator:
 
         print(f"✓ Summary report saved: {report_path}")
 
+    def generate_response_cache_report_section(self, stats: dict) -> str:
+        """Generate the LLM response cache section of the summary report."""
+        lookups = stats["hits"] + stats["misses"]
+        hit_rate = stats["hits"] / lookups if lookups else 0
+
+        report_section = "\n## LLM Response Cache\n"
+        report_section += f"- **Hits**: {stats['hits']}\n"
+        report_section += f"- **Misses**: {stats['misses']}\n"
+        report_section += f"- **Hit rate**: {hit_rate:.0%}\n"
+        report_section += f"- **Bytes saved**: {stats['bytes_saved']:,}\n"
+        return report_section
+
+    def generate_llm_calls_report_section(self, summary: dict) -> str:
+        """Generate the per call site LLM latency, token and cost section of the summary report."""
+        report_section = "\n## LLM Calls\n"
+        report_section += (
+            "| Call site | Calls | Cached | Retries | Errors | p50 latency | p95 latency "
+            "| Prompt tokens | Completion tokens | Cost |\n"
+        )
+        report_section += "|---|---|---|---|---|---|---|---|---|---|\n"
+        for call_site, values in summary.items():
+            report_section += (
+                f"| {call_site} | {values['calls']} | {values['cached']} | {values['retries']} "
+                f"| {values['errors']} | {values['latency_p50']:.2f}s | {values['latency_p95']:.2f}s "
+                f"| {values['prompt_tokens']:,} | {values['completion_tokens']:,} "
+                f"| ${values['cost']:.4f} |\n"
+            )
+
+        total_prompt = sum(values["prompt_tokens"] for values in summary.values())
+        total_completion = sum(values["completion_tokens"] for values in summary.values())
+        total_cost = sum(values["cost"] for values in summary.values())
+        report_section += (
+            f"\n- **Total tokens**: {total_prompt:,} prompt, {total_completion:,} completion\n"
+        )
+        report_section += f"- **Total cost**: ${total_cost:.4f}\n"
+        return report_section
+
+    def generate_llm_nodes_report_section(self, summary: dict) -> str:
+        """Generate the per pipeline node LLM latency, token and cost section of the summary report."""
+        report_section = "\n## LLM Calls by Pipeline Node\n"
+        report_section += (
+            "| Node | Calls | Cached | p50 latency | p95 latency "
+            "| Prompt tokens | Completion tokens | Cost |\n"
+        )
+        report_section += "|---|---|---|---|---|---|---|---|\n"
+        for node, values in summary.items():
+            report_section += (
+                f"| {node} | {values['calls']} | {values['cached']} "
+                f"| {values['latency_p50']:.2f}s | {values['latency_p95']:.2f}s "
+                f"| {values['prompt_tokens']:,} | {values['completion_tokens']:,} "
+                f"| ${values['cost']:.4f} |\n"
+            )
+        return report_section
+
+    def generate_llm_routes_report_section(self, summary: dict) -> str:
+        """Generate the per model route latency, token and cost section of the summary report."""
+        report_section = "\n## LLM Calls by Model Route\n"
+        report_section += (
+            "| Route | Calls | Cached | p50 latency | p95 latency "
+            "| Prompt tokens | Completion tokens | Cost |\n"
+        )
+        report_section += "|---|---|---|---|---|---|---|---|\n"
+        for route, values in summary.items():
+            report_section += (
+                f"| {route} | {values['calls']} | {values['cached']} "
+                f"| {values['latency_p50']:.2f}s | {values['latency_p95']:.2f}s "
+                f"| {values['prompt_tokens']:,} | {values['completion_tokens']:,} "
+                f"| ${values['cost']:.4f} |\n"
+            )
+        return report_section
+
+    def generate_prompt_cache_report_section(self, usage: TokenUsage) -> str:
+        """Generate the provider prompt cache section of the summary report."""
+        cached_share = usage.cache_read_tokens / usage.input_tokens if usage.input_tokens else 0
+
+        report_section = "\n## Prompt Cache\n"
+        report_section += f"- **Requests**: {usage.calls}\n"
+        report_section += f"- **Input tokens**: {usage.input_tokens:,}\n"
+        report_section += f"- **Read from cache**: {usage.cache_read_tokens:,} ({cached_share:.0%})\n"
+        report_section += f"- **Written to cache**: {usage.cache_creation_tokens:,}\n"
+        return report_section
+
+    def generate_hedging_report_section(self, stats: dict) -> str:
+        """Generate the hedged requests section of the summary report."""
+        report_section = "\n## Hedged LLM Requests\n"
+        report_section += f"- **Calls**: {stats['calls']}\n"
+        report_section += f"- **Hedged**: {stats['hedged']} ({stats['hedge_rate']:.1%})\n"
+        report_section += f"- **Won by primary**: {stats['primary_wins']}\n"
+        report_section += f"- **Won by secondary**: {stats['secondary_wins']}\n"
+        report_section += f"- **Failed over after a primary error**: {stats['failovers']}\n"
+        return report_section
+
     def generate_design_docs_report_section(self, state: PipelineState) -> str:
         """Generate the design documentation section of the summary report."""
         design_state = state.design_documentation_state
@@ -0,0 +1,175 @@
+"""
+LLM Response Cache
+
+Content-addressed cache of chat model responses, stored in SQLite under
+``.documentation_state``. It is attached to the chat models LLMManager
+creates through LangChain's cache hook, so every LLM call (file docs, guide
+summaries, summarization, design sections and assembly, MCP) is looked up
+before it is sent, and an identical request never goes to the provider twice.
+The cache is bounded in size and evicts the least recently used responses.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+# Set in the response metadata of messages served from the cache
+CACHE_HIT_METADATA_KEY = "response_cache_hit"
+
+# Share of the size limit kept after an eviction, so eviction does not run
+# on every insert once the cache is full
+_EVICT_TO = 0.9
+
+
+class ResponseCache(BaseCache):
+    """Chat model responses keyed by a digest of the model settings and the prompt.
+
+    LangChain passes the model settings (provider class, model name,
+    temperature and other call parameters) as ``llm_string`` and the prompt
+    as messages serialized without their ids, so the key only changes when
+    the request does.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.logger = logging.getLogger(__name__)
+        self.db_file: Optional[Path] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    def open(self, state_dir: Path) -> None:
+        """Store the cache in ``state_dir``; lookups miss until a directory is set."""
+        db_file = state_dir / "llm_cache.sqlite"
+        with self._lock:
+            if self.db_file == db_file:
+                return
+            if self._conn is not None:
+                self._conn.close()
+
+            state_dir.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(db_file), check_same_thread=False)
+            with self._conn:
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                    "last_used REAL NOT NULL)"
+                )
+                self._conn.execute(
+                    "CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)"
+                )
+            self._total_bytes = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()[0]
+            self.db_file = db_file
+            self.logger.info(f"Using LLM response cache {db_file} ({self._total_bytes:,} bytes)")
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "bytes_saved": self.bytes_saved}
+
+    @staticmethod
+    def make_key(prompt: str, llm_string: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(llm_string.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(prompt.encode("utf-8"))
+        return digest.hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = self.make_key(prompt, llm_string)
+        with self._lock:
+            if self._conn is None:
+                return None
+            row = self._conn.execute(
+                "SELECT value, size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key)
+                )
+            self.hits += 1
+            self.bytes_saved += row[1]
+
+        try:
+            generations = loads(row[0], allowed_objects="core")
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable LLM cache entry {key}: {e}")
+            return None
+
+        for generation in generations:
+            message = getattr(generation, "message", None)
+            if message is not None:
+                message.response_metadata = {
+                    **(message.response_metadata or {}),
+                    CACHE_HIT_METADATA_KEY: True,
+                }
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key = self.make_key(prompt, llm_string)
+        try:
+            value = dumps(return_val)
+        except Exception as e:
+            self.logger.warning(f"Could not cache LLM response: {e}")
+            return
+
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            if self._conn is None:
+                return
+            with self._conn:
+                previous = self._conn.execute(
+                    "SELECT size FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                    (key, value, size, time.time()),
+                )
+            self._total_bytes += size - (previous[0] if previous else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Delete the least recently used responses until the cache is below its limit."""
+        target = self.max_bytes * _EVICT_TO
+        removed = 0
+        with self._conn:
+            rows = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_used"
+            )
+            keys = []
+            for key, size in rows:
+                if self._total_bytes <= target:
+                    break
+                keys.append((key,))
+                self._total_bytes -= size
+                removed += 1
+            self._conn.executemany("DELETE FROM responses WHERE key = ?", keys)
+        self.logger.info(f"Evicted {removed} responses from the LLM response cache")
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            if self._conn is None:
+                return
+            with self._conn:
+                self._conn.execute("DELETE FROM responses")
+            self._total_bytes = 0
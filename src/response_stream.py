@@ -0,0 +1,109 @@
+"""
+Streamed LLM Responses
+
+With ``model.stream_responses`` enabled the chat models LLMManager creates
+stream every completion. Callers that write a completion to a file pass a
+StreamedFileWriter in the invoke callbacks: tokens are appended to a
+temporary file next to the target as they arrive, and the file is renamed
+over the target once the response is complete, so a partial document is
+never left in place of a finished one. The call still goes through
+``invoke``, so the response cache, rate limits, telemetry and hedging apply
+as for any other call.
+
+Whether a completion was cut off is taken from the finish reason the
+provider reports with the final chunk.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Finish reasons of a completion that stopped at the max tokens limit
+# (OpenAI reports ``finish_reason``, Anthropic ``stop_reason``)
+TRUNCATED_FINISH_REASONS = {"length", "max_tokens"}
+
+
+def finish_reason(response) -> Optional[str]:
+    """Return the finish reason the provider reported for a response, if any."""
+    metadata = getattr(response, "response_metadata", None) or {}
+    return metadata.get("finish_reason") or metadata.get("stop_reason")
+
+
+def is_truncated(response) -> Optional[bool]:
+    """Whether a response stopped at the max tokens limit, or None if the provider did not say."""
+    reason = finish_reason(response)
+    if reason is None:
+        return None
+    return reason in TRUNCATED_FINISH_REASONS
+
+
+class StreamedFileWriter(BaseCallbackHandler):
+    """Writes the tokens of a streamed completion to a file as they arrive.
+
+    The writer follows the first call that produces a token; tokens of
+    other calls with the same callbacks, such as the slower request of a
+    hedged call, are ignored. ``finish`` checks the written text against the
+    response that was returned and rewrites it if they differ, for example
+    when the other request won or the response came from the cache.
+    """
+
+    def __init__(self, path: Path, header: str = ""):
+        """Open the temporary file and write ``header`` to it.
+
+        Args:
+            path: File the completed output is renamed to
+            header: Text written before the completion
+        """
+        self.path = path
+        self.temp_file = path.with_name(path.name + ".partial")
+        self.logger = logging.getLogger(__name__)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.temp_file, "w", encoding="utf-8")
+        self._file.write(header)
+        self._file.flush()
+        self._body_start = self._file.tell()
+        self._digest = hashlib.sha256()
+        self._run_id: Optional[UUID] = None
+        self._lock = threading.Lock()
+
+    def on_llm_new_token(self, token: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        if not isinstance(token, str) or not token:
+            return
+        with self._lock:
+            if self._file.closed:
+                return
+            if self._run_id is None:
+                self._run_id = run_id
+            elif run_id != self._run_id:
+                return
+            self._file.write(token)
+            self._file.flush()
+            self._digest.update(token.encode("utf-8"))
+
+    def finish(self, text: str, footer: str = "") -> Path:
+        """Complete the file with the final ``text`` and ``footer`` and move it into place."""
+        with self._lock:
+            if self._digest.digest() != hashlib.sha256(text.encode("utf-8")).digest():
+                self._file.seek(self._body_start)
+                self._file.truncate()
+                self._file.write(text)
+            self._file.write(footer)
+            self._file.close()
+        os.replace(self.temp_file, self.path)
+        return self.path
+
+    def abort(self) -> None:
+        """Discard the temporary file, leaving any earlier version of the target in place."""
+        with self._lock:
+            self._file.close()
+        try:
+            self.temp_file.unlink()
+        except FileNotFoundError:
+            pass
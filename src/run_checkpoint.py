@@ -0,0 +1,160 @@
+"""
+Run Checkpointing
+
+Persists pipeline progress under ``.documentation_state`` so a run that dies
+part way (crash, Ctrl+C, provider outage) can be resumed. The LangGraph state
+is saved after every node in a SQLite checkpointer; work finished inside a
+node (documented files, guide summaries) is recorded in a journal table of
+the same database, so a resumed run repeats no LLM call that already
+succeeded.
+"""
+
+import inspect
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite import SqliteSaver
+from pydantic import BaseModel
+
+from . import models
+from .models import DocumentationResult
+
+
+def _model_types():
+    """(module, name) pairs of the state models the checkpointer may load."""
+    return [
+        (obj.__module__, obj.__name__)
+        for obj in vars(models).values()
+        if inspect.isclass(obj) and issubclass(obj, BaseModel) and obj.__module__ == models.__name__
+    ]
+
+
+class RunCheckpoint:
+    """Checkpoint storage for the pipeline runs of one output path."""
+
+    def __init__(self, output_path: Path):
+        """Initialize the checkpoint storage.
+
+        Args:
+            output_path: Path where documentation is output
+        """
+        self.state_dir = output_path / ".documentation_state"
+        self.db_file = self.state_dir / "checkpoints.sqlite"
+        self.run_file = self.state_dir / "current_run.json"
+        self.logger = logging.getLogger(__name__)
+
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        # The journal is written from the file documentation stages, and the
+        # checkpointer has a connection of its own
+        self._conn = sqlite3.connect(str(self.db_file), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS run_journal ("
+                "thread_id TEXT NOT NULL, kind TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                "PRIMARY KEY (thread_id, kind, key))"
+            )
+
+        self.saver = SqliteSaver(
+            sqlite3.connect(str(self.db_file), check_same_thread=False),
+            serde=JsonPlusSerializer(allowed_msgpack_modules=_model_types()),
+        )
+
+    def start_run(self, head_commit: Optional[str] = None) -> str:
+        """Start a new run, discarding any interrupted one, and return its thread id."""
+        previous = self.interrupted_run()
+        if previous:
+            self.logger.info(f"Discarding interrupted run {previous['thread_id']}")
+            self._delete_thread(previous["thread_id"])
+
+        thread_id = uuid.uuid4().hex
+        self._save_run_record(
+            {
+                "thread_id": thread_id,
+                "head_commit": head_commit,
+                "started": time.time(),
+                "completed": False,
+            }
+        )
+        return thread_id
+
+    def interrupted_run(self) -> Optional[Dict[str, Any]]:
+        """Return the record of the last run if it did not complete."""
+        if not self.run_file.exists():
+            return None
+        try:
+            with open(self.run_file, "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable run record: {e}")
+            return None
+        return None if record.get("completed") else record
+
+    def finish_run(self, thread_id: str) -> None:
+        """Mark a run as completed and drop its checkpoints."""
+        self._save_run_record({"thread_id": thread_id, "completed": True, "finished": time.time()})
+        self._delete_thread(thread_id)
+
+    def journal(self, thread_id: str) -> "RunJournal":
+        """Get the journal of work completed inside the nodes of a run."""
+        return RunJournal(self, thread_id)
+
+    def get_entry(self, thread_id: str, kind: str, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM run_journal WHERE thread_id = ? AND kind = ? AND key = ?",
+                (thread_id, kind, key),
+            ).fetchone()
+        return row[0] if row else None
+
+    def record_entry(self, thread_id: str, kind: str, key: str, value: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO run_journal (thread_id, kind, key, value) VALUES (?, ?, ?, ?)",
+                (thread_id, kind, key, value),
+            )
+
+    def _delete_thread(self, thread_id: str) -> None:
+        self.saver.delete_thread(thread_id)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM run_journal WHERE thread_id = ?", (thread_id,))
+
+    def _save_run_record(self, record: Dict[str, Any]) -> None:
+        # Atomic write to prevent corruption
+        temp_file = self.run_file.with_suffix(".tmp")
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2)
+        temp_file.replace(self.run_file)
+
+
+class RunJournal:
+    """Work completed inside pipeline nodes of a single run."""
+
+    FILE_RESULT = "file_result"
+    GUIDE_SUMMARY = "guide_summary"
+
+    def __init__(self, checkpoint: RunCheckpoint, thread_id: str):
+        self.checkpoint = checkpoint
+        self.thread_id = thread_id
+
+    def get_file_result(self, file_path: Path) -> Optional[DocumentationResult]:
+        value = self.checkpoint.get_entry(self.thread_id, self.FILE_RESULT, str(file_path))
+        return DocumentationResult.model_validate_json(value) if value is not None else None
+
+    def record_file_result(self, result: DocumentationResult) -> None:
+        self.checkpoint.record_entry(
+            self.thread_id, self.FILE_RESULT, str(result.file_path), result.model_dump_json()
+        )
+
+    def get_guide_summary(self, key: str) -> Optional[str]:
+        return self.checkpoint.get_entry(self.thread_id, self.GUIDE_SUMMARY, key)
+
+    def record_guide_summary(self, key: str, summary: str) -> None:
+        self.checkpoint.record_entry(self.thread_id, self.GUIDE_SUMMARY, key, summary)
@@ -0,0 +1,160 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Set
+
+from .models import CodeFile, ScanIndexEntry
+
+# Read size used when hashing file contents
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def compute_file_digest(file_path: Path) -> str:
+    """Calculate the SHA-256 hex digest of a file's contents."""
+    sha256_hash = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            sha256_hash.update(chunk)
+    return sha256_hash.hexdigest()
+
+
+class ScanIndex:
+    """Persists stat signatures and content digests of scanned source files.
+
+    A file whose size, modification time and inode match the stored entry
+    reuses the stored SHA-256 digest instead of being read again.
+    """
+
+    def __init__(self, output_path: Path):
+        """Initialize the scan index.
+
+        Args:
+            output_path: Path where documentation is output
+        """
+        self.output_path = output_path
+        self.index_dir = output_path / ".documentation_state"
+        self.index_file = self.index_dir / "scan_index.json"
+        self.logger = logging.getLogger(__name__)
+
+        self.entries: Dict[str, ScanIndexEntry] = {}
+        self.seen: Set[str] = set()
+        # Entries modified at or after the previous scan started may have
+        # changed again within the same timestamp, so they are not trusted
+        self.previous_scan_started_ns = 0
+        self.scan_started_ns = time.time_ns()
+        self.reused = 0
+        self.hashed = 0
+        # Digests may be requested from several scan threads at once
+        self._lock = threading.Lock()
+
+        self.load()
+
+    def load(self) -> None:
+        """Load the index from disk, starting empty if it is missing or invalid."""
+        if not self.index_file.exists():
+            self.logger.info("No existing scan index found, creating new")
+            return
+
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+
+            self.previous_scan_started_ns = data.get("scan_started_ns", 0)
+            self.entries = {
+                relative_path: ScanIndexEntry(**entry_data)
+                for relative_path, entry_data in data.get("files", {}).items()
+            }
+            self.logger.info(f"Loaded scan index with {len(self.entries)} files")
+
+        except Exception as e:
+            self.logger.error(f"Failed to load scan index: {e}")
+            self.entries = {}
+            self.previous_scan_started_ns = 0
+
+    def begin_scan(self) -> None:
+        """Start a new scan on an index kept in memory across scans."""
+        with self._lock:
+            self.previous_scan_started_ns = self.scan_started_ns
+            self.scan_started_ns = time.time_ns()
+            self.seen = set()
+            self.reused = 0
+            self.hashed = 0
+
+    def get_digest(self, code_file: CodeFile) -> str:
+        """Return the content digest for a scanned file, hashing it only if its signature changed.
+
+        Args:
+            code_file: Scanned file with its stat signature
+
+        Returns:
+            SHA-256 hex digest of the file contents
+        """
+        relative_path = code_file.relative_path
+        with self._lock:
+            self.seen.add(relative_path)
+            entry = self.entries.get(relative_path)
+            if entry and self._signature_matches(entry, code_file):
+                self.reused += 1
+                return entry.sha256
+
+        digest = compute_file_digest(code_file.path)
+        with self._lock:
+            self.hashed += 1
+            self.entries[relative_path] = ScanIndexEntry(
+                relative_path=relative_path,
+                size=code_file.size,
+                mtime_ns=code_file.mtime_ns,
+                inode=code_file.inode,
+                sha256=digest,
+            )
+        return digest
+
+    def _signature_matches(self, entry: ScanIndexEntry, code_file: CodeFile) -> bool:
+        """Check whether a stored entry still describes the file on disk."""
+        return (
+            entry.size == code_file.size
+            and entry.mtime_ns == code_file.mtime_ns
+            and entry.inode == code_file.inode
+            and entry.mtime_ns < self.previous_scan_started_ns
+        )
+
+    def save(self, prune: bool = True) -> None:
+        """Save the index to disk.
+
+        Args:
+            prune: Drop entries for files not seen in this scan. Pass False
+                when the scan stopped early and did not visit every file.
+        """
+        if prune:
+            self.entries = {
+                relative_path: entry
+                for relative_path, entry in self.entries.items()
+                if relative_path in self.seen
+            }
+
+        data = {
+            "scan_started_ns": self.scan_started_ns,
+            "files": {
+                relative_path: entry.model_dump()
+                for relative_path, entry in sorted(self.entries.items())
+            },
+        }
+
+        try:
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+
+            # Atomic write to prevent corruption
+            temp_file = self.index_file.with_suffix(".tmp")
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+
+            temp_file.replace(self.index_file)
+            self.logger.info(
+                f"Saved scan index: {self.reused} digests reused, {self.hashed} files hashed"
+            )
+
+        except Exception as e:
+            self.logger.error(f"Failed to save scan index: {e}")
@@ -0,0 +1,312 @@
+"""
+Sharded Documentation Runs
+
+Splits file documentation over several machines. ``generate --shard i/N``
+documents only the files whose path hashes to shard ``i`` of ``N`` and writes
+a report fragment under ``.documentation_state/shards``. The ``merge``
+command combines the output trees of all shards into one: documentation
+files, the scan index, chunk cache, guide metadata, last documented commit
+and the report fragments. The documentation guide is then built once from
+the merged tree.
+
+The assignment only depends on the relative path, so every runner agrees on
+it without coordination, and the merge gives the same tree whatever order
+the shard outputs are passed in.
+"""
+
+import hashlib
+import logging
+import shutil
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .git_change_detector import GitChangeDetector
+from .guide_metadata_manager import GuideMetadataManager
+from .models import (
+    DocumentationResult,
+    GuideMetadata,
+    PipelineState,
+    SKIPPED_DOCUMENTATION,
+    ShardFileResult,
+    ShardReport,
+)
+from .scan_index import ScanIndex
+
+SHARDS_DIR = "shards"
+
+# Files of an output tree that are built from the merged tree instead of copied
+_MERGE_SKIPPED = {".documentation_state", "documentation_report.md", "documentation_guide.md"}
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse a shard option such as ``"2/4"`` into (index, count)."""
+    try:
+        index_text, count_text = value.split("/")
+        index, count = int(index_text), int(count_text)
+    except ValueError:
+        raise ValueError(f"Invalid shard '{value}', expected INDEX/COUNT such as 1/4")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard '{value}', INDEX must be between 1 and COUNT")
+    return index, count
+
+
+def shard_of(relative_path: str, count: int) -> int:
+    """Return the 1-based shard a source file belongs to."""
+    digest = hashlib.sha256(Path(relative_path).as_posix().encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+
+def in_shard(relative_path: str, shard: Tuple[int, int]) -> bool:
+    index, count = shard
+    return shard_of(relative_path, count) == index
+
+
+def shard_report_path(output_path: Path, shard: Tuple[int, int]) -> Path:
+    index, count = shard
+    return output_path / ".documentation_state" / SHARDS_DIR / f"shard-{index}-of-{count}.json"
+
+
+def write_shard_report(
+    state: PipelineState,
+    file_processor,
+    llm_calls: List[dict],
+    response_cache_stats: Optional[Dict[str, int]] = None,
+    hedging_stats: Optional[Dict[str, Any]] = None,
+) -> Path:
+    """Write the report fragment of a sharded run, replacing fragments of earlier shardings."""
+    request = state.request
+    files = []
+    for result in state.results:
+        relative_path = result.file_path.relative_to(request.repo_path).as_posix()
+        documentation_path = file_processor.get_documentation_path(state, relative_path)
+        files.append(
+            ShardFileResult(
+                relative_path=relative_path,
+                documentation_path=documentation_path.relative_to(request.output_path).as_posix(),
+                success=result.success,
+                skipped=result.documentation == SKIPPED_DOCUMENTATION,
+                error_message=result.error_message,
+                duplicate_of=(
+                    result.duplicate_of.relative_to(request.repo_path).as_posix()
+                    if result.duplicate_of is not None
+                    else None
+                ),
+            )
+        )
+
+    report = ShardReport(
+        shard_index=request.shard[0],
+        shard_count=request.shard[1],
+        files=sorted(files, key=lambda file: file.relative_path),
+        llm_calls=llm_calls,
+        response_cache_stats=response_cache_stats,
+        hedging_stats=hedging_stats,
+    )
+
+    report_path = shard_report_path(request.output_path, request.shard)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    for stale in report_path.parent.glob("shard-*.json"):
+        if stale != report_path:
+            stale.unlink()
+
+    # Atomic write to prevent corruption
+    temp_file = report_path.with_suffix(".tmp")
+    with open(temp_file, "w", encoding="utf-8") as f:
+        f.write(report.model_dump_json(indent=2))
+    temp_file.replace(report_path)
+    return report_path
+
+
+class ShardMerger:
+    """Combines the output trees of a sharded run into one output tree."""
+
+    def __init__(self, repo_path: Path, output_path: Path):
+        """Initialize the merger.
+
+        Args:
+            repo_path: Repository that was documented
+            output_path: Output tree to merge the shards into
+        """
+        self.repo_path = repo_path
+        self.output_path = output_path
+        self.logger = logging.getLogger(__name__)
+
+    def load_reports(self, shard_paths: List[Path]) -> List[Tuple[ShardReport, Path]]:
+        """Load the report fragment of every shard, in shard order.
+
+        Raises:
+            ValueError: If fragments are missing, duplicated or from different shardings
+        """
+        reports = []
+        for shard_path in shard_paths:
+            fragments = sorted((shard_path / ".documentation_state" / SHARDS_DIR).glob("shard-*.json"))
+            if not fragments:
+                raise ValueError(f"No shard report found in {shard_path}")
+            for fragment in fragments:
+                with open(fragment, "r", encoding="utf-8") as f:
+                    reports.append((ShardReport.model_validate_json(f.read()), shard_path))
+
+        counts = {report.shard_count for report, _ in reports}
+        if len(counts) != 1:
+            raise ValueError(f"Shard outputs come from different shard counts: {sorted(counts)}")
+        count = counts.pop()
+
+        indexes = [report.shard_index for report, _ in reports]
+        duplicates = sorted({index for index in indexes if indexes.count(index) > 1})
+        if duplicates:
+            raise ValueError(f"Shards given more than once: {', '.join(map(str, duplicates))}")
+        missing = sorted(set(range(1, count + 1)) - set(indexes))
+        if missing:
+            raise ValueError(f"Missing shards of {count}: {', '.join(map(str, missing))}")
+
+        return sorted(reports, key=lambda item: item[0].shard_index)
+
+    def merge(self, shard_paths: List[Path]) -> List[ShardReport]:
+        """Merge the shard output trees into the output path.
+
+        Returns:
+            The shard reports in shard order
+        """
+        if any(shard_path.resolve() == self.output_path.resolve() for shard_path in shard_paths):
+            raise ValueError("The merge output path must not be one of the shard outputs")
+
+        loaded = self.load_reports(shard_paths)
+        reports = [report for report, _ in loaded]
+        self.output_path.mkdir(parents=True, exist_ok=True)
+
+        self._merge_documentation(loaded)
+        self._merge_scan_index(loaded)
+        self._merge_chunk_cache(loaded)
+        self._merge_guide_metadata(loaded)
+        self._merge_documented_commit(loaded)
+
+        print(f"✓ Merged {len(reports)} shards into {self.output_path}")
+        return reports
+
+    def _merge_documentation(self, loaded: List[Tuple[ShardReport, Path]]) -> None:
+        """Copy documentation files, letting the shard that generated a file win.
+
+        Files a shard holds without having generated them in its run (for
+        example from a restored output directory) are copied from the lowest
+        shard that has them.
+        """
+        copied = 0
+        for _, shard_path in reversed(loaded):
+            for source in self._documentation_files(shard_path):
+                target = self.output_path / source.relative_to(shard_path)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(source, target)
+                copied += 1
+
+        generated = 0
+        for report, shard_path in loaded:
+            for file in report.files:
+                if not file.success or file.skipped:
+                    continue
+                source = shard_path / file.documentation_path
+                if source.exists():
+                    target = self.output_path / file.documentation_path
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copy2(source, target)
+                    generated += 1
+        self.logger.info(f"Copied {copied} documentation files, {generated} generated in this run")
+
+    def _documentation_files(self, shard_path: Path):
+        for child in sorted(shard_path.iterdir()):
+            if child.name in _MERGE_SKIPPED:
+                continue
+            if child.is_dir():
+                yield from sorted(path for path in child.rglob("*") if path.is_file())
+            else:
+                yield child
+
+    def _merge_scan_index(self, loaded: List[Tuple[ShardReport, Path]]) -> None:
+        """Combine scan index entries, each file's entry coming from its own shard when it has one."""
+        merged = ScanIndex(self.output_path)
+        count = loaded[0][0].shard_count
+        shard_indexes = [(report.shard_index, ScanIndex(shard_path)) for report, shard_path in loaded]
+
+        for _, shard_index in reversed(shard_indexes):
+            merged.entries.update(shard_index.entries)
+        for index, shard_index in shard_indexes:
+            merged.entries.update(
+                {
+                    relative_path: entry
+                    for relative_path, entry in shard_index.entries.items()
+                    if shard_of(relative_path, count) == index
+                }
+            )
+
+        # Entries are only trusted if modified before the scan that stored
+        # them started, so use the earliest shard scan
+        started = [shard_index.previous_scan_started_ns for _, shard_index in shard_indexes]
+        merged.scan_started_ns = min(started) if all(started) else 0
+        merged.save(prune=False)
+
+    def _merge_chunk_cache(self, loaded: List[Tuple[ShardReport, Path]]) -> None:
+        """Copy cached chunk documentation; entries are content addressed, so any copy will do."""
+        target_dir = self.output_path / ".documentation_state" / "chunk_cache"
+        for _, shard_path in loaded:
+            source_dir = shard_path / ".documentation_state" / "chunk_cache"
+            if not source_dir.is_dir():
+                continue
+            # Entries are stored in subdirectories named after their key prefix
+            for source in sorted(source_dir.rglob("*.json")):
+                target = target_dir / source.relative_to(source_dir)
+                if not target.exists():
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copy2(source, target)
+
+    def _merge_guide_metadata(self, loaded: List[Tuple[ShardReport, Path]]) -> None:
+        """Combine the tracked files of any guide metadata the shards carry."""
+        shard_metadata = []
+        for report, shard_path in loaded:
+            if (shard_path / ".documentation_state" / "guide_metadata.json").exists():
+                shard_metadata.append((report.shard_index, GuideMetadataManager(shard_path).load_metadata()))
+        if not shard_metadata:
+            return
+
+        manager = GuideMetadataManager(self.output_path)
+        merged: GuideMetadata = manager.load_metadata()
+        count = loaded[0][0].shard_count
+        for _, metadata in reversed(shard_metadata):
+            merged.tracked_files.update(metadata.tracked_files)
+        for index, metadata in shard_metadata:
+            merged.tracked_files.update(
+                {
+                    source_path: file_metadata
+                    for source_path, file_metadata in metadata.tracked_files.items()
+                    if shard_of(source_path, count) == index
+                }
+            )
+        merged.guide_version = max([merged.guide_version] + [m.guide_version for _, m in shard_metadata])
+        if not merged.guide_structure_hash:
+            merged.guide_structure_hash = shard_metadata[0][1].guide_structure_hash
+        manager.save_metadata(merged)
+
+    def _merge_documented_commit(self, loaded: List[Tuple[ShardReport, Path]]) -> None:
+        """Record the last documented commit only if every shard documented the same one."""
+        commits = {
+            GitChangeDetector(self.repo_path, shard_path).load_last_documented_commit()
+            for _, shard_path in loaded
+        }
+        if len(commits) == 1 and None not in commits:
+            GitChangeDetector(self.repo_path, self.output_path).save_last_documented_commit(commits.pop())
+        else:
+            self.logger.info("Not recording documented commit: shards documented different commits")
+
+    def combined_results(self, reports: List[ShardReport]) -> List[DocumentationResult]:
+        """Rebuild the file results of all shards for the summary report, in path order."""
+        files = sorted(
+            (file for report in reports for file in report.files), key=lambda file: file.relative_path
+        )
+        return [
+            DocumentationResult(
+                file_path=self.repo_path / file.relative_path,
+                documentation=SKIPPED_DOCUMENTATION if file.skipped else "",
+                success=file.success,
+                error_message=file.error_message,
+                duplicate_of=self.repo_path / file.duplicate_of if file.duplicate_of else None,
+            )
+            for file in files
+        ]
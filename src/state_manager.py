@@ -35,12 +35,6 @@ class StateManager:
             return "generate"
         return "skip"
 
-    def has_more_files(self, state: PipelineState) -> str:
-        """Check if there are more files to process."""
-        if state.current_file_index >= len(state.code_files):
-            return "finish"
-        return "continue"
-
     def has_more_sections(self, state: PipelineState) -> str:
         """Check if there are more sections to process in the current document."""
         design_state = state.design_documentation_state
@@ -0,0 +1,359 @@
+"""
+LLM Call Telemetry
+
+Records every LLM call made through the chat models LLMManager creates: the
+call site and the file or section it was for, prompt and completion tokens
+from the response's usage metadata, time to first token (when the response
+is streamed), total latency, retries and computed cost. Each call is
+appended to a JSONL stream as it completes; the calls of a run are
+aggregated per call site for the documentation report and written as a
+Prometheus text-format file that a textfile collector can scrape.
+
+Call sites describe themselves with ``metadata`` in the invoke config:
+``call_site``, ``subject`` (file or section), ``attempt`` for callers
+that retry and ``route`` for file documentation sent through a model route.
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from .response_cache import CACHE_HIT_METADATA_KEY
+
+METRIC_PREFIX = "documentation_pipeline_llm"
+
+
+def llm_call_metadata(
+    call_site: str, subject: Optional[str] = None, attempt: int = 0, route: Optional[str] = None
+) -> dict:
+    """Build the invoke config metadata that identifies an LLM call in telemetry."""
+    metadata = {"call_site": call_site, "attempt": attempt}
+    if subject is not None:
+        metadata["subject"] = subject
+    if route is not None:
+        metadata["route"] = route
+    return metadata
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of ``values``."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(fraction * len(ordered) + 0.5 - 1e-9)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class LLMTelemetry:
+    """Collects the LLM calls of a run and writes them out."""
+
+    def __init__(self, config):
+        """Initialize telemetry.
+
+        Args:
+            config: Pipeline configuration; prices come from ``estimation``
+        """
+        self.settings = config.telemetry
+        self.enabled = self.settings.get("enabled", True)
+        self.input_cost = config.estimation.get("input_cost_per_million", 0.0) / 1_000_000
+        self.output_cost = config.estimation.get("output_cost_per_million", 0.0) / 1_000_000
+        self.logger = logging.getLogger(__name__)
+
+        self.run_id: Optional[str] = None
+        self.records: List[Dict[str, Any]] = []
+        self.jsonl_file: Optional[Path] = None
+        self.prometheus_file: Optional[Path] = None
+        self._lock = threading.Lock()
+
+    def start_run(self, output_path: Path) -> None:
+        """Start collecting the calls of a new run for an output path."""
+        with self._lock:
+            self.run_id = uuid.uuid4().hex
+            self.records = []
+            self.jsonl_file = output_path / self.settings.get(
+                "jsonl_file", ".documentation_state/llm_calls.jsonl"
+            )
+            self.prometheus_file = output_path / self.settings.get(
+                "prometheus_file", ".documentation_state/llm_metrics.prom"
+            )
+
+    def cost(
+        self,
+        prompt_tokens: int,
+        completion_tokens: int,
+        input_cost_per_million: Optional[float] = None,
+        output_cost_per_million: Optional[float] = None,
+    ) -> float:
+        """Cost of a call, at the prices of its model if given and the ``estimation`` prices otherwise."""
+        input_cost = (
+            input_cost_per_million / 1_000_000 if input_cost_per_million is not None else self.input_cost
+        )
+        output_cost = (
+            output_cost_per_million / 1_000_000 if output_cost_per_million is not None else self.output_cost
+        )
+        return prompt_tokens * input_cost + completion_tokens * output_cost
+
+    def record(self, record: Dict[str, Any]) -> None:
+        """Add a completed call and append it to the JSONL stream."""
+        if not self.enabled:
+            return
+        with self._lock:
+            record["run_id"] = self.run_id
+            self.records.append(record)
+            if self.jsonl_file is None:
+                return
+            try:
+                self.jsonl_file.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.jsonl_file, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+            except Exception as e:
+                self.logger.warning(f"Failed to write LLM telemetry: {e}")
+
+    def run_records(self) -> List[Dict[str, Any]]:
+        """Return the calls recorded for the current run."""
+        with self._lock:
+            return list(self.records)
+
+    def add_records(self, records: List[Dict[str, Any]]) -> None:
+        """Add calls recorded elsewhere, such as by the shards of a sharded run, to the current run."""
+        with self._lock:
+            self.records.extend(records)
+
+    def summary(self, key: str = "call_site") -> Dict[str, Dict[str, Any]]:
+        """Aggregate the calls of the current run per call site, or per another record field.
+
+        Calls without a value for ``key``, such as calls not made through a
+        model route when grouping by ``route``, are left out.
+        """
+        records = self.run_records()
+
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for record in records:
+            if record.get(key) is not None:
+                grouped.setdefault(record[key], []).append(record)
+
+        summary = {}
+        for group, calls in sorted(grouped.items()):
+            # Responses served from the cache were not sent, so they add
+            # neither tokens nor latency
+            sent = [call for call in calls if not call["cached"]]
+            latencies = [call["latency_seconds"] for call in sent]
+            summary[group] = {
+                "calls": len(calls),
+                "cached": len(calls) - len(sent),
+                "errors": sum(1 for call in calls if call["error"]),
+                "retries": sum(call["retries"] for call in calls),
+                "prompt_tokens": sum(call["prompt_tokens"] for call in sent),
+                "completion_tokens": sum(call["completion_tokens"] for call in sent),
+                "cost": sum(call["cost"] for call in sent),
+                "latency_seconds_sum": sum(latencies),
+                "latency_p50": percentile(latencies, 0.5),
+                "latency_p95": percentile(latencies, 0.95),
+            }
+        return summary
+
+    def write_prometheus(self) -> Optional[Path]:
+        """Write the run's aggregates in Prometheus text format."""
+        if not self.enabled or self.prometheus_file is None:
+            return None
+
+        summary = self.summary()
+        lines = []
+
+        def metric(name: str, metric_type: str, help_text: str, samples: List[tuple]) -> None:
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} {metric_type}")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{value_}"' for key, value_ in labels.items())
+                lines.append(f"{METRIC_PREFIX}_{name}{{{label_text}}} {value}")
+
+        metric(
+            "calls_total", "counter", "LLM calls in the last run.",
+            [({"call_site": site}, values["calls"]) for site, values in summary.items()],
+        )
+        metric(
+            "cached_calls_total", "counter", "LLM calls served from the response cache.",
+            [({"call_site": site}, values["cached"]) for site, values in summary.items()],
+        )
+        metric(
+            "errors_total", "counter", "Failed LLM calls.",
+            [({"call_site": site}, values["errors"]) for site, values in summary.items()],
+        )
+        metric(
+            "retries_total", "counter", "Retried LLM calls.",
+            [({"call_site": site}, values["retries"]) for site, values in summary.items()],
+        )
+        metric(
+            "tokens_total", "counter", "Tokens sent and generated.",
+            [
+                ({"call_site": site, "kind": kind}, values[f"{kind}_tokens"])
+                for site, values in summary.items()
+                for kind in ("prompt", "completion")
+            ],
+        )
+        metric(
+            "cost_usd_total", "counter", "Computed cost of the LLM calls.",
+            [({"call_site": site}, round(values["cost"], 6)) for site, values in summary.items()],
+        )
+
+        lines.append(f"# HELP {METRIC_PREFIX}_latency_seconds Latency of LLM calls not served from cache.")
+        lines.append(f"# TYPE {METRIC_PREFIX}_latency_seconds summary")
+        for site, values in summary.items():
+            for quantile in ("0.5", "0.95"):
+                key = "latency_p50" if quantile == "0.5" else "latency_p95"
+                lines.append(
+                    f'{METRIC_PREFIX}_latency_seconds{{call_site="{site}",quantile="{quantile}"}} '
+                    f"{values[key]:.3f}"
+                )
+            lines.append(
+                f'{METRIC_PREFIX}_latency_seconds_sum{{call_site="{site}"}} '
+                f"{values['latency_seconds_sum']:.3f}"
+            )
+            lines.append(
+                f'{METRIC_PREFIX}_latency_seconds_count{{call_site="{site}"}} '
+                f"{values['calls'] - values['cached']}"
+            )
+
+        try:
+            self.prometheus_file.parent.mkdir(parents=True, exist_ok=True)
+            # Atomic write so a scraper never reads a partial file
+            temp_file = self.prometheus_file.with_suffix(".tmp")
+            with open(temp_file, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+            temp_file.replace(self.prometheus_file)
+        except Exception as e:
+            self.logger.warning(f"Failed to write LLM metrics: {e}")
+            return None
+        return self.prometheus_file
+
+
+class TelemetryCallbackHandler(BaseCallbackHandler):
+    """Measures each call of the chat model it is attached to."""
+
+    def __init__(
+        self,
+        telemetry: LLMTelemetry,
+        model: str,
+        input_cost_per_million: Optional[float] = None,
+        output_cost_per_million: Optional[float] = None,
+    ):
+        self.telemetry = telemetry
+        self.model = model
+        # Prices of this model, if they differ from the ``estimation`` prices
+        self.input_cost_per_million = input_cost_per_million
+        self.output_cost_per_million = output_cost_per_million
+        # Calls in flight, by run id
+        self._calls: Dict[UUID, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def on_chat_model_start(
+        self,
+        serialized: Dict[str, Any],
+        messages,
+        *,
+        run_id: UUID,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        metadata = metadata or {}
+        with self._lock:
+            self._calls[run_id] = {
+                "started": time.monotonic(),
+                "first_token": None,
+                # A caller's later attempt is one retry, whatever its index
+                "retries": 1 if metadata.get("attempt", 0) > 0 else 0,
+                "call_site": metadata.get("call_site") or metadata.get("langgraph_node") or "other",
+                "subject": metadata.get("subject"),
+                "route": metadata.get("route"),
+                "node": metadata.get("langgraph_node"),
+                "hedge": bool(metadata.get("hedge")),
+            }
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            call = self._calls.get(run_id)
+            if call is not None and call["first_token"] is None:
+                call["first_token"] = time.monotonic()
+
+    def on_retry(self, retry_state, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            call = self._calls.get(run_id)
+            if call is not None:
+                call["retries"] += 1
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        prompt_tokens = completion_tokens = cache_read_tokens = 0
+        cached = False
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                if message is None:
+                    continue
+                if (message.response_metadata or {}).get(CACHE_HIT_METADATA_KEY):
+                    cached = True
+                usage = message.usage_metadata or {}
+                prompt_tokens += usage.get("input_tokens", 0)
+                completion_tokens += usage.get("output_tokens", 0)
+                cache_read_tokens += (usage.get("input_token_details") or {}).get("cache_read") or 0
+        self._finish(run_id, prompt_tokens, completion_tokens, cache_read_tokens, cached, None)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, 0, 0, 0, False, str(error) or type(error).__name__)
+
+    def _finish(
+        self,
+        run_id: UUID,
+        prompt_tokens: int,
+        completion_tokens: int,
+        cache_read_tokens: int,
+        cached: bool,
+        error: Optional[str],
+    ) -> None:
+        with self._lock:
+            call = self._calls.pop(run_id, None)
+        if call is None:
+            return
+
+        ended = time.monotonic()
+        first_token = call["first_token"]
+        self.telemetry.record(
+            {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "call_site": call["call_site"],
+                "subject": call["subject"],
+                "route": call["route"],
+                "node": call["node"],
+                "model": self.model,
+                "hedge": call["hedge"],
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "cache_read_tokens": cache_read_tokens,
+                "cached": cached,
+                "time_to_first_token_seconds": (
+                    round(first_token - call["started"], 4) if first_token is not None else None
+                ),
+                "latency_seconds": round(ended - call["started"], 4),
+                "retries": call["retries"],
+                # A response served from the local cache cost nothing
+                "cost": (
+                    0.0
+                    if cached
+                    else self.telemetry.cost(
+                        prompt_tokens,
+                        completion_tokens,
+                        self.input_cost_per_million,
+                        self.output_cost_per_million,
+                    )
+                ),
+                "error": error,
+            }
+        )
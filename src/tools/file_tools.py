@@ -2,6 +2,8 @@ from pathlib import Path
 from typing import List, Optional, Dict, Any
 import os
 
+from ..utilities.file_reader import read_text_file
+
 
 def read_file_content(file_path: str, repo_path: str) -> str:
     """
@@ -17,7 +19,7 @@ def read_file_content(file_path: str, repo_path: str) -> str:
     Raises:
         FileNotFoundError: If file doesn't exist
         PermissionError: If file can't be read
-        ValueError: If file is outside repository bounds
+        ValueError: If file is outside repository bounds or is binary
     """
     repo_root = Path(repo_path).resolve()
 
@@ -39,19 +41,8 @@ def read_file_content(file_path: str, repo_path: str) -> str:
     if not target_path.is_file():
         raise ValueError(f"Path is not a file: {file_path}")
 
-    # Try multiple encodings
-    encodings = ['utf-8', 'utf-16', 'cp1252', 'iso-8859-1']
-
-    for encoding in encodings:
-        try:
-            with open(target_path, 'r', encoding=encoding) as f:
-                return f.read()
-        except UnicodeDecodeError:
-            continue
-
-    # If all encodings fail, try binary mode with error handling
-    with open(target_path, 'rb') as f:
-        return f.read().decode('utf-8', errors='ignore')
+    # Single read with encoding detection; binary files raise BinaryFileError
+    return read_text_file(target_path)
 
 
 def list_files_in_directory(directory_path: str, repo_path: str, 
@@ -0,0 +1,244 @@
+"""
+Code Chunking
+
+Splits source files that are too large for a single prompt into chunks at
+definition boundaries: the Python ``ast`` for Python files, and brace depth
+or indentation for other languages. Chunks are packed up to a token budget
+and only split inside a definition when the definition alone exceeds it.
+"""
+
+import ast
+import logging
+from typing import Callable, List, Optional, Tuple
+
+from ..models import CodeChunk
+
+logger = logging.getLogger(__name__)
+
+# Extensions whose blocks are delimited by braces
+BRACE_LANGUAGES = {
+    ".js", ".ts", ".tsx", ".jsx", ".java", ".c", ".cpp", ".h", ".hpp", ".cs",
+    ".go", ".rs", ".php", ".swift", ".kt", ".tf", ".json", ".scala",
+}
+
+# (start line, end line, name), 1-based and inclusive
+Segment = Tuple[int, int, str]
+
+
+def split_code(
+    content: str,
+    extension: str,
+    max_tokens: int,
+    count_tokens: Callable[[str], int],
+) -> List[CodeChunk]:
+    """Split source code into chunks of at most ``max_tokens`` tokens where possible.
+
+    Args:
+        content: File content
+        extension: File extension including the dot, used to pick a splitter
+        max_tokens: Token budget per chunk
+        count_tokens: Function returning the token count of a string
+
+    Returns:
+        Chunks in file order covering every line of the file
+    """
+    lines = content.splitlines(keepends=True)
+    if not lines:
+        return []
+
+    segments = None
+    if extension == ".py":
+        segments = _python_segments(content, lines, max_tokens, count_tokens)
+    if segments is None and extension in BRACE_LANGUAGES:
+        segments = _brace_segments(lines)
+    if segments is None:
+        segments = _indent_segments(lines)
+
+    return _pack_segments(segments, lines, max_tokens, count_tokens)
+
+
+def _python_segments(
+    content: str, lines: List[str], max_tokens: int, count_tokens: Callable[[str], int]
+) -> Optional[List[Segment]]:
+    """Segment Python code at top-level statements, splitting large classes by member."""
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        logger.debug("Could not parse Python file, falling back to indentation")
+        return None
+
+    if not tree.body:
+        return None
+    return _node_segments(tree.body, 1, len(lines), lines, max_tokens, count_tokens, prefix="")
+
+
+def _node_segments(
+    nodes: List[ast.stmt],
+    range_start: int,
+    range_end: int,
+    lines: List[str],
+    max_tokens: int,
+    count_tokens: Callable[[str], int],
+    prefix: str,
+) -> List[Segment]:
+    """Segment consecutive statements so the segments cover ``range_start..range_end``.
+
+    Each statement's segment runs up to the line before the next statement,
+    so comments and decorators stay with the definition that follows them.
+    """
+    segments = []
+    start = range_start
+    for index, node in enumerate(nodes):
+        if index + 1 < len(nodes):
+            stop = _first_line(nodes[index + 1]) - 1
+        else:
+            stop = range_end
+        name = f"{prefix}{getattr(node, 'name', '')}" if hasattr(node, "name") else ""
+
+        text = "".join(lines[start - 1:stop])
+        if isinstance(node, ast.ClassDef) and count_tokens(text) > max_tokens:
+            # The header up to the first member stays with the class name
+            body_start = _first_line(node.body[0])
+            segments.append((start, body_start - 1, f"{name} (header)"))
+            segments.extend(
+                _node_segments(
+                    node.body, body_start, stop, lines, max_tokens, count_tokens, prefix=f"{name}."
+                )
+            )
+        else:
+            segments.append((start, stop, name))
+        start = stop + 1
+
+    return segments
+
+
+def _first_line(node: ast.stmt) -> int:
+    decorators = getattr(node, "decorator_list", None)
+    if decorators:
+        return min(decorator.lineno for decorator in decorators)
+    return node.lineno
+
+
+def _brace_segments(lines: List[str]) -> List[Segment]:
+    """Segment brace-delimited code wherever the brace depth returns to zero."""
+    segments = []
+    depth = 0
+    start = 1
+    for number, line in enumerate(lines, start=1):
+        depth = max(0, depth + _brace_delta(line))
+        stripped = line.strip()
+        # A block ends when depth returns to zero on a closing brace line;
+        # blank lines at depth zero also separate statements
+        if depth == 0 and (stripped.endswith(("}", "};", "},")) or not stripped):
+            if number >= start and any(l.strip() for l in lines[start - 1:number]):
+                segments.append((start, number, ""))
+                start = number + 1
+    if start <= len(lines):
+        segments.append((start, len(lines), ""))
+    return segments
+
+
+def _brace_delta(line: str) -> int:
+    """Net brace depth change of a line, ignoring braces in strings and line comments."""
+    delta = 0
+    quote = None
+    i = 0
+    while i < len(line):
+        c = line[i]
+        if quote:
+            if c == "\\":
+                i += 1
+            elif c == quote:
+                quote = None
+        elif c in "\"'`":
+            quote = c
+        elif c == "/" and line.startswith("//", i):
+            break
+        elif c == "{":
+            delta += 1
+        elif c == "}":
+            delta -= 1
+        i += 1
+    return delta
+
+
+def _indent_segments(lines: List[str]) -> List[Segment]:
+    """Segment code at non-blank lines that start at column zero."""
+    segments = []
+    start = 1
+    for number, line in enumerate(lines, start=1):
+        if number > start and line.strip() and not line[0].isspace():
+            segments.append((start, number - 1, ""))
+            start = number
+    segments.append((start, len(lines), ""))
+    return segments
+
+
+def _pack_segments(
+    segments: List[Segment], lines: List[str], max_tokens: int, count_tokens: Callable[[str], int]
+) -> List[CodeChunk]:
+    """Greedily pack consecutive segments into chunks within the token budget."""
+    chunks: List[CodeChunk] = []
+    current: List[Segment] = []
+    current_tokens = 0
+
+    def flush():
+        nonlocal current, current_tokens
+        if current:
+            chunks.append(_make_chunk(current, lines))
+        current = []
+        current_tokens = 0
+
+    for segment in segments:
+        start, stop, name = segment
+        tokens = count_tokens("".join(lines[start - 1:stop]))
+        if tokens > max_tokens:
+            flush()
+            chunks.extend(_split_lines(segment, lines, max_tokens, count_tokens))
+            continue
+        if current and current_tokens + tokens > max_tokens:
+            flush()
+        current.append(segment)
+        current_tokens += tokens
+    flush()
+
+    for index, chunk in enumerate(chunks):
+        chunk.index = index
+    return chunks
+
+
+def _split_lines(
+    segment: Segment, lines: List[str], max_tokens: int, count_tokens: Callable[[str], int]
+) -> List[CodeChunk]:
+    """Split an oversized segment at line boundaries."""
+    start, stop, name = segment
+    chunks = []
+    piece_start = start
+    piece_tokens = 0
+    for number in range(start, stop + 1):
+        tokens = count_tokens(lines[number - 1])
+        if number > piece_start and piece_tokens + tokens > max_tokens:
+            chunks.append(_make_chunk([(piece_start, number - 1, name)], lines, part=len(chunks) + 1))
+            piece_start = number
+            piece_tokens = 0
+        piece_tokens += tokens
+    chunks.append(_make_chunk([(piece_start, stop, name)], lines, part=len(chunks) + 1 if chunks else None))
+    return chunks
+
+
+def _make_chunk(segments: List[Segment], lines: List[str], part: Optional[int] = None) -> CodeChunk:
+    start = segments[0][0]
+    stop = segments[-1][1]
+    names = [name for _, _, name in segments if name]
+    if names:
+        name = ", ".join(names[:5]) + (f" and {len(names) - 5} more" if len(names) > 5 else "")
+    else:
+        name = f"lines {start}-{stop}"
+    if part is not None:
+        name = f"{name} (part {part})"
+    return CodeChunk(
+        name=name,
+        start_line=start,
+        end_line=stop,
+        content="".join(lines[start - 1:stop]),
+    )
@@ -0,0 +1,119 @@
+"""
+Text File Reading
+
+Reads source and documentation files with a single read, detecting the
+encoding from the bytes in memory and rejecting binary files before they are
+decoded into prompts.
+"""
+
+import codecs
+import logging
+from pathlib import Path
+from typing import Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Number of leading bytes inspected when sniffing for binary content
+SNIFF_SIZE = 8192
+
+# Checked in order; UTF-32 LE must come before UTF-16 LE as their BOMs overlap
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+# Tried in order for files without a BOM; latin-1 accepts any byte sequence
+_FALLBACK_ENCODINGS = ("utf-8", "cp1252", "iso-8859-1")
+
+
+class BinaryFileError(ValueError):
+    """Raised when a file looks like binary data rather than text."""
+
+
+def read_text_file(file_path: Union[str, Path]) -> str:
+    """Read a text file with a single read and decode it.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        Decoded file content with newlines normalized to ``\\n``
+
+    Raises:
+        BinaryFileError: If the file appears to be binary
+        OSError: If the file can't be read
+    """
+    with open(file_path, "rb") as f:
+        data = f.read()
+
+    try:
+        return decode_text_bytes(data)
+    except BinaryFileError:
+        raise BinaryFileError(f"File appears to be binary: {file_path}") from None
+
+
+def decode_text_bytes(data: bytes) -> str:
+    """Decode raw file bytes into text.
+
+    Raises:
+        BinaryFileError: If the bytes look like binary data
+    """
+    encoding = detect_encoding(data)
+    if encoding is None:
+        raise BinaryFileError("Data appears to be binary")
+
+    if encoding in _FALLBACK_ENCODINGS:
+        text = None
+        for candidate in _FALLBACK_ENCODINGS:
+            try:
+                text = data.decode(candidate)
+                break
+            except UnicodeDecodeError:
+                continue
+    else:
+        text = data.decode(encoding, errors="replace")
+
+    # Match the newline translation of text-mode reads
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def detect_encoding(data: bytes) -> Optional[str]:
+    """Detect the encoding of raw file bytes.
+
+    Returns the codec name, ``"utf-8"`` when no BOM or UTF-16 pattern is
+    found, or None if the data looks binary.
+    """
+    for bom, encoding in _BOMS:
+        if data.startswith(bom):
+            return encoding
+
+    sample = data[:SNIFF_SIZE]
+    if b"\x00" not in sample:
+        return "utf-8"
+
+    # BOM-less UTF-16 text has NUL bytes in every other position
+    utf16 = _detect_utf16_without_bom(sample)
+    if utf16:
+        return utf16
+
+    return None
+
+
+def _detect_utf16_without_bom(sample: bytes) -> Optional[str]:
+    """Recognize mostly-ASCII UTF-16 text by the position of its NUL bytes."""
+    if len(sample) < 2:
+        return None
+
+    even = sample[0::2]
+    odd = sample[1::2]
+    even_nuls = even.count(0)
+    odd_nuls = odd.count(0)
+
+    if odd_nuls >= len(odd) * 0.9 and even_nuls <= len(even) * 0.1:
+        return "utf-16-le"
+    if even_nuls >= len(even) * 0.9 and odd_nuls <= len(odd) * 0.1:
+        return "utf-16-be"
+    return None
@@ -0,0 +1,38 @@
+"""
+Packed Response Parsing
+
+Splits the answer to a request that documented several files at once back
+into the documentation of each file, using the marker lines the packed
+prompt asks for.
+"""
+
+import re
+from typing import Dict, Iterable
+
+_SECTION_PATTERN = re.compile(
+    r"^[ \t]*===== BEGIN DOCUMENTATION: (?P<path>.+?) =====[ \t]*\n"
+    r"(?P<body>.*?)"
+    r"^[ \t]*===== END DOCUMENTATION: (?P=path) =====[ \t]*$",
+    re.MULTILINE | re.DOTALL,
+)
+
+
+def split_packed_response(text: str, relative_paths: Iterable[str]) -> Dict[str, str]:
+    """Extract the documentation of each requested file from a packed response.
+
+    Args:
+        text: Response text
+        relative_paths: Relative paths of the files in the request
+
+    Returns:
+        Documentation keyed by relative path, for the files whose section
+        was found and is not empty; sections for other paths are ignored
+    """
+    expected = set(relative_paths)
+    sections: Dict[str, str] = {}
+    for match in _SECTION_PATTERN.finditer(text):
+        path = match.group("path").strip().strip("`")
+        body = match.group("body").strip()
+        if path in expected and path not in sections and body:
+            sections[path] = body
+    return sections
@@ -0,0 +1,253 @@
+"""
+Path Matching
+
+Compiles gitignore-style exclude patterns into regular expressions and decides,
+per directory, whether repository paths are excluded from documentation.
+"""
+
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+GITIGNORE_FILENAME = ".gitignore"
+
+
+class _PatternGroup:
+    """Compiled patterns that share a base directory"""
+
+    def __init__(self, rules: List[Tuple[re.Pattern, bool, bool]]):
+        # Each rule is (regex, negated, directory_only)
+        self.rules = rules
+        self.has_negation = any(negated for _, negated, _ in rules)
+
+        # Without negation only "does anything match" matters, so every rule
+        # is folded into one alternation per kind of path
+        self.any_regex = None
+        self.dir_regex = None
+        if not self.has_negation:
+            self.any_regex = self._combine([r for r, _, dir_only in rules if not dir_only])
+            self.dir_regex = self._combine([r for r, _, dir_only in rules if dir_only])
+
+    @staticmethod
+    def _combine(regexes: List[re.Pattern]) -> Optional[re.Pattern]:
+        if not regexes:
+            return None
+        return re.compile("|".join(f"(?:{r.pattern})" for r in regexes))
+
+    def match(self, path: str, is_dir: bool) -> Optional[bool]:
+        """Return True if excluded, False if re-included, None if no rule matched"""
+        if not self.has_negation:
+            if self.any_regex and self.any_regex.match(path):
+                return True
+            if is_dir and self.dir_regex and self.dir_regex.match(path):
+                return True
+            return None
+
+        # Later rules take precedence over earlier ones
+        for regex, negated, dir_only in reversed(self.rules):
+            if dir_only and not is_dir:
+                continue
+            if regex.match(path):
+                return not negated
+        return None
+
+
+class PathMatcher:
+    """Gitignore-style matcher for repository-relative paths.
+
+    Supports ``*``, ``?``, character classes, ``**``, anchored patterns,
+    directory-only patterns (trailing ``/``) and negation (leading ``!``).
+    Configured patterns have the lowest precedence; ``.gitignore`` files are
+    read lazily per directory when enabled, with deeper files taking
+    precedence over their parents.
+    """
+
+    def __init__(
+        self,
+        patterns: Optional[List[str]] = None,
+        root: Optional[Path] = None,
+        use_gitignore: bool = False,
+    ):
+        self.root = root
+        self.use_gitignore = use_gitignore and root is not None
+        self._base_group = _PatternGroup(self._compile_patterns(patterns or [], ""))
+        self._ignore_groups: Dict[str, _PatternGroup] = {}
+        self._loaded_dirs: Set[str] = set()
+
+    @classmethod
+    def from_config(cls, config, repo_path: Optional[Path] = None) -> "PathMatcher":
+        """Create a matcher from the ``file_processing`` section of the configuration."""
+        file_processing = config.file_processing
+        return cls(
+            patterns=file_processing.get("exclude_patterns", []),
+            root=repo_path,
+            use_gitignore=file_processing.get("use_gitignore", False),
+        )
+
+    def is_excluded(self, relative_path: str, is_dir: bool = False) -> bool:
+        """Check a single path, assuming its parent directories are not excluded.
+
+        This is the check used while walking a tree, where excluded
+        directories have already been pruned.
+        """
+        path = self._normalize(relative_path)
+        if not path:
+            return False
+
+        parent = path.rsplit("/", 1)[0] + "/" if "/" in path else ""
+        if self.use_gitignore:
+            self._load_ignore_files(parent)
+
+            # Deeper .gitignore files take precedence over their parents
+            for base in self._ancestor_dirs(parent):
+                group = self._ignore_groups.get(base)
+                if group is None:
+                    continue
+                decision = group.match(path, is_dir)
+                if decision is not None:
+                    return decision
+
+        return bool(self._base_group.match(path, is_dir))
+
+    def is_path_excluded(self, relative_path: str, is_dir: bool = False) -> bool:
+        """Check a path and every directory above it.
+
+        A path inside an excluded directory is always excluded, matching how
+        git treats ignored directories.
+        """
+        path = self._normalize(relative_path)
+        parts = [part for part in path.split("/") if part]
+        for i in range(1, len(parts)):
+            if self.is_excluded("/".join(parts[:i]), is_dir=True):
+                return True
+        return self.is_excluded("/".join(parts), is_dir=is_dir)
+
+    def _normalize(self, relative_path: str) -> str:
+        path = str(relative_path)
+        if os.sep != "/":
+            path = path.replace(os.sep, "/")
+        return path.strip("/")
+
+    @staticmethod
+    def _ancestor_dirs(directory: str) -> List[str]:
+        """Return ``directory`` and its ancestors, deepest first, as ``"a/b/"`` prefixes."""
+        dirs = [directory]
+        while directory:
+            directory = directory[:-1]
+            directory = directory.rsplit("/", 1)[0] + "/" if "/" in directory else ""
+            dirs.append(directory)
+        return dirs
+
+    def _load_ignore_files(self, directory: str) -> None:
+        """Read any not yet loaded .gitignore files from ``directory`` up to the root."""
+        for base in self._ancestor_dirs(directory):
+            if base in self._loaded_dirs:
+                # Ancestors of a loaded directory are always loaded too
+                break
+            self._loaded_dirs.add(base)
+
+            ignore_path = self.root / base / GITIGNORE_FILENAME
+            try:
+                with open(ignore_path, "r", encoding="utf-8", errors="ignore") as f:
+                    lines = f.read().splitlines()
+            except OSError:
+                continue
+
+            rules = self._compile_patterns(lines, base)
+            if rules:
+                self._ignore_groups[base] = _PatternGroup(rules)
+                logger.debug(f"Loaded {len(rules)} patterns from {ignore_path}")
+
+    def _compile_patterns(self, patterns: List[str], base: str) -> List[Tuple[re.Pattern, bool, bool]]:
+        """Compile gitignore-style patterns relative to ``base``."""
+        rules = []
+        for pattern in patterns:
+            rule = self._compile_pattern(pattern, base)
+            if rule is not None:
+                rules.append(rule)
+        return rules
+
+    def _compile_pattern(self, pattern: str, base: str) -> Optional[Tuple[re.Pattern, bool, bool]]:
+        """Compile a single pattern into ``(regex, negated, directory_only)``."""
+        pattern = pattern.rstrip("\n\r")
+        # Trailing spaces are ignored unless escaped
+        if not pattern.endswith("\\ "):
+            pattern = pattern.rstrip()
+        if not pattern or pattern.startswith("#"):
+            return None
+
+        negated = False
+        if pattern.startswith("!"):
+            negated = True
+            pattern = pattern[1:]
+        elif pattern.startswith("\\!") or pattern.startswith("\\#"):
+            pattern = pattern[1:]
+
+        directory_only = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+        if not pattern:
+            return None
+
+        # A slash anywhere but the end anchors the pattern to its base directory
+        anchored = "/" in pattern
+        pattern = pattern.lstrip("/")
+
+        body = self._translate(pattern)
+        prefix = re.escape(base)
+        if not anchored:
+            prefix += "(?:.*/)?"
+
+        return re.compile(f"^{prefix}{body}$"), negated, directory_only
+
+    @staticmethod
+    def _translate(pattern: str) -> str:
+        """Translate a glob pattern into a regular expression body."""
+        result = []
+        i, n = 0, len(pattern)
+        while i < n:
+            c = pattern[i]
+            if c == "*":
+                if pattern.startswith("**", i):
+                    at_start = i == 0 or pattern[i - 1] == "/"
+                    at_end = i + 2 == n or pattern[i + 2] == "/"
+                    if at_start and at_end:
+                        if i + 2 == n:
+                            # Trailing "**" matches everything inside
+                            result.append(".*")
+                            i += 2
+                        else:
+                            # "**/" matches zero or more directories
+                            result.append("(?:.*/)?")
+                            i += 3
+                        continue
+                    i += 1
+                result.append("[^/]*")
+            elif c == "?":
+                result.append("[^/]")
+            elif c == "[":
+                j = i + 1
+                if j < n and pattern[j] in "!^":
+                    j += 1
+                if j < n and pattern[j] == "]":
+                    j += 1
+                while j < n and pattern[j] != "]":
+                    j += 1
+                if j >= n:
+                    result.append("\\[")
+                else:
+                    chars = pattern[i + 1:j].replace("\\", "\\\\")
+                    if chars[0] in "!^":
+                        chars = "^" + chars[1:]
+                    result.append(f"[{chars}]")
+                    i = j
+            elif c == "\\" and i + 1 < n:
+                i += 1
+                result.append(re.escape(pattern[i]))
+            else:
+                result.append(re.escape(c))
+            i += 1
+        return "".join(result)
@@ -5,22 +5,70 @@ Handles token counting, budget tracking, and context optimization for LLM intera
 """
 
 import logging
-from typing import Dict, List
+from typing import Dict, List, Sequence
 
 import tiktoken
 
 logger = logging.getLogger(__name__)
 
+# Characters per token of the estimate used when no tiktoken encoding is available
+CHARS_PER_TOKEN = 4
+
+
+class ApproximateEncoding:
+    """Stands in for a tiktoken encoding, estimating four characters per token.
+
+    tiktoken downloads the data of an encoding the first time it is loaded,
+    which fails on a machine without network access unless
+    ``TIKTOKEN_CACHE_DIR`` points at a cache that already holds it. Only the
+    number of tokens is meaningful, the token ids are not.
+    """
+
+    name = "approximate"
+
+    def encode(self, text: str, **kwargs) -> Sequence[int]:
+        return range((len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
+
+    def encode_ordinary(self, text: str) -> Sequence[int]:
+        return self.encode(text)
+
+    def encode_ordinary_batch(self, texts: List[str], num_threads: int = 1) -> List[Sequence[int]]:
+        return [self.encode(text) for text in texts]
+
+
+def get_encoding(encoding_name: str, approximate: bool = False):
+    """Load a tiktoken encoding, estimating tokens instead if it cannot be loaded.
+
+    Args:
+        encoding_name: Name of the tiktoken encoding, such as ``cl100k_base``
+        approximate: Estimate tokens without loading the encoding, for the
+            offline ``fake`` provider
+    """
+    if approximate:
+        return ApproximateEncoding()
+    try:
+        return tiktoken.get_encoding(encoding_name)
+    except Exception as e:
+        logger.warning(
+            f"Could not load the {encoding_name} tiktoken encoding, "
+            f"estimating {CHARS_PER_TOKEN} characters per token: {e}"
+        )
+        return ApproximateEncoding()
+
 
 class TokenCounter:
     """Utility for counting tokens in text"""
 
-    def __init__(self):
+    def __init__(self, approximate: bool = False):
+        self.approximate = approximate
         self.encoders: Dict[str, tiktoken.Encoding] = {}
         self._load_encoders()
 
     def _load_encoders(self):
         """Load tiktoken encoders for different models"""
+        if self.approximate:
+            self.encoders["default"] = ApproximateEncoding()
+            return
         try:
             # Common encoders
             self.encoders["gpt-4"] = tiktoken.encoding_for_model("gpt-4")
@@ -36,7 +84,8 @@ class TokenCounter:
 
         except Exception as e:
             logger.warning(f"Failed to load some tiktoken encoders: {e}")
-            # Fallback to default encoder            self.encoders["default"] = tiktoken.get_encoding("cl100k_base")
+            # Fallback to default encoder
+            self.encoders["default"] = get_encoding("cl100k_base")
 
     def count_tokens(self, text: str, model: str = "default") -> int:
         """Count tokens in text for a specific model"""
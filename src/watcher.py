@@ -0,0 +1,316 @@
+"""
+Repository Watching
+
+Watches a repository for source file changes and regenerates documentation
+for only the touched files. Bursts of edits are coalesced within a debounce
+window, and the pipeline (LLM client, configuration, token encoder, compiled
+graph and scan index) stays loaded between cycles.
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+from .code_analyzer import CodeAnalyzer
+from .models import SourceChangeSet
+from .utilities.path_matcher import PathMatcher
+
+logger = logging.getLogger(__name__)
+
+# Returned by a backend when individual changes were lost and every file
+# has to be checked again
+FULL_RESCAN = "*"
+
+# inotify event flags, from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR
+)
+_EVENT_HEADER = struct.Struct("iIII")
+_READ_SIZE = 64 * 1024
+
+
+class _InotifyBackend:
+    """Reports changed paths using Linux inotify watches on every included directory."""
+
+    def __init__(self, repo_path: Path, matcher: PathMatcher, ignored_dirs: Set[Path]):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.repo_path = repo_path
+        self.matcher = matcher
+        self.ignored_dirs = ignored_dirs
+        self._watches: Dict[int, str] = {}
+
+        self._add_tree("")
+        logger.info(f"Watching {len(self._watches)} directories with inotify")
+
+    @classmethod
+    def is_supported(cls) -> bool:
+        return sys.platform.startswith("linux")
+
+    def _add_tree(self, relative_dir: str) -> Set[str]:
+        """Watch a directory and its included subdirectories, returning the files found."""
+        files = set()
+        pending = [relative_dir]
+        while pending:
+            current = pending.pop()
+            directory = self.repo_path / current
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                logger.warning(f"Could not watch {directory}: {os.strerror(ctypes.get_errno())}")
+                continue
+            self._watches[wd] = current
+
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                relative_path = os.path.join(current, entry.name) if current else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if not self._is_ignored_dir(relative_path):
+                        pending.append(relative_path)
+                else:
+                    files.add(relative_path)
+        return files
+
+    def _is_ignored_dir(self, relative_path: str) -> bool:
+        if (self.repo_path / relative_path).resolve() in self.ignored_dirs:
+            return True
+        return self.matcher.is_excluded(relative_path, is_dir=True)
+
+    def poll(self, timeout: float) -> Set[str]:
+        """Wait up to ``timeout`` seconds and return the paths touched meanwhile."""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        try:
+            data = os.read(self._fd, _READ_SIZE)
+        except BlockingIOError:
+            return set()
+
+        touched = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, name_length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + name_length].rstrip(b"\0"))
+            offset += name_length
+
+            if mask & IN_Q_OVERFLOW:
+                logger.warning("inotify event queue overflowed, rescanning all files")
+                touched.add(FULL_RESCAN)
+                continue
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+
+            directory = self._watches.get(wd)
+            if directory is None or not name:
+                continue
+            relative_path = os.path.join(directory, name) if directory else name
+
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    if not self._is_ignored_dir(relative_path):
+                        touched.update(self._add_tree(relative_path))
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    # The files that were inside are not reported individually
+                    touched.add(FULL_RESCAN)
+            else:
+                touched.add(relative_path)
+
+        return touched
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class _PollingBackend:
+    """Reports changed paths by comparing stat signatures between periodic scans."""
+
+    def __init__(self, repo_path: Path, code_analyzer: CodeAnalyzer, poll_interval: float):
+        self.repo_path = repo_path
+        self.code_analyzer = code_analyzer
+        self.poll_interval = poll_interval
+        self._snapshot = self._take_snapshot()
+        self._next_poll = time.monotonic() + poll_interval
+        logger.info(f"Polling {len(self._snapshot)} files every {poll_interval}s")
+
+    def _take_snapshot(self) -> Dict[str, Tuple[int, int, int]]:
+        code_files = self.code_analyzer.scan_repository(self.repo_path)
+        return {cf.relative_path: (cf.size, cf.mtime_ns, cf.inode) for cf in code_files}
+
+    def poll(self, timeout: float) -> Set[str]:
+        """Wait up to ``timeout`` seconds and return the paths touched meanwhile."""
+        wait = self._next_poll - time.monotonic()
+        if wait > timeout:
+            time.sleep(timeout)
+            return set()
+        if wait > 0:
+            time.sleep(wait)
+
+        self._next_poll = time.monotonic() + self.poll_interval
+        snapshot = self._take_snapshot()
+        touched = {
+            relative_path
+            for relative_path in snapshot.keys() | self._snapshot.keys()
+            if snapshot.get(relative_path) != self._snapshot.get(relative_path)
+        }
+        self._snapshot = snapshot
+        return touched
+
+    def close(self) -> None:
+        pass
+
+
+class RepositoryWatcher:
+    """Regenerates documentation for files as they change."""
+
+    def __init__(
+        self,
+        pipeline,
+        repo_path: Path,
+        docs_path: Optional[Path] = None,
+        output_path: Optional[Path] = None,
+        guide: bool = False,
+        debounce_seconds: Optional[float] = None,
+        poll_interval: Optional[float] = None,
+        use_polling: bool = False,
+    ):
+        """Initialize the watcher.
+
+        Args:
+            pipeline: DocumentationPipeline reused for every cycle
+            repo_path: Path to the repository being documented
+            docs_path: Path to existing documentation used as context
+            output_path: Path where documentation is output
+            guide: Also update the documentation guide after each cycle
+            debounce_seconds: Quiet period after the last change before a cycle runs
+            poll_interval: Seconds between scans when polling
+            use_polling: Poll file signatures even when inotify is available
+        """
+        watch_config = pipeline.config.watch
+        self.pipeline = pipeline
+        self.repo_path = repo_path
+        self.docs_path = docs_path
+        self.output_path = output_path or repo_path / "documentation_output"
+        self.guide = guide
+        self.debounce_seconds = (
+            debounce_seconds if debounce_seconds is not None else watch_config.get("debounce_seconds", 2.0)
+        )
+        self.poll_interval = (
+            poll_interval if poll_interval is not None else watch_config.get("poll_interval", 2.0)
+        )
+        self.use_polling = use_polling or watch_config.get("use_polling", False)
+
+        self.supported_extensions = pipeline.config.file_processing.get("supported_extensions", [])
+        self.matcher = pipeline.code_analyzer.create_path_matcher(repo_path)
+        self.logger = logging.getLogger(__name__)
+
+    def run(self) -> None:
+        """Document the repository once, then keep it up to date until interrupted."""
+        # Start watching first so edits made during the initial pass are kept
+        backend = self._create_backend()
+        try:
+            print("Running initial documentation pass...")
+            self._run_cycle(None)
+
+            print(f"👀 Watching {self.repo_path} for changes (Ctrl+C to stop)")
+            self._watch(backend)
+        finally:
+            backend.close()
+
+    def _create_backend(self):
+        if not self.use_polling and _InotifyBackend.is_supported():
+            try:
+                return _InotifyBackend(self.repo_path, self.matcher, {self.output_path.resolve()})
+            except OSError as e:
+                self.logger.warning(f"inotify unavailable, falling back to polling: {e}")
+        return _PollingBackend(self.repo_path, self.pipeline.code_analyzer, self.poll_interval)
+
+    def _watch(self, backend) -> None:
+        """Collect touched paths and run a cycle once they have been quiet for the debounce window."""
+        pending: Set[str] = set()
+        deadline = None
+        while True:
+            timeout = 1.0 if deadline is None else max(0.0, deadline - time.monotonic())
+            touched = {path for path in backend.poll(timeout) if self._is_watched_file(path)}
+            if touched:
+                pending |= touched
+                deadline = time.monotonic() + self.debounce_seconds
+            elif deadline is not None and time.monotonic() >= deadline:
+                self._run_cycle(self._build_change_set(pending))
+                pending = set()
+                deadline = None
+
+    def _is_watched_file(self, relative_path: str) -> bool:
+        if relative_path == FULL_RESCAN:
+            return True
+        if self.supported_extensions and os.path.splitext(relative_path)[1] not in self.supported_extensions:
+            return False
+        if self.output_path.resolve() in (self.repo_path / relative_path).resolve().parents:
+            return False
+        return not self.matcher.is_path_excluded(relative_path)
+
+    def _build_change_set(self, touched: Set[str]) -> Optional[SourceChangeSet]:
+        """Turn touched paths into a change set, or None when every file must be checked."""
+        if FULL_RESCAN in touched:
+            return None
+
+        changes = SourceChangeSet()
+        for relative_path in sorted(touched):
+            if (self.repo_path / relative_path).is_file():
+                # Unchanged content is still skipped by the hash check
+                changes.modified.append(relative_path)
+            else:
+                changes.deleted.append(relative_path)
+        return changes
+
+    def _run_cycle(self, changes: Optional[SourceChangeSet]) -> None:
+        """Run the pipeline for a set of changes, keeping the watcher alive on failure."""
+        started = time.monotonic()
+        try:
+            final_state = self.pipeline.run(
+                repo_path=self.repo_path,
+                docs_path=self.docs_path,
+                output_path=self.output_path,
+                file_docs=True,
+                guide=self.guide,
+                changes=changes,
+            )
+        except Exception as e:
+            self.logger.error(f"Watch cycle failed: {e}", exc_info=True)
+            print(f"❌ Update failed: {e}")
+            return
+
+        results = final_state.get("results", [])
+        failed = len([r for r in results if not r.success])
+        print(
+            f"✅ Updated in {time.monotonic() - started:.1f}s: "
+            f"{len(results)} files checked, {failed} failed"
+        )